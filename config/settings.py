@@ -24,9 +24,60 @@ TIMEOUT = int(os.getenv("TIMEOUT", "30"))
 PLAYWRIGHT_BROWSER = os.getenv("PLAYWRIGHT_BROWSER", "chromium").lower()
 PLAYWRIGHT_HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", str(HEADLESS)).lower() == "true"
 
+# Playwright 上下文预热：提前创建 N 个上下文/页面，0 表示关闭
+PREWARM_DEPTH = int(os.getenv("PREWARM_DEPTH", "1"))
+# 预热时是否预先打开 BASE_URL
+PREWARM_NAVIGATE = os.getenv("PREWARM_NAVIGATE", "true").lower() == "true"
+# 预热页面最长保留时间（秒），超时未使用则丢弃
+PREWARM_MAX_AGE = int(os.getenv("PREWARM_MAX_AGE", "300"))
+
+# 进程级共享 Playwright（Robot 库共用）：引用计数归零后是否保留浏览器供后续套件复用
+PLAYWRIGHT_SHARED_KEEP_ALIVE = os.getenv("PLAYWRIGHT_SHARED_KEEP_ALIVE", "true").lower() == "true"
+
+# 网络资源屏蔽：按资源类型和 URL 模式拦截与功能断言无关的请求
+# functional-fast: 屏蔽图片、字体、媒体和第三方统计脚本；full-fidelity: 不屏蔽任何请求
+RESOURCE_BLOCK_PROFILES = {
+    "functional-fast": {
+        "resource_types": ["image", "font", "media"],
+        "url_patterns": [
+            "*google-analytics.com*",
+            "*googletagmanager.com*",
+            "*doubleclick.net*",
+            "*facebook.net*",
+            "*hotjar.com*",
+            "*segment.io*",
+            "*backtrace.io*",
+        ],
+    },
+    "full-fidelity": {
+        "resource_types": [],
+        "url_patterns": [],
+    },
+}
+RESOURCE_BLOCK_PROFILE = os.getenv("RESOURCE_BLOCK_PROFILE", "functional-fast").lower()
+# 被屏蔽请求的估算大小（字节），用于统计节省的流量
+RESOURCE_BLOCK_ESTIMATED_BYTES = {
+    "image": 30_000,
+    "font": 40_000,
+    "media": 500_000,
+    "script": 50_000,
+    "other": 5_000,
+}
+
 # Selenium 远程配置（用于 Docker + Selenium Grid/Standalone）
 SELENIUM_REMOTE_URL = os.getenv("SELENIUM_REMOTE_URL")
 
+# Selenium 驱动池配置：在测试之间复用浏览器，归还时重置 Cookie/Storage
+SELENIUM_POOL_ENABLED = os.getenv("SELENIUM_POOL_ENABLED", "true").lower() == "true"
+SELENIUM_POOL_MAX_IDLE = int(os.getenv("SELENIUM_POOL_MAX_IDLE", "1"))
+# 单个驱动最多复用次数，0 表示不限制
+SELENIUM_POOL_MAX_USES = int(os.getenv("SELENIUM_POOL_MAX_USES", "50"))
+
+# WebDriver 驱动路径缓存：按机器和浏览器版本解析一次并持久化，多进程共享
+DRIVER_CACHE_DIR = Path(os.getenv("DRIVER_CACHE_DIR", str(Path.home() / ".cache" / "autotest" / "drivers")))
+# 严格离线模式：只使用缓存、PATH 中或 CHROMEDRIVER_PATH 等变量指定的驱动，不访问网络
+DRIVER_OFFLINE = os.getenv("DRIVER_OFFLINE", "false").lower() == "true"
+
 # 浏览器选项
 BROWSER_OPTIONS = {
     "chrome": {
@@ -58,8 +109,86 @@ REPORTS_DIR.mkdir(exist_ok=True)
 LOGS_DIR = BASE_DIR / "logs"
 LOGS_DIR.mkdir(exist_ok=True)
 
+# 登录态缓存：按用户类型保存 storage_state，测试直接以已登录状态打开产品页
+AUTH_STATE_DIR = Path(os.getenv("AUTH_STATE_DIR", str(REPORTS_DIR / ".auth")))
+# 缓存文件最长复用时间（秒）
+AUTH_STATE_MAX_AGE = int(os.getenv("AUTH_STATE_MAX_AGE", "3600"))
+# 会话 Cookie 剩余有效期低于该值（秒）时重新登录
+AUTH_STATE_MIN_VALIDITY = int(os.getenv("AUTH_STATE_MIN_VALIDITY", "120"))
+
+# HAR 录制与回放：off / record（录制响应）/ replay（本地回放，未命中时访问网络）
+HAR_MODE = os.getenv("HAR_MODE", "off").lower()
+# HAR 文件目录，按站点分子目录，响应体按内容哈希去重保存
+HAR_DIR = Path(os.getenv("HAR_DIR", str(BASE_DIR / "tests" / "resources" / "har")))
+# 回放出现未命中时作废该流程的 HAR，下次运行重新录制
+HAR_UPDATE_ON_MISS = os.getenv("HAR_UPDATE_ON_MISS", "true").lower() == "true"
+
+# 自适应定位器超时：超时取该定位器历史耗时的高分位数 + 余量（秒），显式传入 timeout 时不生效
+ADAPTIVE_TIMEOUT = os.getenv("ADAPTIVE_TIMEOUT", "true").lower() == "true"
+# 耗时历史文件（按站点 + 页面路径 + 定位器记录，多进程合并写入）
+ADAPTIVE_TIMEOUT_STORE = Path(os.getenv("ADAPTIVE_TIMEOUT_STORE", str(REPORTS_DIR / ".timings" / "locator_timings.json")))
+ADAPTIVE_TIMEOUT_QUANTILE = float(os.getenv("ADAPTIVE_TIMEOUT_QUANTILE", "0.99"))
+ADAPTIVE_TIMEOUT_MARGIN = float(os.getenv("ADAPTIVE_TIMEOUT_MARGIN", "2"))
+# 自适应超时下限（秒）
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "3"))
+# 样本数不足 ADAPTIVE_TIMEOUT_MIN_SAMPLES 的冷定位器使用的超时（秒）
+ADAPTIVE_TIMEOUT_COLD = float(os.getenv("ADAPTIVE_TIMEOUT_COLD", str(TIMEOUT)))
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "5"))
+# 每个定位器保留的最近样本数
+ADAPTIVE_TIMEOUT_HISTORY = int(os.getenv("ADAPTIVE_TIMEOUT_HISTORY", "50"))
+
+# pytest-xdist 按耗时调度：-n 并行时按历史耗时从长到短派发测试（最长处理时间优先）
+DURATION_SCHEDULING = os.getenv("DURATION_SCHEDULING", "true").lower() == "true"
+# 测试耗时历史文件（指数移动平均）
+DURATION_STORE = Path(os.getenv("DURATION_STORE", str(REPORTS_DIR / ".timings" / "test_durations.json")))
+DURATION_EMA_ALPHA = float(os.getenv("DURATION_EMA_ALPHA", "0.3"))
+# 没有任何耗时历史时每个测试的估算耗时（秒）
+DURATION_DEFAULT = float(os.getenv("DURATION_DEFAULT", "5"))
+# Robot 并行执行（run.py / run_tests.py --processes）的执行单元耗时历史，键为 suite 文件或 suite 文件::用例名
+ROBOT_DURATION_STORE = Path(os.getenv("ROBOT_DURATION_STORE", str(REPORTS_DIR / ".timings" / "robot_durations.json")))
+# 分片执行（run.py --shard i/N）的构建标识：同一构建的各分片共用一份划分，合并时只接受本构建的分片结果
+# 默认取 Jenkins 的 BUILD_TAG 或 GitHub Actions 的 GITHUB_RUN_ID；为空（本地）时测试集合不变即复用已保存的划分
+SHARD_BUILD_ID = os.getenv("SHARD_BUILD_ID") or os.getenv("BUILD_TAG") or os.getenv("GITHUB_RUN_ID", "")
+
+# 测试影响索引：pytest --record-impact / Robot 影响监听器记录每个测试触及的模块、定位器和资源文件
+IMPACT_INDEX = Path(os.getenv("IMPACT_INDEX", str(REPORTS_DIR / ".timings" / "impact_index.json")))
+# 改动后执行全部测试的文件（逗号分隔，以 / 结尾表示目录）
+IMPACT_GLOBAL_FILES = [
+    path.strip() for path in os.getenv(
+        "IMPACT_GLOBAL_FILES", "conftest.py,pytest.ini,robotframework.ini,requirements.txt,config/"
+    ).split(",") if path.strip()
+]
+
+# 全量运行（run.py / run_tests.py 的“全部运行”）并发编排的资源上限
+# CPU 核数，0 表示本机核数
+PIPELINE_CPU = float(os.getenv("PIPELINE_CPU", "0"))
+# 内存（MB），0 表示物理内存的 80%
+PIPELINE_MEMORY_MB = int(os.getenv("PIPELINE_MEMORY_MB", "0"))
+# 同时运行的浏览器阶段数
+PIPELINE_BROWSER_SLOTS = int(os.getenv("PIPELINE_BROWSER_SLOTS", "2"))
+# 同时运行的阶段数，0 表示不限制，1 表示串行
+PIPELINE_MAX_STAGES = int(os.getenv("PIPELINE_MAX_STAGES", "0"))
+
+# 即时断言（now 模式）读取 DOM 前页面需达到的 document.readyState：loading / interactive / complete
+ASSERT_READY_STATE = os.getenv("ASSERT_READY_STATE", "complete").lower()
+
+# 表单批量填写：一次页面脚本设置所有字段并派发 input/change 事件，关闭后逐字段 fill
+FORM_BATCH_FILL = os.getenv("FORM_BATCH_FILL", "true").lower() == "true"
+
 # API 基础地址（示例：reqres.in 提供公开接口）
 API_BASE_URL = os.getenv("API_BASE_URL", "https://reqres.in/api")
+# API 请求默认超时（秒）
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+# 连接池：缓存连接池的主机数 / 每个主机保持的最大连接数（keep-alive 复用）
+API_POOL_CONNECTIONS = int(os.getenv("API_POOL_CONNECTIONS", "10"))
+API_POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", "10"))
+# 幂等请求在连接失败或 502/503/504 时的重试次数和指数退避系数（秒）
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.3"))
+# pytest api_client 使用的 APIConfig.ENVIRONMENTS 环境（超时 / SSL 校验），为空时使用 APIConfig.DEFAULT_ENV 的超时
+API_ENV = os.getenv("API_ENV", "")
+# 数据驱动 API 引擎的并发数
+API_ENGINE_WORKERS = int(os.getenv("API_ENGINE_WORKERS", "16"))
 
 
 @dataclass
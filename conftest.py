@@ -6,24 +6,48 @@ import pytest
 import logging
 from pathlib import Path
 from datetime import datetime
+from playwright.sync_api import sync_playwright
 from utils.selenium_helper import SeleniumHelper
-from utils.playwright_helper import PlaywrightHelper
+from utils.driver_pool import SeleniumDriverPool
+from utils.playwright_helper import PlaywrightHelper, ContextPrewarmer, launch_browser
+from utils.ui_operations import UIOperations
 from utils.test_data_manager import TestDataManager
+from utils.auth_state import get_auth_state_cache
+from utils.resource_blocking import get_blocking_stats
+from utils.http_client import create_session
+from tests.api_layer.config.api_config import APIConfig
 import config.settings as settings
 
 logger = logging.getLogger(__name__)
 
+# 记录测试耗时并在 -n 并行时按耗时调度；--record-impact 记录测试影响索引
+pytest_plugins = ["utils.lpt_scheduler", "utils.impact_plugin"]
+
 
 # ========== 浏览器 Fixtures ==========
 
+@pytest.fixture(scope="session")
+def selenium_driver_pool():
+    """
+    Selenium 驱动池 fixture
+    会话级（使用 pytest-xdist 时为每个 worker）复用浏览器，结束时统一关闭
+    """
+    pool = SeleniumDriverPool()
+    yield pool
+    pool.close_all()
+
+
 @pytest.fixture(scope="function")
-def selenium_driver(request):
+def selenium_driver(request, selenium_driver_pool):
     """
     Selenium 驱动 fixture
-    支持失败时自动截图
+    支持失败时自动截图；启用驱动池时从池中借出，测试结束后重置状态并归还
     """
-    helper = SeleniumHelper(screenshot_on_failure=True)
-    driver = helper.start_browser()
+    if settings.SELENIUM_POOL_ENABLED:
+        helper = selenium_driver_pool.acquire(screenshot_on_failure=True)
+    else:
+        helper = SeleniumHelper(screenshot_on_failure=True)
+        helper.start_browser()
     
     yield helper
     
@@ -36,18 +60,122 @@ def selenium_driver(request):
         except Exception as e:
             logger.error(f"截图保存失败: {str(e)}")
     
+    if settings.SELENIUM_POOL_ENABLED:
+        selenium_driver_pool.release(helper)
+    else:
+        helper.quit()
+
+
+@pytest.fixture(scope="session")
+def playwright_browser():
+    """
+    会话级 Playwright 浏览器 fixture
+    整个会话（使用 pytest-xdist 时为每个 worker）只启动一次驱动和浏览器
+    """
+    playwright = sync_playwright().start()
+    browser = launch_browser(playwright, settings.PLAYWRIGHT_BROWSER, settings.PLAYWRIGHT_HEADLESS)
+    logger.info(f"共享 Playwright 浏览器已启动: {settings.PLAYWRIGHT_BROWSER}")
+    
+    yield browser
+    
+    browser.close()
+    playwright.stop()
+    logger.info("共享 Playwright 浏览器已关闭")
+
+
+@pytest.fixture(scope="session")
+def playwright_prewarmer(playwright_browser):
+    """
+    上下文预热池 fixture
+    当前测试运行时已为下一个测试准备好上下文和页面，会话结束时丢弃未使用的预热上下文
+    """
+    # HAR 录制/回放按测试的页面流程创建上下文，不使用预热
+    depth = 0 if settings.HAR_MODE != "off" else None
+    prewarmer = ContextPrewarmer(playwright_browser, depth=depth)
+    prewarmer.fill()
+    yield prewarmer
+    prewarmer.close()
+
+
+@pytest.fixture(scope="function")
+def playwright_page(request, playwright_browser, playwright_prewarmer):
+    """
+    Playwright 页面 fixture
+    复用会话级浏览器，每个测试使用全新的 BrowserContext 和 Page（来自预热池），测试结束只关闭上下文；
+    启用 HAR_MODE 时按页面流程（@pytest.mark.har_flow("checkout")，默认测试名）录制/回放
+    """
+    helper = PlaywrightHelper()
+    if settings.HAR_MODE != "off":
+        helper.attach_to_browser(playwright_browser, har_flow=_har_flow(request))
+    else:
+        helper.attach_to_context(*playwright_prewarmer.acquire())
+    yield helper
+    _record_blocking_stats(request, helper.context)
     helper.quit()
 
 
 @pytest.fixture(scope="function")
-def playwright_page():
-    """Playwright 页面 fixture"""
+def ui_operations(request, playwright_browser, playwright_prewarmer):
+    """UIOperations fixture：基于预热池提供的上下文和页面（HAR 模式下按页面流程新建），测试结束只关闭上下文"""
+    ui_ops = UIOperations(browser_type=settings.PLAYWRIGHT_BROWSER, headless=settings.PLAYWRIGHT_HEADLESS)
+    if settings.HAR_MODE != "off":
+        ui_ops.browser = playwright_browser
+        ui_ops.new_context(har_flow=_har_flow(request))
+    else:
+        ui_ops.attach_to_context(*playwright_prewarmer.acquire())
+    yield ui_ops
+    _record_blocking_stats(request, ui_ops.context)
+    ui_ops.close_browser()
+
+
+@pytest.fixture(scope="session")
+def auth_state_cache():
+    """登录态缓存 fixture：每个用户类型只通过 UI 登录一次"""
+    return get_auth_state_cache()
+
+
+@pytest.fixture(scope="function")
+def logged_in_page(request, playwright_browser, auth_state_cache):
+    """
+    已登录的 Playwright 页面 fixture
+    使用缓存的 storage_state 创建上下文并直接打开产品列表页；
+    用户类型通过 @pytest.mark.login_as("problem") 指定，默认 standard。
+    登录流程本身的测试请继续使用 playwright_page。
+    """
+    marker = request.node.get_closest_marker("login_as")
+    user_type = marker.args[0] if marker else "standard"
+    
     helper = PlaywrightHelper()
-    page = helper.start_browser()
+    helper.attach_to_browser(
+        playwright_browser,
+        har_flow=_har_flow(request),
+        storage_state=auth_state_cache.get_state(playwright_browser, user_type),
+    )
+    helper.navigate_to(auth_state_cache.inventory_url)
+    helper.wait_for_selector(auth_state_cache.locators.PRODUCTS_CONTAINER)
     yield helper
+    _record_blocking_stats(request, helper.context)
     helper.quit()
 
 
+def _har_flow(request):
+    """HAR 页面流程名称：@pytest.mark.har_flow 指定，默认使用测试名"""
+    marker = request.node.get_closest_marker("har_flow")
+    return marker.args[0] if marker else request.node.name
+
+
+def _record_blocking_stats(request, context):
+    """将当前测试上下文的资源屏蔽统计写入报告（junitxml 的 user_properties）和日志"""
+    stats = get_blocking_stats(context) if context else None
+    if not stats or not stats["blocked"]:
+        return
+    request.node.user_properties.append(("resource_blocking", stats))
+    logger.info(
+        f"资源屏蔽[{stats['profile']}]: 屏蔽 {stats['blocked']} 个请求 {stats['by_type']}，"
+        f"估算节省 {stats['estimated_saved_bytes'] / 1024:.1f} KB"
+    )
+
+
 # ========== 配置 Fixtures ==========
 
 @pytest.fixture(scope="session")
@@ -62,6 +190,27 @@ def api_base_url():
     return settings.API_BASE_URL
 
 
+@pytest.fixture(scope="session")
+def api_client(api_base_url):
+    """
+    API 客户端 fixture（每个 xdist worker 一个）
+    连接池会话复用 keep-alive 连接，相对路径拼接 API_BASE_URL，
+    超时取自 APIConfig.ENVIRONMENTS（settings.API_ENV，默认 APIConfig.DEFAULT_ENV），幂等请求自动重试；
+    只有通过 API_ENV 显式选择环境时才使用其 SSL 校验配置
+    """
+    env_name = settings.API_ENV or APIConfig.DEFAULT_ENV
+    if env_name not in APIConfig.ENVIRONMENTS:
+        pytest.fail(f"未知的 API_ENV: {env_name}，可选环境: {', '.join(APIConfig.ENVIRONMENTS)}", pytrace=False)
+    environment = APIConfig.ENVIRONMENTS[env_name]
+    # Content-Type 由 json= / data= / files= 决定，不作为公共请求头
+    headers = {name: value for name, value in APIConfig.DEFAULT_HEADERS.items() if name.lower() != "content-type"}
+    session = create_session(base_url=api_base_url, headers=headers, timeout=environment["timeout"])
+    if settings.API_ENV:
+        session.verify = environment["verify_ssl"]
+    yield session
+    session.close()
+
+
 @pytest.fixture(scope="session")
 def test_environment():
     """
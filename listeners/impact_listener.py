@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Robot Framework 测试影响记录监听器
+
+记录每个用例触及的框架模块、定位器常量和 Robot 资源文件到测试影响索引，
+供 run.py --affected-since 选择受影响的用例。Suite Setup / Teardown 的代码计入该 suite 下的全部用例。
+suite 导入（含间接导入）的资源文件和变量文件计入该 suite 下的全部用例，只定义变量的定位器文件改动也能选中用例。
+
+使用方式：
+    python -m robot --listener listeners/impact_listener.py ...
+    python run.py --test-type ui --record-impact
+"""
+
+from utils.impact_index import CodeRecorder, get_impact_index, project_path
+
+
+class ImpactListener:
+    """按用例记录执行过的代码和关键字来源文件"""
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self):
+        self.recorder = CodeRecorder()
+        # suite 栈：每层记录 suite 源文件、Suite Setup/Teardown 用到的资源文件和已结束的用例
+        self._suites = []
+        self._test_resources = None
+        # Robot 在 start_suite 之前处理 suite 的导入，先暂存，start_suite 时归入该 suite
+        self._imports = set()
+
+    def start_suite(self, name, attributes):
+        if not self._suites:
+            self.recorder.start()
+        self.recorder.push()
+        resources, self._imports = self._imports, set()
+        self._suites.append({"source": project_path(attributes.get("source")), "resources": resources, "tests": []})
+
+    def resource_import(self, name, attributes):
+        self._record_import(attributes)
+
+    def variables_import(self, name, attributes):
+        self._record_import(attributes)
+
+    def _record_import(self, attributes):
+        source = project_path(attributes.get("source"))
+        if source:
+            self._imports.add(source)
+
+    def start_test(self, name, attributes):
+        self.recorder.push()
+        self._test_resources = set()
+
+    def start_keyword(self, name, attributes):
+        source = project_path(attributes.get("source"))
+        if not source or source.endswith(".py"):
+            return
+        if self._test_resources is not None:
+            self._test_resources.add(source)
+        elif self._suites:
+            self._suites[-1]["resources"].add(source)
+
+    def end_test(self, name, attributes):
+        suite = self._suites[-1]
+        suite["tests"].append((f"{suite['source']}::{name}", self.recorder.pop(), self._test_resources))
+        self._test_resources = None
+
+    def end_suite(self, name, attributes):
+        codes = self.recorder.pop()
+        suite = self._suites.pop()
+        for _, test_codes, resources in suite["tests"]:
+            test_codes |= codes
+            resources |= suite["resources"]
+        if self._suites:
+            self._suites[-1]["tests"].extend(suite["tests"])
+            return
+        index = get_impact_index()
+        for test_id, test_codes, resources in suite["tests"]:
+            modules, locators = self.recorder.summarize(test_codes)
+            index.record("robot", test_id, modules, locators, resources)
+
+    def close(self):
+        self.recorder.stop()
+        get_impact_index().flush()
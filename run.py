@@ -25,6 +25,8 @@ except Exception:
         c.api_base_url = "http://localhost"
         return c
 
+from utils.run_commands import LEGACY_ROBOT_CMD, build_pytest_cmd, build_run_all_stages
+
 
 def create_reports_dir():
     reports_dir = Path("reports")
@@ -35,62 +37,24 @@ def create_reports_dir():
     print(f"✓ 报告目录已准备: {reports_dir}/ 和 {tmp_dir}/")
 
 
+# 分片执行默认的 Robot 目标，与 CI 非分片模式（scripts/ci_run.sh）一致
+SHARD_ROBOT_TARGET = "tests/robotframework/"
+
+
 def run_pytest_selenium():
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_UI",
-        "-m",
-        "selenium",
-        "-v",
-        "--html=tmp/pytest_selenium.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_UI", "tmp/pytest_selenium.html", marker="selenium"))
 
 
 def run_pytest_playwright():
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_UI",
-        "-m",
-        "playwright",
-        "-v",
-        "--html=tmp/pytest_playwright.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_UI", "tmp/pytest_playwright.html", marker="playwright"))
 
 
 def run_pytest_all():
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/",
-        "-v",
-        "--html=tmp/pytest_all.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/", "tmp/pytest_all.html"))
 
 
 def run_pytest_api():
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_API",
-        "-m",
-        "api",
-        "-v",
-        "--html=tmp/pytest_api.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_API", "tmp/pytest_api.html", marker="api"))
 
 
 def create_robot_reports_dir(output_dir: str):
@@ -101,13 +65,19 @@ def create_robot_reports_dir(output_dir: str):
 
 
 def build_robot_cmd_from_args(args: argparse.Namespace):
+    cmd = build_robot_base_cmd_from_args(args)
+    cmd[3:3] = ["--outputdir", args.output_dir]
+    cmd.append(get_robot_target(args))
+    return cmd
+
+
+def build_robot_base_cmd_from_args(args: argparse.Namespace):
+    # 不含输出目录和测试目标，并行模式下由各 worker 补充
     env_conf = get_env_config(args.env)
     cmd = [
         sys.executable,
         "-m",
         "robot",
-        "--outputdir",
-        args.output_dir,
         "--variable",
         f"ENV:{env_conf.name}",
         "--variable",
@@ -128,42 +98,89 @@ def build_robot_cmd_from_args(args: argparse.Namespace):
     listener_path = "listeners/web_listener.py"
     if Path(listener_path).exists():
         cmd += ["--listener", listener_path]
-    if args.test_type == "ui":
-        target = args.suite or "ui_tests/testsuites"
-    else:
-        target = args.suite or "api_tests/testsuites"
-    cmd.append(target)
+    if args.record_impact:
+        cmd += ["--listener", "listeners/impact_listener.py"]
     return cmd
 
 
+def get_robot_target(args: argparse.Namespace) -> str:
+    if args.test_type == "ui":
+        return args.suite or "ui_tests/testsuites"
+    return args.suite or "api_tests/testsuites"
+
+
 def run_robot_framework_with_args(args: argparse.Namespace):
     create_robot_reports_dir(args.output_dir)
+    if args.processes > 1:
+        # 多进程并行：按历史耗时拆分，各 worker 独立输出目录和浏览器，rebot 合并报告
+        from utils.robot_parallel import run_parallel
+
+        print(f"\n并行执行 Robot 用例（{args.processes} 个进程，按 {args.split_level} 拆分）")
+        rc = run_parallel(build_robot_base_cmd_from_args(args), get_robot_target(args), args.output_dir,
+                          args.processes, args.split_level, args.include, args.exclude)
+        return subprocess.CompletedProcess(args=[], returncode=rc)
     cmd = build_robot_cmd_from_args(args)
     print("\n即将执行 Robot 命令：")
     print(" ".join(cmd))
     return subprocess.run(cmd)
 
 
+def run_affected_tests(args: argparse.Namespace) -> int:
+    # 按测试影响索引只执行相对 --affected-since 改动受影响的 pytest 测试和 Robot 用例
+    from utils.impact_index import select_affected
+    from utils.robot_parallel import RobotParallelRunner, RobotUnit
+
+    selection = select_affected(args.affected_since)
+    print(f"相对 {args.affected_since} 改动 {len(selection.changed)} 个文件")
+    if selection.run_all:
+        print(f"执行全部测试：{selection.reason}")
+        pytest_targets = ["tests/"]
+        robot_units = [RobotUnit(get_robot_target(args))]
+    else:
+        pytest_targets = selection.pytest_targets
+        robot_units = []
+        for source, names in selection.robot_tests.items():
+            robot_units += [RobotUnit(source)] if names is None else [RobotUnit(source, name) for name in names]
+        print(f"受影响: {len(pytest_targets)} 个 pytest 目标，{len(robot_units)} 个 Robot 单元")
+
+    create_robot_reports_dir(args.output_dir)
+    returncode = 0
+    if pytest_targets:
+        cmd = [sys.executable, "-m", "pytest", *pytest_targets, "-v",
+               f"--html={args.output_dir}/pytest_affected.html", "--self-contained-html"]
+        if args.record_impact:
+            cmd.append("--record-impact")
+        returncode = subprocess.run(cmd).returncode
+    if robot_units:
+        runner = RobotParallelRunner(build_robot_base_cmd_from_args(args), args.output_dir, args.processes)
+        returncode = max(returncode, runner.run(robot_units, name="Affected Tests"))
+    if not pytest_targets and not robot_units:
+        print("没有受影响的测试")
+    return returncode
+
+
+def run_shard_from_args(args: argparse.Namespace) -> int:
+    # 按历史耗时划分 pytest 测试和 Robot 单元，只执行第 i 个分片，结果写到 <output-dir>/shards/shard_<i>
+    from utils.robot_parallel import discover_units
+    from utils.sharding import collect_pytest, parse_shard, run_shard
+
+    index, total = parse_shard(args.shard)
+    pytest_ids = collect_pytest(["tests/"])
+    try:
+        robot_units = discover_units(args.suite or SHARD_ROBOT_TARGET, args.split_level, args.include, args.exclude)
+    except ImportError:
+        print("未安装 robotframework，跳过 Robot 用例")
+        robot_units = []
+    return run_shard(index, total, pytest_ids, build_robot_base_cmd_from_args(args), robot_units,
+                     args.output_dir, args.processes)
+
+
 def run_all_tests_interactive():
+    # 在 CPU / 内存 / 浏览器槽位限制下并发执行各阶段，输出带阶段前缀，结束后统一汇总
+    from utils.pipeline_orchestrator import run_pipeline
+
     create_reports_dir()
-    results = []
-    print("--- pytest Selenium ---")
-    result1 = run_pytest_selenium()
-    results.append(("pytest Selenium", result1.returncode))
-    print("\n--- pytest Playwright ---")
-    result2 = run_pytest_playwright()
-    results.append(("pytest Playwright", result2.returncode))
-    print("\n--- pytest API ---")
-    result_api = run_pytest_api()
-    results.append(("pytest API", result_api.returncode))
-    print("\n--- Robot Framework ---")
-    result3 = subprocess.run([sys.executable, "-m", "robot", "--outputdir", "tmp", "tests/robotframework/"])
-    results.append(("Robot Framework", result3.returncode))
-    print("\n测试执行总结")
-    for test_name, returncode in results:
-        status = "✓ 通过" if returncode == 0 else "✗ 失败"
-        print(f"{test_name}: {status}")
-    return all(code == 0 for _, code in results)
+    return run_pipeline(build_run_all_stages())
 
 
 def interactive_menu():
@@ -197,7 +214,7 @@ def interactive_menu():
             if r.returncode != 0:
                 print("pytest 全部测试失败")
         elif choice == "5":
-            subprocess.run([sys.executable, "-m", "robot", "--outputdir", "tmp", "tests/robotframework/"])
+            subprocess.run(LEGACY_ROBOT_CMD)
         elif choice == "6":
             if not run_all_tests_interactive():
                 print("部分测试失败，请查看 tmp/ 下报告")
@@ -218,6 +235,13 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--suite")
     parser.add_argument("--headless", action="store_true")
     parser.add_argument("--output-dir", default=str(Path("tmp")))
+    parser.add_argument("--processes", type=int, default=1, help="并行执行的 Robot 进程数")
+    parser.add_argument("--split-level", choices=["suite", "test"], default="suite", help="并行拆分粒度")
+    parser.add_argument("--record-impact", action="store_true", help="记录每个用例触及的模块/定位器/资源文件到测试影响索引")
+    parser.add_argument("--affected-since", metavar="GIT_REV", help="只执行相对该 git 版本的改动受影响的测试")
+    parser.add_argument("--shard", metavar="I/N",
+                        help=f"按历史耗时把 pytest 与 Robot 测试划分为 N 片，只执行第 I 片（Robot 默认 {SHARD_ROBOT_TARGET}）")
+    parser.add_argument("--merge-shards", action="store_true", help="合并 <output-dir>/shards 下各分片的结果")
     return parser.parse_args()
 
 
@@ -225,6 +249,14 @@ def main() -> None:
     # 如果有命令行参数则走 CLI，否则进入交互式菜单
     if len(sys.argv) > 1:
         args = parse_args()
+        if args.merge_shards:
+            from utils.sharding import merge_shards
+
+            sys.exit(merge_shards(str(Path(args.output_dir) / "shards")))
+        if args.shard:
+            sys.exit(run_shard_from_args(args))
+        if args.affected_since:
+            sys.exit(run_affected_tests(args))
         if args.test_type:
             run_robot_framework_with_args(args)
         else:
@@ -21,6 +21,7 @@ import subprocess
 from pathlib import Path
 
 from config.settings import REPORTS_DIR, get_env_config
+from utils.run_commands import LEGACY_ROBOT_CMD, build_pytest_cmd, build_run_all_stages
 
 
 def create_reports_dir() -> None:
@@ -48,115 +49,42 @@ def create_robot_reports_dir(output_dir: str) -> Path:
 def run_pytest_selenium():
     """运行 pytest Selenium 测试"""
     print("\n运行 pytest Selenium 测试...")
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_UI",
-        "-m",
-        "selenium",
-        "-v",
-        "--html=tmp/pytest_selenium.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_UI", "tmp/pytest_selenium.html", marker="selenium"))
 
 
 def run_pytest_playwright():
     """运行 pytest Playwright 测试"""
     print("\n运行 pytest Playwright 测试...")
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_UI",
-        "-m",
-        "playwright",
-        "-v",
-        "--html=tmp/pytest_playwright.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_UI", "tmp/pytest_playwright.html", marker="playwright"))
 
 
 def run_pytest_all():
     """运行所有 pytest 测试"""
     print("\n运行所有 pytest 测试...")
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/",
-        "-v",
-        "--html=tmp/pytest_all.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/", "tmp/pytest_all.html"))
 
 
 def run_pytest_api():
     """运行 API 测试"""
     print("\n运行 API 测试...")
-    cmd = [
-        sys.executable,
-        "-m",
-        "pytest",
-        "tests/test_API",
-        "-m",
-        "api",
-        "-v",
-        "--html=tmp/pytest_api.html",
-        "--self-contained-html",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(build_pytest_cmd("tests/test_API", "tmp/pytest_api.html", marker="api"))
 
 
 def run_robot_framework_legacy():
     """运行 Robot Framework 测试（旧版，交互式菜单使用）"""
     print("\n运行 Robot Framework 测试...")
-    cmd = [
-        sys.executable,
-        "-m",
-        "robot",
-        "--outputdir",
-        "tmp",
-        "tests/robotframework/",
-    ]
-    return subprocess.run(cmd)
+    return subprocess.run(LEGACY_ROBOT_CMD)
 
 
 def run_all_tests():
-    """运行所有测试"""
+    """运行所有测试（各阶段在 CPU / 内存 / 浏览器槽位限制下并发执行）"""
+    from utils.pipeline_orchestrator import run_pipeline
+
     print("\n========================================")
     print("运行全部测试")
     print("========================================\n")
 
-    results = []
-
-    print("--- pytest Selenium ---")
-    result1 = run_pytest_selenium()
-    results.append(("pytest Selenium", result1.returncode))
-
-    print("\n--- pytest Playwright ---")
-    result2 = run_pytest_playwright()
-    results.append(("pytest Playwright", result2.returncode))
-
-    print("\n--- pytest API ---")
-    result_api = run_pytest_api()
-    results.append(("pytest API", result_api.returncode))
-
-    print("\n--- Robot Framework ---")
-    result3 = run_robot_framework_legacy()
-    results.append(("Robot Framework", result3.returncode))
-
-    print("\n========================================")
-    print("测试执行总结")
-    print("========================================")
-    for test_name, returncode in results:
-        status = "✓ 通过" if returncode == 0 else "✗ 失败"
-        print(f"{test_name}: {status}")
-
-    return all(code == 0 for _, code in results)
+    return run_pipeline(build_run_all_stages())
 
 
 # ========== Robot Framework 命令行参数模式相关函数 ==========
@@ -177,6 +105,9 @@ def parse_args() -> argparse.Namespace:
   # 运行指定 suite
   python run_tests.py --test-type ui --suite ui_tests/testsuites/user/user_login_tests.robot
 
+  # 4 个进程并行执行（按历史耗时拆分，rebot 合并报告）
+  python run_tests.py --test-type ui --suite tests/ui_layer/testsuites --processes 4
+
 交互式菜单模式:
   # 直接运行（无参数）进入交互式菜单
   python run_tests.py
@@ -228,20 +159,38 @@ def parse_args() -> argparse.Namespace:
         default=str(Path("tmp")),
         help="Robot 报告输出目录，默认 tmp",
     )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="并行执行的 Robot 进程数，大于 1 时按历史耗时拆分并用 rebot 合并报告，默认 1",
+    )
+    parser.add_argument(
+        "--split-level",
+        choices=["suite", "test"],
+        default="suite",
+        help="并行拆分粒度：suite（按 suite 文件）或 test（按用例），默认 suite",
+    )
 
     return parser.parse_args()
 
 
 def build_robot_cmd(args: argparse.Namespace) -> list:
     """根据参数构建 Robot Framework 命令"""
+    cmd = build_robot_base_cmd(args)
+    cmd[3:3] = ["--outputdir", args.output_dir]
+    cmd.append(get_robot_target(args))
+    return cmd
+
+
+def build_robot_base_cmd(args: argparse.Namespace) -> list:
+    """构建不含输出目录和测试目标的 Robot 命令（并行模式下由各 worker 补充）"""
     env_conf = get_env_config(args.env)
 
     cmd = [
         sys.executable,
         "-m",
         "robot",
-        "--outputdir",
-        args.output_dir,
         "--variable",
         f"ENV:{env_conf.name}",
         "--variable",
@@ -268,16 +217,16 @@ def build_robot_cmd(args: argparse.Namespace) -> list:
     if Path(listener_path).exists():
         cmd += ["--listener", listener_path]
 
-    # 选择测试目标路径
-    if args.test_type == "ui":
-        target = args.suite or "ui_tests/testsuites"
-    else:
-        target = args.suite or "api_tests/testsuites"
-
-    cmd.append(target)
     return cmd
 
 
+def get_robot_target(args: argparse.Namespace) -> str:
+    """选择测试目标路径"""
+    if args.test_type == "ui":
+        return args.suite or "ui_tests/testsuites"
+    return args.suite or "api_tests/testsuites"
+
+
 # ========== 交互式菜单模式 ==========
 
 def display_menu():
@@ -366,6 +315,14 @@ def run_command_line_mode(args: argparse.Namespace) -> None:
     # 创建报告目录
     create_robot_reports_dir(args.output_dir)
 
+    # 多进程并行：按历史耗时拆分 suite/用例，各 worker 独立输出目录，结束后 rebot 合并报告
+    if args.processes > 1:
+        from utils.robot_parallel import run_parallel
+
+        print(f"\n并行执行 Robot 用例（{args.processes} 个进程，按 {args.split_level} 拆分）")
+        sys.exit(run_parallel(build_robot_base_cmd(args), get_robot_target(args), args.output_dir,
+                              args.processes, args.split_level, args.include, args.exclude))
+
     # 构建并执行 Robot 命令
     cmd = build_robot_cmd(args)
     print("\n即将执行命令：")
@@ -2,6 +2,8 @@
 set -euo pipefail
 
 # Non-interactive CI runner: installs deps, runs pytest and robot, and packages reports
+# Sharded mode: SHARD=i/N runs only shard i of N (partitioned by recorded durations),
+#               MERGE_SHARDS=true merges reports/shards/shard_* into reports/shards/merged
 ROOT_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 cd "$ROOT_DIR"
 
@@ -14,11 +16,19 @@ python3 -m playwright install
 
 mkdir -p reports
 
-echo "== Run pytest =="
-python3 -m pytest tests/ -v --html=reports/pytest_report.html --self-contained-html || true
-
-echo "== Run Robot Framework =="
-python3 -m robot --outputdir reports/robotframework tests/robotframework/ || true
+if [[ "${MERGE_SHARDS:-false}" == "true" ]]; then
+  echo "== Merge shard reports =="
+  python3 run.py --merge-shards --output-dir reports || true
+elif [[ -n "${SHARD:-}" ]]; then
+  echo "== Run shard ${SHARD} =="
+  python3 run.py --shard "${SHARD}" --output-dir reports --headless || true
+else
+  echo "== Run pytest =="
+  python3 -m pytest tests/ -v --html=reports/pytest_report.html --self-contained-html || true
+
+  echo "== Run Robot Framework =="
+  python3 -m robot --outputdir reports/robotframework tests/robotframework/ || true
+fi
 
 echo "== Package reports =="
 REPORT_ZIP=reports/test_reports_$(date +%Y%m%d%H%M%S).zip
@@ -2,8 +2,13 @@
 """
 API 测试用例配置
 定义各个 API 测试的详细配置
+由 utils.api_engine 并发执行（tests/api_layer/test_api_engine.py），json 为请求体
 """
 
+from tests.api_layer.data.user_data import UserTestData
+from tests.api_layer.data.post_data import PostTestData
+
+
 class APITestCaseConfig:
     """API 测试用例配置"""
     
@@ -33,6 +38,7 @@ class APITestCaseConfig:
         'method': 'POST',
         'endpoint': '/api/users',
         'base_url': 'https://reqres.in',
+        'json': UserTestData.NEW_USER,
         'expected_status': 201,
         'expected_fields': ['id', 'createdAt']
     }
@@ -43,6 +49,7 @@ class APITestCaseConfig:
         'endpoint': '/api/users/{id}',
         'base_url': 'https://reqres.in',
         'params': {'id': 1},
+        'json': UserTestData.UPDATED_USER,
         'expected_status': 200,
         'expected_fields': ['updatedAt']
     }
@@ -61,6 +68,7 @@ class APITestCaseConfig:
         'method': 'POST',
         'endpoint': '/api/login',
         'base_url': 'https://reqres.in',
+        'json': UserTestData.VALID_LOGIN,
         'expected_status': 200,
         'expected_fields': ['token']
     }
@@ -70,6 +78,7 @@ class APITestCaseConfig:
         'method': 'POST',
         'endpoint': '/api/login',
         'base_url': 'https://reqres.in',
+        'json': UserTestData.INVALID_LOGIN_NO_PASSWORD,
         'expected_status': 400,
         'expected_fields': ['error']
     }
@@ -89,6 +98,7 @@ class APITestCaseConfig:
         'method': 'POST',
         'endpoint': '/posts',
         'base_url': 'https://jsonplaceholder.typicode.com',
+        'json': PostTestData.JP_NEW_POST,
         'expected_status': 201,
         'expected_fields': ['id']
     }
@@ -108,6 +118,7 @@ class APITestCaseConfig:
         'method': 'POST',
         'endpoint': '/post',
         'base_url': 'https://httpbin.org',
+        'json': PostTestData.NEW_POST,
         'expected_status': 200,
         'expected_fields': ['url', 'json', 'headers']
     }
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+数据驱动 API 测试
+APITestCaseConfig 中的全部用例由 APIEngine 并发执行一次，每个用例对应一个 pytest 测试结果
+"""
+
+import pytest
+
+from tests.api_layer.config.testcase_config import APITestCaseConfig
+from tests.api_layer.config.api_config import APIConfig
+from utils.api_engine import APIEngine, load_cases
+
+CASES = load_cases(APITestCaseConfig)
+
+
+@pytest.fixture(scope="module")
+def api_results(request):
+    """并发执行本次选中的用例（-k 过滤后），模块内共享结果"""
+    selected = {item.callspec.id for item in request.session.items
+                if item.module is request.module and hasattr(item, "callspec")}
+    with APIEngine(headers=APIConfig.DEFAULT_HEADERS) as engine:
+        yield engine.run([case for case in CASES if case.id in selected])
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("case", CASES, ids=[case.id for case in CASES])
+def test_api_case(case, api_results):
+    """校验用例的状态码和响应字段"""
+    result = api_results[case.id]
+    assert result.passed, result.describe()
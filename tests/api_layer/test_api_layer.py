@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 """
 API 层测试 - Python 版本
-使用 pytest 和 requests 库
+使用 pytest 和会话级 api_client（连接池会话）
 """
 
 import pytest
-import requests
-from tests.api_layer.config.api_config import APIConfig, HTTPMethod, ResponseStatus, APIEndpoints
+from tests.api_layer.config.api_config import HTTPMethod, ResponseStatus, APIEndpoints
 from tests.api_layer.data.user_data import UserTestData
 from tests.api_layer.data.post_data import PostTestData
 from tests.api_layer.data.common_data import CommonTestData, generate_user_data
@@ -16,13 +15,10 @@ class TestReqResAPI:
     """ReqRes API 测试类"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """测试前置条件"""
+    def setup(self, api_client):
+        """测试前置条件：复用会话级连接池客户端"""
         self.base_url = APIEndpoints.REQRES['base']
-        self.session = requests.Session()
-        self.session.headers.update(APIConfig.DEFAULT_HEADERS)
-        yield
-        self.session.close()
+        self.session = api_client
     
     def test_get_users(self):
         """测试获取用户列表"""
@@ -107,13 +103,10 @@ class TestHTTPBinAPI:
     """HTTPBin API 测试类"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """测试前置条件"""
+    def setup(self, api_client):
+        """测试前置条件：复用会话级连接池客户端"""
         self.base_url = APIEndpoints.HTTPBIN['base']
-        self.session = requests.Session()
-        self.session.headers.update(APIConfig.DEFAULT_HEADERS)
-        yield
-        self.session.close()
+        self.session = api_client
     
     def test_get_request(self):
         """测试 GET 请求"""
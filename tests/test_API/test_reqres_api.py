@@ -1,11 +1,8 @@
 """
 接口测试示例：基于 https://reqres.in 提供的公开接口
+请求通过会话级 api_client 发送（相对路径拼接 API_BASE_URL），复用 keep-alive 连接
 """
 import pytest
-import requests
-import config.settings as settings
-
-API_BASE = settings.API_BASE_URL.rstrip("/")
 
 
 @pytest.mark.api
@@ -16,9 +13,9 @@ API_BASE = settings.API_BASE_URL.rstrip("/")
         (2, 7),
     ],
 )
-def test_list_users(page, expected_first_id):
+def test_list_users(api_client, page, expected_first_id):
     """分页获取用户列表"""
-    resp = requests.get(f"{API_BASE}/users", params={"page": page}, timeout=10)
+    resp = api_client.get("/users", params={"page": page})
     assert resp.status_code == 200
     data = resp.json()
     assert data["page"] == page
@@ -34,9 +31,9 @@ def test_list_users(page, expected_first_id):
         ("neo", "the one"),
     ],
 )
-def test_create_user(name, job):
+def test_create_user(api_client, name, job):
     """创建用户"""
-    resp = requests.post(f"{API_BASE}/users", json={"name": name, "job": job}, timeout=10)
+    resp = api_client.post("/users", json={"name": name, "job": job})
     assert resp.status_code == 201
     body = resp.json()
     assert body["name"] == name
@@ -52,10 +49,10 @@ def test_create_user(name, job):
         ("invalid@example.com", False),
     ],
 )
-def test_login(email, should_pass):
+def test_login(api_client, email, should_pass):
     """登录接口（校验成功/失败场景）"""
     payload = {"email": email, "password": "cityslicka"}
-    resp = requests.post(f"{API_BASE}/login", json=payload, timeout=10)
+    resp = api_client.post("/login", json=payload)
     if should_pass:
         assert resp.status_code == 200
         assert "token" in resp.json()
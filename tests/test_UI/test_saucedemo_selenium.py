@@ -65,3 +65,51 @@ class TestSauceDemoSelenium:
         helper.wait_for_element_visible("css", ".summary_info")
         assert "checkout-step-two" in helper.get_current_url()
 
+    def test_checkout_form_batch_fill(self, selenium_driver, base_url):
+        """批量填写结账表单：一次脚本设置全部字段，页面状态能感知到输入（缺字段时无法继续）"""
+        helper = selenium_driver
+        self._open_checkout(helper, base_url)
+
+        helper.fill_form({
+            ("id", "first-name"): "Auto",
+            ("id", "last-name"): "Tester",
+            ("id", "postal-code"): "12345",
+        })
+        helper.click("id", "continue")
+
+        helper.wait_for_element_visible("css", ".summary_info")
+        assert "checkout-step-two" in helper.get_current_url()
+
+    def test_checkout_overview_batch_read(self, selenium_driver, base_url):
+        """一次脚本调用读取结账概览页的多个文本"""
+        helper = selenium_driver
+        self._open_checkout(helper, base_url)
+        helper.fill_form({
+            ("id", "first-name"): "Auto",
+            ("id", "last-name"): "Tester",
+            ("id", "postal-code"): "12345",
+        })
+        helper.click("id", "continue")
+        helper.wait_for_element_visible("css", ".summary_info")
+
+        item_name, subtotal = helper.get_texts([
+            ("css", ".inventory_item_name"),
+            ("css", ".summary_subtotal_label"),
+        ])
+        assert item_name == "Sauce Labs Backpack"
+        assert "29.99" in subtotal
+
+    @staticmethod
+    def _open_checkout(helper, base_url):
+        """登录、加入商品并进入结账信息页"""
+        helper.navigate_to(base_url)
+        helper.wait_for_element_visible("id", "user-name")
+        helper.input_text("id", "user-name", "standard_user")
+        helper.input_text("id", "password", "secret_sauce")
+        helper.click("id", "login-button")
+        helper.wait_for_element_visible("css", "button[data-test='add-to-cart-sauce-labs-backpack']")
+        helper.click("css", "button[data-test='add-to-cart-sauce-labs-backpack']")
+        helper.click("css", ".shopping_cart_link")
+        helper.wait_for_element_visible("css", ".cart_list")
+        helper.click("id", "checkout")
+        helper.wait_for_element_visible("id", "first-name")
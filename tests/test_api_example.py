@@ -1,6 +1,6 @@
 """
 API 测试示例
-使用 requests 库进行 HTTP API 测试，包括 GET、POST、请求头验证等
+使用会话级 api_client（连接池会话）进行 HTTP API 测试，包括 GET、POST、请求头验证等
 """
 import pytest
 import requests
@@ -16,12 +16,12 @@ class TestAPIBasic:
     
     @pytest.mark.api
     @pytest.mark.smoke
-    def test_get_request(self):
+    def test_get_request(self, api_client):
         """
         测试 GET 请求
         示例：获取 IP 信息
         """
-        response = requests.get(f"{API_BASE_URL}/ip")
+        response = api_client.get(f"{API_BASE_URL}/ip")
         
         # 验证状态码
         assert response.status_code == 200, f"状态码不正确: {response.status_code}"
@@ -32,7 +32,7 @@ class TestAPIBasic:
         assert data["origin"], "IP 地址为空"
     
     @pytest.mark.api
-    def test_post_request(self):
+    def test_post_request(self, api_client):
         """
         测试 POST 请求
         示例：提交 JSON 数据
@@ -43,7 +43,7 @@ class TestAPIBasic:
             "age": 25
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/post",
             json=payload,
             headers={"Content-Type": "application/json"}
@@ -58,7 +58,7 @@ class TestAPIBasic:
         assert data["json"]["email"] == payload["email"]
     
     @pytest.mark.api
-    def test_put_request(self):
+    def test_put_request(self, api_client):
         """
         测试 PUT 请求
         示例：更新资源
@@ -69,7 +69,7 @@ class TestAPIBasic:
             "completed": True
         }
         
-        response = requests.put(
+        response = api_client.put(
             f"{API_BASE_URL}/put",
             json=payload
         )
@@ -79,18 +79,18 @@ class TestAPIBasic:
         assert data["json"]["title"] == payload["title"]
     
     @pytest.mark.api
-    def test_delete_request(self):
+    def test_delete_request(self, api_client):
         """
         测试 DELETE 请求
         """
-        response = requests.delete(f"{API_BASE_URL}/delete")
+        response = api_client.delete(f"{API_BASE_URL}/delete")
         
         assert response.status_code == 200
         data = response.json()
         assert "url" in data
     
     @pytest.mark.api
-    def test_request_with_headers(self):
+    def test_request_with_headers(self, api_client):
         """
         测试带自定义请求头的请求
         """
@@ -100,7 +100,7 @@ class TestAPIBasic:
             "Custom-Header": "Custom-Value"
         }
         
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/headers",
             headers=headers
         )
@@ -114,7 +114,7 @@ class TestAPIBasic:
         assert data["headers"]["Custom-Header"] == "Custom-Value"
     
     @pytest.mark.api
-    def test_request_with_query_params(self):
+    def test_request_with_query_params(self, api_client):
         """
         测试带查询参数的请求
         """
@@ -124,7 +124,7 @@ class TestAPIBasic:
             "sort": "name"
         }
         
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/get",
             params=params
         )
@@ -138,11 +138,11 @@ class TestAPIBasic:
         assert data["args"]["sort"] == "name"
     
     @pytest.mark.api
-    def test_response_content_type(self):
+    def test_response_content_type(self, api_client):
         """
         测试响应内容类型
         """
-        response = requests.get(f"{API_BASE_URL}/json")
+        response = api_client.get(f"{API_BASE_URL}/json")
         
         # 验证 Content-Type
         assert "application/json" in response.headers.get("Content-Type", "")
@@ -152,12 +152,12 @@ class TestAPIBasic:
         assert isinstance(data, dict)
     
     @pytest.mark.api
-    def test_response_headers(self):
+    def test_response_headers(self, api_client):
         """
         测试响应头
         """
-        response = requests.get(f"{API_BASE_URL}/response-headers", 
-                               params={"Custom-Header": "test-value"})
+        response = api_client.get(f"{API_BASE_URL}/response-headers", 
+                                 params={"Custom-Header": "test-value"})
         
         assert response.status_code == 200
         
@@ -169,49 +169,49 @@ class TestAPIErrorHandling:
     """API 错误处理测试"""
     
     @pytest.mark.api
-    def test_404_not_found(self):
+    def test_404_not_found(self, api_client):
         """
         测试 404 错误处理
         """
-        response = requests.get(f"{API_BASE_URL}/status/404")
+        response = api_client.get(f"{API_BASE_URL}/status/404")
         
         assert response.status_code == 404
     
     @pytest.mark.api
-    def test_500_server_error(self):
+    def test_500_server_error(self, api_client):
         """
         测试 500 错误处理
         """
-        response = requests.get(f"{API_BASE_URL}/status/500")
+        response = api_client.get(f"{API_BASE_URL}/status/500")
         
         assert response.status_code == 500
     
     @pytest.mark.api
-    def test_timeout_handling(self):
+    def test_timeout_handling(self, api_client):
         """
         测试超时处理
         """
         with pytest.raises(requests.exceptions.Timeout):
             # 设置 1ms 超时，会导致超时
-            requests.get(
+            api_client.get(
                 f"{API_BASE_URL}/delay/10",
                 timeout=0.001
             )
     
     @pytest.mark.api
-    def test_connection_error(self):
+    def test_connection_error(self, api_client):
         """
         测试连接错误处理
         """
         with pytest.raises(requests.exceptions.ConnectionError):
-            requests.get("http://invalid-domain-that-does-not-exist.com")
+            api_client.get("http://invalid-domain-that-does-not-exist.com")
     
     @pytest.mark.api
-    def test_invalid_json_response(self):
+    def test_invalid_json_response(self, api_client):
         """
         测试无效 JSON 响应处理
         """
-        response = requests.get(f"{API_BASE_URL}/html")
+        response = api_client.get(f"{API_BASE_URL}/html")
         
         # 验证响应是 HTML 而不是 JSON
         with pytest.raises(json.JSONDecodeError):
@@ -222,7 +222,7 @@ class TestAPIAdvanced:
     """高级 API 测试"""
     
     @pytest.mark.api
-    def test_form_data_submission(self):
+    def test_form_data_submission(self, api_client):
         """
         测试 Form 数据提交
         """
@@ -232,7 +232,7 @@ class TestAPIAdvanced:
             "remember": "on"
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/post",
             data=data
         )
@@ -242,7 +242,7 @@ class TestAPIAdvanced:
         assert result["form"]["username"] == "testuser"
     
     @pytest.mark.api
-    def test_file_upload(self):
+    def test_file_upload(self, api_client):
         """
         测试文件上传
         """
@@ -250,7 +250,7 @@ class TestAPIAdvanced:
             "file": ("test.txt", "This is test content", "text/plain")
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/post",
             files=files
         )
@@ -258,25 +258,23 @@ class TestAPIAdvanced:
         assert response.status_code == 200
     
     @pytest.mark.api
-    def test_cookie_handling(self):
+    def test_cookie_handling(self, api_client):
         """
         测试 Cookie 处理
         """
-        session = requests.Session()
-        
         # 第一个请求设置 Cookie
-        response1 = requests.get(f"{API_BASE_URL}/cookies/set", params={"test": "value"})
+        response1 = api_client.get(f"{API_BASE_URL}/cookies/set", params={"test": "value"})
         
         # 验证请求成功
         assert response1.status_code == 200
     
     @pytest.mark.api
-    def test_redirect_handling(self):
+    def test_redirect_handling(self, api_client):
         """
         测试重定向处理
         """
         # 跟随重定向
-        response = requests.get(f"{API_BASE_URL}/redirect/3", allow_redirects=True)
+        response = api_client.get(f"{API_BASE_URL}/redirect/3", allow_redirects=True)
         
         assert response.status_code == 200
         assert response.history, "没有检测到重定向"
@@ -285,7 +283,7 @@ class TestAPIAdvanced:
         assert len(response.history) >= 1
     
     @pytest.mark.api
-    def test_concurrent_requests(self):
+    def test_concurrent_requests(self, api_client):
         """
         测试并发请求
         """
@@ -293,8 +291,8 @@ class TestAPIAdvanced:
         import time
         
         def make_request(request_num):
-            response = requests.get(f"{API_BASE_URL}/get", 
-                                   params={"request_num": request_num})
+            response = api_client.get(f"{API_BASE_URL}/get", 
+                                     params={"request_num": request_num})
             return response.status_code == 200
         
         # 并发发送 5 个请求
@@ -305,17 +303,17 @@ class TestAPIAdvanced:
         assert all(results), "某些并发请求失败"
     
     @pytest.mark.api
-    def test_response_time(self):
+    def test_response_time(self, api_client):
         """
         测试响应时间
         """
-        response = requests.get(f"{API_BASE_URL}/get")
+        response = api_client.get(f"{API_BASE_URL}/get")
         
         # 响应时间通常在毫秒级别
         assert response.elapsed.total_seconds() < 30, "响应时间过长"
     
     @pytest.mark.api
-    def test_large_payload(self):
+    def test_large_payload(self, api_client):
         """
         测试大型数据负载
         """
@@ -324,7 +322,7 @@ class TestAPIAdvanced:
             f"key_{i}": f"value_{i}" * 100 for i in range(100)
         }
         
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/post",
             json=large_data
         )
@@ -334,7 +332,7 @@ class TestAPIAdvanced:
         assert len(result["json"]) == 100
     
     @pytest.mark.api
-    def test_batch_api_calls(self):
+    def test_batch_api_calls(self, api_client):
         """
         测试批量 API 调用
         """
@@ -342,7 +340,7 @@ class TestAPIAdvanced:
         
         # 连续发送多个请求
         for i in range(5):
-            response = requests.get(f"{API_BASE_URL}/get", params={"index": i})
+            response = api_client.get(f"{API_BASE_URL}/get", params={"index": i})
             results.append(response.status_code == 200)
         
         assert all(results), "批量请求失败"
@@ -352,11 +350,11 @@ class TestAPIDataValidation:
     """API 数据验证测试"""
     
     @pytest.mark.api
-    def test_response_schema_validation(self):
+    def test_response_schema_validation(self, api_client):
         """
         测试响应数据格式验证
         """
-        response = requests.get(f"{API_BASE_URL}/get")
+        response = api_client.get(f"{API_BASE_URL}/get")
         data = response.json()
         
         # 验证必需字段
@@ -365,11 +363,11 @@ class TestAPIDataValidation:
             assert field in data, f"缺少必需字段: {field}"
     
     @pytest.mark.api
-    def test_data_type_validation(self):
+    def test_data_type_validation(self, api_client):
         """
         测试数据类型验证
         """
-        response = requests.get(f"{API_BASE_URL}/get")
+        response = api_client.get(f"{API_BASE_URL}/get")
         data = response.json()
         
         # 验证字段类型
@@ -378,23 +376,23 @@ class TestAPIDataValidation:
         assert isinstance(data["url"], str)
     
     @pytest.mark.api
-    def test_response_encoding(self):
+    def test_response_encoding(self, api_client):
         """
         测试响应编码
         """
-        response = requests.get(f"{API_BASE_URL}/get")
+        response = api_client.get(f"{API_BASE_URL}/get")
         
         # 验证字符编码
         assert response.encoding is not None
         assert "utf" in response.encoding.lower()
     
     @pytest.mark.api
-    def test_empty_response_handling(self):
+    def test_empty_response_handling(self, api_client):
         """
         测试空响应处理
         """
         # 有些 API 可能返回空响应或空 JSON
-        response = requests.get(f"{API_BASE_URL}/get")
+        response = api_client.get(f"{API_BASE_URL}/get")
         
         # 验证至少有一些内容
         assert response.text
@@ -5,10 +5,56 @@
 测试新增的工具类和功能
 """
 
+import asyncio
+import io
+import json
+import os
+import shutil
+import sys
+import time
 import pytest
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import config.settings as settings
 from utils.retry_decorator import retry_on_failure
 from utils.test_data_manager import TestDataManager
+from utils.driver_cache import DriverBinaryCache
+from utils import driver_pool
+from utils.driver_pool import SeleniumDriverPool
+from utils.auth_state import AuthStateCache
+from utils import playwright_helper, shared_playwright
+from utils.playwright_helper import ContextPrewarmer, PlaywrightHelper
+from utils.shared_playwright import SharedPlaywright
+from utils.resource_blocking import ResourceBlocker, cdp_blocked_urls, get_profile
+from utils.har_replay import HarSession, har_path
+from utils.bulk_extract import parse_field, parse_price
+from utils.page_snapshot import PageSnapshot, SnapshotCache
+from utils.form_fill import plan_fields, selenium_batch_fill, selenium_query
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from utils.wait_engine import WaitEngine, dom_query
+from utils.locator_registry import LocatorCache, compile_locator, playwright_selector, selenium_by
+from tests.ui_layer.locators.base_locators import BaseLocators
+from utils.selenium_helper import SeleniumHelper
+from utils.adaptive_timeout import AdaptiveTimeoutPolicy, TimingStore, quantile, timing_key
+from utils.dom_probe import DomProbe, check_mode
+from utils.ui_operations import UIOperations
+from utils import async_ui_operations
+from utils.async_ui_operations import AsyncUIOperations
+from utils.async_business_operations import AsyncSauceDemoOperations
+from utils.duration_store import DurationStore, lpt_plan
+from utils import robot_parallel
+from utils.robot_parallel import RobotParallelRunner, RobotUnit, UnitResult, merge_groups, unit_command
+from utils.pipeline_orchestrator import PipelineOrchestrator, ResourceLimits, Stage, format_summary
+from utils.run_commands import build_run_all_stages
+from utils.impact_index import ChangeSet, CodeRecorder, ImpactIndex, locator_changes
+from listeners import impact_listener
+from utils import sharding
+from utils.sharding import (PYTEST_PREFIX, collect_pytest, load_or_create_plan, merge_junit, merge_shards,
+                            parse_shard, plan_shards)
+from utils.api_engine import APIEngine, build_case, load_cases, validate
+from utils.http_client import create_session
+from utils import robot_api_sessions
 
 logging.basicConfig(level=logging.INFO)
 
@@ -139,6 +185,1597 @@ class TestTestDataManager:
         assert address["country"] == "中国"
 
 
+class TestDriverBinaryCache:
+    """驱动路径缓存测试"""
+    
+    @pytest.fixture
+    def fake_driver(self, tmp_path, monkeypatch):
+        """在临时 PATH 中放置一个假的 chromedriver"""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        driver = bin_dir / "chromedriver"
+        driver.write_text("#!/bin/sh\n")
+        driver.chmod(0o755)
+        monkeypatch.setenv("PATH", str(bin_dir))
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+        monkeypatch.setattr("utils.driver_cache.detect_browser_version", lambda browser: "121.0.0.0")
+        return driver
+    
+    def test_offline_resolves_from_path_and_persists(self, tmp_path, fake_driver):
+        """测试离线模式从 PATH 解析并写入磁盘缓存"""
+        cache = DriverBinaryCache(cache_dir=tmp_path / "cache", offline=True)
+        assert cache.resolve("chrome") == str(fake_driver)
+        assert str(fake_driver) in (tmp_path / "cache" / "drivers.json").read_text()
+    
+    def test_second_process_hits_disk_cache(self, tmp_path, fake_driver, monkeypatch):
+        """测试新的缓存实例（模拟其它进程）直接命中磁盘缓存"""
+        DriverBinaryCache(cache_dir=tmp_path / "cache", offline=True).resolve("chrome")
+        monkeypatch.setenv("PATH", "")
+        cache = DriverBinaryCache(cache_dir=tmp_path / "cache", offline=True)
+        assert cache.resolve("chrome") == str(fake_driver)
+    
+    def test_offline_without_driver_raises(self, tmp_path, monkeypatch):
+        """测试离线模式下找不到驱动时直接报错而不访问网络"""
+        monkeypatch.setenv("PATH", "")
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+        monkeypatch.setattr("utils.driver_cache.detect_browser_version", lambda browser: "121.0.0.0")
+        cache = DriverBinaryCache(cache_dir=tmp_path / "cache", offline=True)
+        with pytest.raises(RuntimeError, match="离线模式"):
+            cache.resolve("chrome")
+
+
+class TestResourceBlocking:
+    """网络资源屏蔽测试"""
+    
+    def test_functional_fast_blocks_images_and_analytics(self):
+        """测试 functional-fast 按资源类型和 URL 模式屏蔽"""
+        blocker = ResourceBlocker("functional-fast")
+        assert blocker.should_block("https://www.saucedemo.com/static/media/bike.jpg", "image")
+        assert blocker.should_block("https://www.google-analytics.com/collect", "xhr")
+        assert not blocker.should_block("https://www.saucedemo.com/inventory.html", "document")
+    
+    def test_full_fidelity_blocks_nothing(self):
+        """测试 full-fidelity 不屏蔽任何请求"""
+        blocker = ResourceBlocker("full-fidelity")
+        assert not blocker.enabled
+        assert not blocker.should_block("https://www.saucedemo.com/logo.png", "image")
+        assert cdp_blocked_urls("full-fidelity") == []
+    
+    def test_cdp_patterns_cover_resource_types(self):
+        """测试 CDP 模式包含由资源类型换算的扩展名"""
+        patterns = cdp_blocked_urls("functional-fast")
+        assert "*.png*" in patterns
+        assert "*.woff2*" in patterns
+        assert "*google-analytics.com*" in patterns
+    
+    def test_blocked_request_is_counted(self):
+        """测试屏蔽统计（数量和估算字节）"""
+        blocker = ResourceBlocker("functional-fast")
+        blocker._record_blocked("image")
+        blocker._record_blocked("image")
+        assert blocker.stats["blocked"] == 2
+        assert blocker.stats["by_type"] == {"image": 2}
+        assert blocker.stats["estimated_saved_bytes"] > 0
+    
+    def test_unknown_profile_raises(self):
+        """测试未知配置名称报错"""
+        with pytest.raises(ValueError, match="不支持的资源屏蔽配置"):
+            get_profile("no-such-profile")
+
+
+class TestHarReplay:
+    """HAR 录制与回放测试"""
+    
+    def test_har_path_groups_flows_by_site(self, tmp_path, monkeypatch):
+        """测试同一站点的流程 HAR 位于同一目录（共享按内容哈希保存的响应体）"""
+        monkeypatch.setattr("config.settings.HAR_DIR", tmp_path)
+        checkout = har_path("checkout", "https://www.saucedemo.com/")
+        login = har_path("test_login[standard user]", "https://www.saucedemo.com/")
+        assert checkout == tmp_path / "www.saucedemo.com" / "checkout.har"
+        assert login.parent == checkout.parent
+        assert login.name == "test_login_standard_user.har"
+    
+    def test_replay_miss_invalidates_har(self, tmp_path, monkeypatch):
+        """测试回放未命中时作废 HAR 以便下次重新录制"""
+        monkeypatch.setattr("config.settings.HAR_DIR", tmp_path)
+        session = HarSession("flow", mode="replay", update_on_miss=True)
+        session.path.parent.mkdir(parents=True)
+        session.path.write_text("{}")
+        session.misses.append("https://www.saucedemo.com/new.js")
+        session._on_close(None)
+        assert not session.path.exists()
+    
+    def test_invalid_mode_raises(self):
+        """测试未知模式报错"""
+        with pytest.raises(ValueError, match="不支持的 HAR 模式"):
+            HarSession("flow", mode="live")
+
+
+class TestBulkExtract:
+    """批量 DOM 提取测试"""
+    
+    def test_parse_field_child_text_and_attribute(self):
+        """测试行字段定义解析为 CSS 与属性"""
+        assert parse_field("css=.inventory_item_name") == {"css": ".inventory_item_name", "attr": None}
+        assert parse_field("css=a@href") == {"css": "a", "attr": "href"}
+        assert parse_field("id=item_4_title_link@id") == {"css": '[id="item_4_title_link"]', "attr": "id"}
+    
+    def test_parse_field_row_itself(self):
+        """测试空字段和仅属性字段指向行元素自身"""
+        assert parse_field("") == {"css": None, "attr": None}
+        assert parse_field("@data-test") == {"css": None, "attr": "data-test"}
+    
+    def test_parse_field_rejects_non_css(self):
+        """测试非 CSS 定位器报错"""
+        with pytest.raises(ValueError, match="只支持 CSS"):
+            parse_field("xpath=//div")
+    
+    def test_parse_price(self):
+        """测试价格文本解析"""
+        assert parse_price("$29.99") == 29.99
+        assert parse_price(" $1,049.00 ") == 1049.0
+        assert parse_price("N/A") is None
+        assert parse_price(None) is None
+
+
+class TestPageSnapshot:
+    """页面快照测试"""
+    
+    SNAPSHOT_DATA = {
+        "url": "https://www.saucedemo.com/inventory.html",
+        "title": "Products",
+        "items": [
+            {"name": "Sauce Labs Backpack", "price": "$29.99", "quantity": None,
+             "button": "Remove", "button_enabled": True},
+            {"name": "Sauce Labs Bike Light", "price": "$9.99", "quantity": None,
+             "button": "Add to cart", "button_enabled": True},
+        ],
+        "cart_badge": 1,
+        "error": None,
+        "complete_message": None,
+        "inputs": {},
+    }
+    
+    class FakePage:
+        """记录 evaluate 调用次数的假页面"""
+        
+        def __init__(self, data):
+            self.data = data
+            self.evaluations = 0
+            self.listeners = {}
+        
+        def evaluate(self, script, arg=None):
+            self.evaluations += 1
+            return self.data
+        
+        def on(self, event, callback):
+            self.listeners[event] = callback
+    
+    def test_from_dict(self):
+        """测试快照字段与派生属性"""
+        snapshot = PageSnapshot.from_dict(self.SNAPSHOT_DATA)
+        assert snapshot.item_count == 2
+        assert snapshot.item_names == ["Sauce Labs Backpack", "Sauce Labs Bike Light"]
+        assert snapshot.items[0].in_cart and not snapshot.items[1].in_cart
+        assert snapshot.items[1].price_value == 9.99
+        assert snapshot.cart_badge == 1
+    
+    def test_cache_reused_until_invalidated(self):
+        """测试快照缓存在页面修改前复用，失效后重新读取"""
+        cache = SnapshotCache()
+        page = self.FakePage(self.SNAPSHOT_DATA)
+        cache.get(page)
+        cache.get(page)
+        assert page.evaluations == 1
+        cache.invalidate(page)
+        cache.get(page)
+        assert page.evaluations == 2
+    
+    def test_navigation_invalidates(self):
+        """测试页面导航后快照自动失效"""
+        cache = SnapshotCache()
+        page = self.FakePage(self.SNAPSHOT_DATA)
+        cache.get(page)
+        page.listeners["framenavigated"](None)
+        cache.get(page)
+        assert page.evaluations == 2
+
+
+class TestFormFill:
+    """批量表单填写测试"""
+    
+    class FakeDriver:
+        """按给定结果响应 execute_script 的假驱动"""
+        
+        def __init__(self, results):
+            self.results = results
+            self.calls = []
+        
+        def execute_script(self, script, fields):
+            self.calls.append(fields)
+            return self.results
+    
+    def test_plan_fields(self):
+        """测试无法换算的定位器和指定字段回退为逐字段输入"""
+        form = {"css=#first-name": "Auto", "text=Zip": "12345", "id=last-name": 7}
+        batch, fallback = plan_fields(form, dom_query, per_field=["id=last-name"])
+        assert [field["key"] for field in batch] == ["css=#first-name"]
+        assert batch[0]["value"] == "Auto"
+        assert fallback == ["text=Zip", "id=last-name"]
+    
+    def test_selenium_query(self):
+        """测试 Selenium 定位类型换算"""
+        assert selenium_query("id", "user-name") == {"type": "css", "value": '[id="user-name"]'}
+        assert selenium_query("XPATH", "//input")["type"] == "xpath"
+        assert selenium_query("link_text", "Login") is None
+    
+    def test_selenium_batch_fill_single_call(self):
+        """测试一次 execute_script 填写，失败字段返回给调用方"""
+        driver = self.FakeDriver([True, False])
+        form = {("id", "first-name"): "Auto", ("id", "last-name"): "Tester",
+                ("link_text", "x"): "y"}
+        pending = selenium_batch_fill(driver, form)
+        assert len(driver.calls) == 1
+        assert len(driver.calls[0]) == 2
+        assert pending == [("link_text", "x"), ("id", "last-name")]
+
+
+class TestWaitEngine:
+    """事件驱动等待引擎测试"""
+    
+    class FakeLocator:
+        def __init__(self, page):
+            self.page = page
+            self.first = self
+        
+        def element_handle(self, timeout):
+            if self.page.handle is None:
+                raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+            return self.page.handle
+    
+    class FakePage:
+        def __init__(self, handle=None, result=True, error=None):
+            self.handle = handle
+            self.result = result
+            self.error = error
+            self.calls = []
+        
+        def locator(self, selector):
+            return TestWaitEngine.FakeLocator(self)
+        
+        def evaluate(self, script, arg):
+            self.calls.append(arg)
+            if self.error:
+                raise self.error
+            return self.result
+    
+    def test_dom_query_locator_waits_in_page(self):
+        """测试可换算为 DOM 查询的定位器不取元素句柄，超时参数传入页面脚本"""
+        page = self.FakePage()
+        assert WaitEngine(page).attribute_equals("id=status", "data-state", "done", timeout=300)
+        assert page.calls[0]["el"] is None
+        assert page.calls[0]["spec"]["query"] == dom_query("id=status")
+        assert page.calls[0]["spec"]["timeout"] == 300
+    
+    def test_missing_element_returns_false(self):
+        """测试 text= / role= 等定位器的元素始终未出现时返回 False，不抛 TimeoutError"""
+        page = self.FakePage(handle=None)
+        engine = WaitEngine(page)
+        assert engine.text_changed("text=加载中", "加载中", timeout=100) is False
+        assert engine.element_stable("role=dialog", timeout=100) is False
+        assert page.calls == []
+    
+    def test_navigation_during_wait_returns_false(self):
+        """测试等待期间页面导航（执行上下文被销毁）返回 False，其它错误照常抛出"""
+        navigated = PlaywrightError("Execution context was destroyed, most likely because of a navigation")
+        assert WaitEngine(self.FakePage(error=navigated)).dom_settled(timeout=100) is False
+        with pytest.raises(PlaywrightError):
+            WaitEngine(self.FakePage(error=PlaywrightError("ReferenceError: x is not defined"))).dom_settled()
+    
+    def test_element_handle_used_for_non_dom_locators(self):
+        """测试无法换算为 DOM 查询的定位器使用元素句柄等待"""
+        page = self.FakePage(handle="handle", result=False)
+        assert WaitEngine(page).text_changed("text=提交", "提交", timeout=100) is False
+        assert page.calls[0]["el"] == "handle" and page.calls[0]["spec"]["query"] is None
+
+
+class TestLocatorRegistry:
+    """定位器注册表测试"""
+    
+    def test_prefix_normalization(self):
+        """测试各前缀换算为 Playwright 选择器和 Selenium 定位"""
+        assert compile_locator("tag=title").playwright == "css=title"
+        assert selenium_by("tag=title") == ("tag name", "title")
+        assert compile_locator("id=login-button").playwright == "id=login-button"
+        assert selenium_by("id=login-button") == ("id", "login-button")
+        assert compile_locator("name=q").playwright == 'css=[name="q"]'
+        assert compile_locator("//div").selenium == ("xpath", "//div")
+        assert compile_locator("text=Login").selenium is None
+    
+    def test_compiled_once(self):
+        """测试相同定位器复用同一解析结果"""
+        assert compile_locator("css=.title") is compile_locator("css=.title")
+    
+    def test_invalid_prefix_rejected_at_class_definition(self):
+        """测试定位器类定义时即发现无效前缀"""
+        with pytest.raises(ValueError, match="BrokenLocators.BAD"):
+            class BrokenLocators(BaseLocators):
+                BAD = "bogus=.x"
+    
+    def test_subclass_locators_normalized(self):
+        """测试子类继承的 tag= 定位器已换算"""
+        class PageLocators(BaseLocators):
+            SUBMIT = "css=#submit"
+        
+        assert PageLocators.PAGE_TITLE == "css=title"
+        assert PageLocators._compiled["SUBMIT"].selenium == ("css selector", "#submit")
+    
+    def test_locator_cache_per_page(self):
+        """测试 Locator 对象按页面缓存"""
+        class FakePage:
+            def __init__(self):
+                self.created = 0
+            
+            def locator(self, selector):
+                self.created += 1
+                return (self, selector)
+        
+        cache = LocatorCache()
+        page = FakePage()
+        first = cache.get(page, "tag=body")
+        assert cache.get(page, "css=body") is first
+        assert page.created == 1
+        assert first[1] == "css=body"
+
+
+class TestSeleniumBatchLookup:
+    """SeleniumHelper 批量查找测试"""
+    
+    class FakeDriver:
+        """记录 execute_script / find_elements 调用的假驱动"""
+        
+        def __init__(self):
+            self.scripts = []
+            self.finds = []
+        
+        def execute_script(self, script, queries, read_text):
+            self.scripts.append(queries)
+            return [f"text:{query['value']}" if read_text else f"el:{query['value']}" for query in queries]
+        
+        def find_elements(self, by, value):
+            self.finds.append((by, value))
+            return []
+    
+    def make_helper(self):
+        helper = SeleniumHelper(browser="chrome", headless=True)
+        helper.driver = self.FakeDriver()
+        return helper
+    
+    def test_texts_in_one_call(self):
+        """测试多个元素文本一次脚本调用读取"""
+        helper = self.make_helper()
+        texts = helper.get_texts([("id", "first-name"), ("css", ".title")])
+        assert texts == ['text:[id="first-name"]', "text:.title"]
+        assert len(helper.driver.scripts) == 1
+    
+    def test_unsupported_locator_falls_back(self):
+        """测试 link_text 等定位逐个查找，其余仍批量查找"""
+        helper = self.make_helper()
+        elements = helper.find_elements_batch([("css", ".title"), ("link_text", "Login")])
+        assert elements == ["el:.title", None]
+        assert helper.driver.finds == [("link text", "Login")]
+    
+    def test_waits_shared_per_timeout(self):
+        """测试相同超时时间复用 WebDriverWait"""
+        helper = self.make_helper()
+        assert helper._wait(5) is helper._wait(5)
+        assert helper._wait(5) is not helper._wait(10)
+    
+    def test_invalid_locator_type(self):
+        """测试不支持的定位类型"""
+        with pytest.raises(ValueError):
+            self.make_helper()._locator("bogus", "x")
+
+
+class TestAdaptiveTimeout:
+    """自适应定位器超时测试"""
+    
+    URL = "https://www.saucedemo.com/inventory.html?x=1"
+    
+    def make_policy(self, tmp_path, **kwargs):
+        options = dict(quantile_value=0.95, margin=1.0, minimum=2.0, maximum=30.0,
+                       cold=30.0, min_samples=3, enabled=True)
+        options.update(kwargs)
+        return AdaptiveTimeoutPolicy(TimingStore(tmp_path / "timings.json", max_samples=10), **options)
+    
+    def test_timing_key(self):
+        """测试记录键包含站点和页面路径、忽略查询参数"""
+        assert timing_key(self.URL, "id=checkout") == "www.saucedemo.com/inventory.html|id=checkout"
+    
+    def test_quantile(self):
+        """测试分位数计算"""
+        samples = [float(i) for i in range(1, 101)]
+        assert quantile(samples, 0.95) == 95.0
+        assert quantile([0.4], 0.99) == 0.4
+    
+    def test_cold_locator_uses_override(self, tmp_path):
+        """测试样本不足的定位器使用冷启动超时"""
+        policy = self.make_policy(tmp_path)
+        policy.record(self.URL, "id=checkout", 0.2)
+        assert policy.timeout_for(self.URL, "id=checkout") == 30.0
+    
+    def test_learned_timeout(self, tmp_path):
+        """测试有历史时超时为高分位数 + 余量，并受上下限约束"""
+        policy = self.make_policy(tmp_path)
+        for seconds in (0.2, 0.3, 4.0):
+            policy.record(self.URL, "id=checkout", seconds)
+        assert policy.timeout_for(self.URL, "id=checkout") == 5.0
+        for _ in range(3):
+            policy.record(self.URL, "id=fast", 0.1)
+        assert policy.timeout_for(self.URL, "id=fast") == 2.0
+    
+    def test_disabled_uses_maximum(self, tmp_path):
+        """测试关闭自适应超时时使用全局超时"""
+        policy = self.make_policy(tmp_path, enabled=False)
+        assert policy.timeout_for(self.URL, "id=checkout") == 30.0
+    
+    def test_history_persisted_and_bounded(self, tmp_path):
+        """测试历史写回磁盘、与其它进程的样本合并并限制数量"""
+        path = tmp_path / "timings.json"
+        first = TimingStore(path, max_samples=10)
+        second = TimingStore(path, max_samples=10)
+        for _ in range(8):
+            first.record("k", 1.0)
+            second.record("k", 2.0)
+        first.flush()
+        second.flush()
+        samples = TimingStore(path, max_samples=10).samples("k")
+        assert len(samples) == 10
+        assert samples[-1] == 2.0
+
+
+class TestInstantAssertions:
+    """即时断言测试"""
+    
+    class FakePage:
+        """按给定元素状态响应探测脚本的假页面"""
+        
+        url = "https://www.saucedemo.com/"
+        
+        def __init__(self, count=0, visible=False):
+            self.result = {"ready": True, "count": count, "visible": visible}
+            self.probes = []
+            self.waits = 0
+        
+        def evaluate(self, script, arg):
+            self.probes.append(arg)
+            return self.result
+        
+        def wait_for_selector(self, *args, **kwargs):
+            self.waits += 1
+    
+    def make_ui(self, page):
+        ui = UIOperations()
+        ui.page = page
+        return ui
+    
+    def test_probe_state(self):
+        """测试探针一次调用返回数量和可见性，并携带就绪状态"""
+        page = self.FakePage(count=2, visible=True)
+        state = DomProbe(page, "interactive", "id=inventory_container").state("css=.inventory_item")
+        assert state.exists and state.count == 2 and state.visible
+        assert page.probes[0]["readyState"] == "interactive"
+        assert page.probes[0]["ready"] == {"type": "css", "value": '[id="inventory_container"]'}
+    
+    def test_ready_locator_must_be_dom_query(self):
+        """测试就绪元素必须可在页面内查询"""
+        with pytest.raises(ValueError):
+            DomProbe(self.FakePage(), ready_locator="text=Products")
+    
+    def test_check_mode(self):
+        """测试断言模式校验"""
+        assert check_mode("now") == "now"
+        with pytest.raises(ValueError):
+            check_mode("soon")
+    
+    def test_negative_assertion_does_not_wait(self):
+        """测试否定断言默认按当前 DOM 判断，不等待超时"""
+        page = self.FakePage(count=0)
+        ui = self.make_ui(page)
+        ui.assert_element_not_exists("css=[data-test='error']")
+        ui.assert_element_not_visible("css=[data-test='error']")
+        assert page.waits == 0
+        assert len(page.probes) == 2
+    
+    def test_negative_assertion_fails_when_present(self):
+        """测试元素存在时否定断言立即失败"""
+        ui = self.make_ui(self.FakePage(count=1, visible=True))
+        with pytest.raises(AssertionError):
+            ui.assert_element_not_exists("css=[data-test='error']")
+        with pytest.raises(AssertionError):
+            ui.assert_element_not_visible("css=[data-test='error']")
+    
+    def test_now_mode_positive(self):
+        """测试 now 模式的正向断言"""
+        ui = self.make_ui(self.FakePage(count=0))
+        with pytest.raises(AssertionError):
+            ui.assert_element_exists("css=[data-test='error']", mode="now")
+
+
+class TestDurationScheduling:
+    """按耗时调度测试"""
+    
+    def make_store(self, tmp_path):
+        return DurationStore(tmp_path / "durations.json", alpha=0.5, default=5.0)
+    
+    def test_ema(self, tmp_path):
+        """测试耗时按指数移动平均平滑"""
+        store = self.make_store(tmp_path)
+        store.record("test_a", 10.0)
+        store.record("test_a", 20.0)
+        assert store.estimate("test_a") == 15.0
+    
+    def test_unknown_test_uses_median(self, tmp_path):
+        """测试新测试按已知耗时中位数估算，无历史时使用默认值"""
+        store = self.make_store(tmp_path)
+        assert store.estimate("test_new") == 5.0
+        for nodeid, seconds in (("a", 1.0), ("b", 3.0), ("c", 60.0)):
+            store.record(nodeid, seconds)
+        assert store.estimate("test_new") == 3.0
+    
+    def test_flush_merges_with_disk(self, tmp_path):
+        """测试多个进程的样本合并写回"""
+        first = self.make_store(tmp_path)
+        second = self.make_store(tmp_path)
+        first.record("test_a", 10.0)
+        first.flush()
+        second.record("test_a", 20.0)
+        second.flush()
+        assert self.make_store(tmp_path).estimate("test_a") == 15.0
+    
+    def test_lpt_plan_balances_workers(self):
+        """测试最长处理时间优先分配接近理想并行耗时"""
+        costs = {"glitch": 60.0, "a": 30.0, "b": 30.0, "c": 20.0, "d": 10.0, "e": 10.0}
+        assignments, makespan = lpt_plan(costs, 2)
+        assert makespan == 80.0
+        assert sum(costs.values()) / 2 == 80.0
+        assert assignments[0][0] == "glitch"
+        assert sorted(sum(assignments, [])) == sorted(costs)
+
+
+class TestRobotParallel:
+    """Robot 多进程并行执行测试"""
+    
+    def test_unit_command(self, tmp_path):
+        """测试执行单元命令：独立输出目录、不生成单独报告、用例名通配符转义"""
+        cmd = unit_command(["python", "-m", "robot"], RobotUnit("suites/a.robot", "P0 [smoke] 登录*"),
+                           tmp_path, "output_001.xml", 2)
+        assert cmd[cmd.index("--outputdir") + 1] == str(tmp_path)
+        assert cmd[cmd.index("--log") + 1] == "NONE"
+        assert "WORKER_ID:2" in cmd
+        assert cmd[cmd.index("--test") + 1] == "P0 [[]smoke] 登录[*]"
+        assert cmd[-1] == "suites/a.robot"
+    
+    def test_merge_groups_by_suite_file(self, tmp_path):
+        """测试按用例拆分的输出按 suite 文件分组，缺失的输出被跳过"""
+        units = [RobotUnit("a.robot", "t1"), RobotUnit("b.robot", "t1"), RobotUnit("a.robot", "t2"),
+                 RobotUnit("c.robot")]
+        results = {}
+        for index, unit in enumerate(units):
+            output = tmp_path / f"{index}.xml"
+            if unit.source != "c.robot":
+                output.write_text("<robot/>")
+            results[unit] = UnitResult(unit, output, 0, 1.0)
+        groups = merge_groups(units, results)
+        assert [[path.name for path in group] for group in groups] == [["0.xml", "2.xml"], ["1.xml"]]
+    
+    def test_longest_units_dispatched_first(self, tmp_path, monkeypatch):
+        """测试按历史耗时从长到短派发，并记录本次耗时"""
+        store = DurationStore(tmp_path / "robot.json", alpha=1.0, default=5.0)
+        store.record("short.robot", 1.0)
+        store.record("long.robot", 60.0)
+        started = []
+        
+        def fake_run(cmd, **kwargs):
+            started.append(cmd[-1])
+            outputdir = cmd[cmd.index("--outputdir") + 1]
+            (tmp_path / outputdir / cmd[cmd.index("--output") + 1]).write_text("<robot/>")
+            return robot_parallel.subprocess.CompletedProcess(cmd, 0, stdout="")
+        
+        monkeypatch.setattr(robot_parallel.subprocess, "run", fake_run)
+        merged = []
+        monkeypatch.setattr(RobotParallelRunner, "merge", lambda self, groups, name=None: merged.append(groups) or 0)
+        runner = RobotParallelRunner(["robot"], str(tmp_path / "out"), processes=1, store=store)
+        units = [RobotUnit("short.robot"), RobotUnit("new.robot"), RobotUnit("long.robot")]
+        assert runner.run(units) == 0
+        assert started == ["long.robot", "new.robot", "short.robot"]
+        assert len(merged[0]) == 3
+        assert store.estimate("new.robot") < 5.0
+    
+    def test_worker_errors_reported_as_failures(self, tmp_path, monkeypatch):
+        """测试单元启动异常不终止 worker，异常和未生成输出的单元都计为执行错误"""
+        started = []
+        
+        def fake_run(cmd, **kwargs):
+            started.append(cmd[-1])
+            if cmd[-1] == "broken.robot":
+                raise OSError("无法启动 robot")
+            return robot_parallel.subprocess.CompletedProcess(cmd, 0, stdout="")
+        
+        monkeypatch.setattr(robot_parallel.subprocess, "run", fake_run)
+        monkeypatch.setattr(RobotParallelRunner, "merge", lambda self, groups, name=None: 0)
+        store = DurationStore(tmp_path / "robot.json")
+        runner = RobotParallelRunner(["robot"], str(tmp_path / "out"), processes=1, store=store)
+        units = [RobotUnit("broken.robot"), RobotUnit("ok.robot")]
+        assert runner.run(units) == robot_parallel.ROBOT_ERROR_RC
+        assert sorted(started) == ["broken.robot", "ok.robot"]
+        assert store.estimate("broken.robot") == store.estimate("unknown.robot")
+
+
+class TestPipelineOrchestrator:
+    """流水线并发编排测试"""
+    
+    @staticmethod
+    def stage(name, code="import time; time.sleep(0.3)", **needs):
+        return Stage(name, [sys.executable, "-c", code], **needs)
+    
+    @staticmethod
+    def overlap(first, second):
+        return first.started < second.finished and second.started < first.finished
+    
+    def run(self, stages, **limits):
+        stream = io.StringIO()
+        options = {"cpu": 4, "memory_mb": 4096, "browsers": 1, **limits}
+        results = PipelineOrchestrator(stages, ResourceLimits(**options), stream=stream).run()
+        return results, stream.getvalue()
+    
+    def test_api_stage_overlaps_ui_stage(self):
+        """测试不占浏览器的阶段与 UI 阶段并发，浏览器槽位不足的 UI 阶段排队"""
+        results, _ = self.run([
+            self.stage("selenium", browsers=1),
+            self.stage("playwright", browsers=1),
+            self.stage("api", cpu=0.5),
+        ])
+        selenium, playwright, api = results
+        assert self.overlap(selenium, api)
+        assert not self.overlap(selenium, playwright)
+    
+    def test_max_stages_runs_serially(self):
+        """测试限制同时运行的阶段数为 1 时串行执行"""
+        results, _ = self.run([self.stage("a"), self.stage("b")], max_stages=1)
+        assert not self.overlap(*results)
+    
+    def test_output_prefixed_and_summarized(self):
+        """测试输出带阶段前缀，失败阶段计入汇总"""
+        results, output = self.run([
+            self.stage("ok", "print('hello')"),
+            self.stage("bad", "import sys; sys.exit(3)"),
+        ])
+        assert "[ok ] hello" in output
+        assert [result.returncode for result in results] == [0, 3]
+        summary = format_summary(results)
+        assert "ok: ✓ 通过" in summary and "bad: ✗ 失败" in summary
+    
+    def test_run_all_pytest_stages_write_separate_logs(self):
+        """测试并发的 pytest 阶段各自覆盖 log_file，不互相覆盖日志"""
+        log_files = [stage.cmd[stage.cmd.index("-o") + 1] for stage in build_run_all_stages()
+                     if "pytest" in stage.cmd]
+        assert len(log_files) == 3 and len(set(log_files)) == 3
+        assert all(option.startswith("log_file=logs/") for option in log_files)
+
+
+class TestImpactIndex:
+    """测试影响索引测试"""
+    
+    LOCATORS_V1 = 'class LoginLocators:\n    LOGIN_BUTTON = "id=login"\n    USERNAME = "id=user"\n'
+    
+    def make_index(self, tmp_path):
+        index = ImpactIndex(tmp_path / "impact.json")
+        index.record("pytest", "tests/test_optimizations.py::TestA::test_login",
+                     modules=["utils/business_operations.py"], locators=["LoginLocators.LOGIN_BUTTON"])
+        index.record("pytest", "tests/test_optimizations.py::TestA::test_cart", modules=["utils/ui_operations.py"])
+        index.record("robot", "tests/ui_layer/testsuites/saucedemo_testsuite.robot::仅登录测试",
+                     resources=["tests/resources/common.robot"])
+        return index
+    
+    def test_only_changed_constant_reported(self):
+        """测试定位器文件只改一个常量时只报告该常量，改动其他代码时报告全部常量"""
+        changed = self.LOCATORS_V1.replace('"id=login"', '"id=login-button"')
+        assert locator_changes(self.LOCATORS_V1, changed) == {"LoginLocators.LOGIN_BUTTON"}
+        restructured = self.LOCATORS_V1 + "    def helper(self):\n        return 1\n"
+        assert locator_changes(self.LOCATORS_V1, restructured) == {"LoginLocators.LOGIN_BUTTON", "LoginLocators.USERNAME"}
+    
+    def test_select_by_module_locator_and_resource(self, tmp_path):
+        """测试按模块、定位器常量和资源文件选择受影响的测试"""
+        index = self.make_index(tmp_path)
+        selection = index.select(ChangeSet(files={"utils/business_operations.py"}))
+        assert selection.pytest_targets == ["tests/test_optimizations.py::TestA::test_login"]
+        selection = index.select(ChangeSet(files={"x_locators.py"}, locators={"LoginLocators.LOGIN_BUTTON"}))
+        assert selection.pytest_targets == ["tests/test_optimizations.py::TestA::test_login"]
+        selection = index.select(ChangeSet(files={"tests/resources/common.robot"}))
+        assert selection.robot_tests == {"tests/ui_layer/testsuites/saucedemo_testsuite.robot": ["仅登录测试"]}
+        assert not selection.pytest_targets
+    
+    def test_global_change_or_empty_index_runs_all(self, tmp_path):
+        """测试全局文件改动或索引为空时执行全部测试"""
+        assert self.make_index(tmp_path).select(ChangeSet(files={"conftest.py"})).run_all
+        assert ImpactIndex(tmp_path / "empty.json").select(ChangeSet(files={"utils/ui_operations.py"})).run_all
+    
+    def test_flush_merges_records(self, tmp_path):
+        """测试多个进程的记录合并写回"""
+        first, second = ImpactIndex(tmp_path / "impact.json"), ImpactIndex(tmp_path / "impact.json")
+        first.record("pytest", "a", modules=["m1.py"])
+        first.flush()
+        second.record("robot", "b", resources=["r.robot"])
+        second.flush()
+        merged = ImpactIndex(tmp_path / "impact.json")
+        assert set(merged.entries("pytest")) == {"a"} and set(merged.entries("robot")) == {"b"}
+    
+    def test_recorder_collects_modules_and_locators(self):
+        """测试采集执行过的项目模块和引用的定位器常量"""
+        recorder = CodeRecorder()
+        recorder.push()
+        recorder.start()
+        try:
+            timing_key("https://example.com/a", "id=x")
+            (lambda: BaseLocators.PAGE_TITLE)()
+        finally:
+            recorder.stop()
+        modules, locators = recorder.summarize(recorder.pop())
+        assert "utils/adaptive_timeout.py" in modules
+        assert "BaseLocators.PAGE_TITLE" in locators
+    
+    def test_listener_records_imported_variable_files(self, tmp_path, monkeypatch):
+        """测试 suite 间接导入的只含变量的资源文件改动时选中该 suite 的用例"""
+        index = ImpactIndex(tmp_path / "impact.json")
+        monkeypatch.setattr(impact_listener, "get_impact_index", lambda: index)
+        root = settings.BASE_DIR
+        suite = "tests/robotframework/baidu_search.robot"
+        locators = "tests/robotframework/locators/cart_page_locators.robot"
+        
+        listener = impact_listener.ImpactListener()
+        # Robot 先处理导入（含资源文件内的间接导入），再触发 start_suite
+        listener.resource_import("cart_page_locators", {"source": str(root / locators),
+                                                        "importer": str(root / "tests/robotframework/locators/all_locators.robot")})
+        listener.resource_import("all_locators", {"source": str(root / "tests/robotframework/locators/all_locators.robot"),
+                                                  "importer": str(root / suite)})
+        listener.variables_import("outside.py", {"source": "/elsewhere/outside.py", "importer": str(root / suite)})
+        listener.start_suite("Baidu Search", {"source": str(root / suite)})
+        listener.start_test("搜索", {})
+        listener.end_test("搜索", {})
+        listener.end_suite("Baidu Search", {})
+        listener.close()
+        
+        entry = ImpactIndex(tmp_path / "impact.json").entries("robot")[f"{suite}::搜索"]
+        assert entry["resources"] == ["tests/robotframework/locators/all_locators.robot", locators]
+        assert index.select(ChangeSet(files={locators})).robot_tests == {suite: ["搜索"]}
+
+
+class TestSharding:
+    """跨节点分片测试"""
+    
+    COSTS = {"pytest:a": 60.0, "pytest:b": 30.0, "robot:s.robot": 30.0, "pytest:c": 20.0,
+             "pytest:d": 10.0, "robot:t.robot": 10.0}
+    
+    @pytest.fixture
+    def pytest_project(self, tmp_path):
+        """使用仓库 pytest.ini（addopts 含 -v）的临时项目"""
+        shutil.copy(Path(__file__).resolve().parent.parent / "pytest.ini", tmp_path / "pytest.ini")
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_sample.py").write_text(
+            "def test_a():\n    pass\n\n\nclass TestB:\n    def test_c(self):\n        pass\n", encoding="utf-8")
+        return tmp_path
+    
+    def test_collect_pytest_returns_nodeids(self, pytest_project):
+        """测试收集结果为 nodeid，不受 pytest.ini 中 -v 影响"""
+        assert collect_pytest(["tests"], cwd=str(pytest_project)) == [
+            "tests/test_sample.py::test_a", "tests/test_sample.py::TestB::test_c"]
+    
+    def test_collect_pytest_fails_loudly(self, pytest_project):
+        """测试收集错误或没有测试时抛出异常，而不是返回空分片"""
+        (pytest_project / "tests" / "test_broken.py").write_text("def test_x(:\n", encoding="utf-8")
+        with pytest.raises(RuntimeError, match="test_broken"):
+            collect_pytest(["tests"], cwd=str(pytest_project))
+        with pytest.raises(RuntimeError):
+            collect_pytest(["tests/test_missing.py"], cwd=str(pytest_project))
+    
+    def test_parse_shard(self):
+        """测试分片参数解析与校验"""
+        assert parse_shard("2/3") == (2, 3)
+        for spec in ("0/2", "3/2", "2", "a/b"):
+            with pytest.raises(ValueError):
+                parse_shard(spec)
+    
+    def test_plan_is_balanced_and_order_independent(self):
+        """测试划分均衡且与输入顺序无关"""
+        plan = plan_shards(self.COSTS, 2)
+        reversed_plan = plan_shards(dict(reversed(list(self.COSTS.items()))), 2)
+        assert plan.shards == reversed_plan.shards
+        assert plan.loads == [80.0, 80.0]
+        assert sorted(sum(plan.shards, [])) == sorted(self.COSTS)
+    
+    def test_saved_plan_reused_for_same_tests(self, tmp_path):
+        """测试测试集合不变时复用已保存的划分，集合变化时重新划分"""
+        plan_file = tmp_path / "plan.json"
+        first = load_or_create_plan(self.COSTS, 2, plan_file)
+        changed_costs = dict(self.COSTS, **{"pytest:d": 90.0})
+        assert load_or_create_plan(changed_costs, 2, plan_file).shards == first.shards
+        grown = dict(self.COSTS, **{"pytest:e": 5.0})
+        assert "pytest:e" in sum(load_or_create_plan(grown, 2, plan_file).shards, [])
+    
+    def test_new_build_replans_with_fresh_durations(self, tmp_path):
+        """测试同一构建内复用划分，新构建按最新耗时重新划分"""
+        plan_file = tmp_path / "plan.json"
+        first = load_or_create_plan(self.COSTS, 2, plan_file, build="b1")
+        changed_costs = dict(self.COSTS, **{"pytest:d": 90.0})
+        assert load_or_create_plan(changed_costs, 2, plan_file, build="b1").shards == first.shards
+        replanned = load_or_create_plan(changed_costs, 2, plan_file, build="b2")
+        assert replanned.build == "b2" and replanned.shards == plan_shards(changed_costs, 2).shards
+    
+    def write_manifest(self, shards_dir, index, build, failures=0):
+        shard_dir = shards_dir / f"shard_{index}"
+        shard_dir.mkdir(parents=True)
+        (shard_dir / "pytest.xml").write_text(
+            f'<testsuite name="pytest" tests="1" failures="{failures}" errors="0" skipped="0"/>')
+        manifest = {"shard": index, "total": 2, "build": build, "fingerprint": "f", "estimated": 1.0,
+                    "elapsed": 1.0, "pytest": {"tests": ["t"], "junit": "pytest.xml", "returncode": failures},
+                    "robot": {"tests": [], "output": None, "returncode": 0}}
+        (shard_dir / "shard.json").write_text(json.dumps(manifest), encoding="utf-8")
+    
+    def test_merge_ignores_other_builds(self, tmp_path):
+        """测试合并时其它构建留下的分片结果按缺失处理，不沿用上次合并的报告"""
+        shards_dir = tmp_path / "shards"
+        self.write_manifest(shards_dir, 1, "b2")
+        self.write_manifest(shards_dir, 2, "b1", failures=1)
+        merged = shards_dir / "merged"
+        merged.mkdir()
+        (merged / "pytest.xml").write_text("<testsuites/>")
+        
+        assert merge_shards(str(shards_dir), build="b2") == 1
+        summary = json.loads((merged / "summary.json").read_text(encoding="utf-8"))
+        assert [shard["shard"] for shard in summary["shards"]] == [1]
+        assert summary["pytest"]["tests"] == 1 and summary["pytest"]["failures"] == 0
+        assert any("缺少分片: 2" in problem for problem in summary["problems"])
+        assert merge_shards(str(shards_dir), build="b3") == 1 and not (merged / "pytest.xml").exists()
+    
+    def test_run_shard_clears_previous_results(self, tmp_path, monkeypatch):
+        """测试分片开始时清空自己的结果目录，pytest 使用分片专属日志文件"""
+        self.write_manifest(tmp_path / "shards", 1, "old")
+        commands = []
+        
+        class Completed:
+            returncode = 0
+        
+        monkeypatch.setattr(sharding.subprocess, "run", lambda cmd: commands.append(cmd) or Completed())
+        monkeypatch.setattr(sharding, "estimate_costs", lambda ids, units: {PYTEST_PREFIX + nodeid: 1.0 for nodeid in ids})
+        monkeypatch.setattr(settings, "SHARD_BUILD_ID", "new")
+        assert sharding.run_shard(1, 1, ["tests/test_a.py::test_a"], [], [], str(tmp_path)) == 0
+        
+        shard_dir = tmp_path / "shards" / "shard_1"
+        assert sorted(path.name for path in shard_dir.iterdir()) == ["shard.json"]
+        assert json.loads((shard_dir / "shard.json").read_text(encoding="utf-8"))["build"] == "new"
+        assert "log_file=logs/pytest_shard_1.log" in commands[0]
+    
+    def test_merge_junit(self, tmp_path):
+        """测试合并各分片的 JUnit XML"""
+        for index, failures in ((1, 0), (2, 1)):
+            (tmp_path / f"{index}.xml").write_text(
+                f'<testsuites><testsuite name="pytest" tests="3" failures="{failures}" errors="0" skipped="1">'
+                f'<testcase name="t{index}"/></testsuite></testsuites>')
+        totals = merge_junit([tmp_path / "1.xml", tmp_path / "2.xml"], tmp_path / "merged" / "pytest.xml")
+        assert totals == {"tests": 6, "failures": 1, "errors": 0, "skipped": 2}
+        assert (tmp_path / "merged" / "pytest.xml").exists()
+
+
+class TestAPIEngine:
+    """数据驱动 API 引擎测试"""
+    
+    class FakeResponse:
+        def __init__(self, status_code, body):
+            self.status_code = status_code
+            self.body = body
+        
+        def json(self):
+            return self.body
+    
+    class FakeSession:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            self.calls = []
+        
+        def request(self, method, url, **kwargs):
+            time.sleep(0.2)
+            self.calls.append((method, url))
+            return TestAPIEngine.FakeResponse(200, {"id": 1})
+        
+        def close(self):
+            pass
+    
+    def test_build_case_formats_path_params(self):
+        """测试路径占位符由 params 填充，其余 params 作为查询参数"""
+        case = build_case("USER_GET", {"method": "get", "endpoint": "/api/users/{id}",
+                                       "base_url": "https://reqres.in/", "params": {"id": 2, "page": 1}})
+        assert case.method == "GET"
+        assert case.url == "https://reqres.in/api/users/2"
+        assert case.params == {"page": 1}
+        assert case.host == "https://reqres.in"
+    
+    def test_validate_status_and_fields(self):
+        """测试校验状态码和字段，列表响应校验第一个元素"""
+        case = build_case("POSTS", {"method": "GET", "endpoint": "/posts", "base_url": "https://x",
+                                    "expected_fields": ["id", "title"]})
+        assert validate(case, self.FakeResponse(200, [{"id": 1, "title": "t"}])) == []
+        errors = validate(case, self.FakeResponse(404, [{"id": 1}]))
+        assert len(errors) == 2 and "title" in errors[1]
+    
+    def test_cases_run_concurrently_with_one_session_per_host(self):
+        """测试用例并发执行，同一主机共用一个会话"""
+        cases = load_cases({f"CASE_{index}": {"method": "GET", "endpoint": f"/item/{index}",
+                                              "base_url": f"https://host{index % 2}.example"}
+                            for index in range(6)})
+        sessions = []
+        
+        def factory(**kwargs):
+            sessions.append(self.FakeSession(**kwargs))
+            return sessions[-1]
+        
+        started = time.monotonic()
+        with APIEngine(max_workers=6, session_factory=factory) as engine:
+            results = engine.run(cases)
+        assert time.monotonic() - started < 0.6
+        assert all(result.passed for result in results.values())
+        assert len(sessions) == 2 and all(session.kwargs["pool_maxsize"] == 6 for session in sessions)
+
+
+class TestHTTPClient:
+    """连接池会话测试"""
+    
+    def test_session_pool_and_retry_policy(self):
+        """测试基础地址和幂等请求重试策略：读超时不重试，只重试网关类状态码"""
+        session = create_session(base_url="https://reqres.in/api/", retries=3)
+        retry = session.adapters["https://"].max_retries
+        assert session.base_url == "https://reqres.in/api"
+        assert retry.total == 3 and retry.read is False
+        assert set(retry.status_forcelist) == {502, 503, 504}
+
+
+class TestRobotAPISessions:
+    """Robot API 会话缓存库测试"""
+    
+    class FakeSession:
+        def __init__(self, statuses, **kwargs):
+            self.kwargs = kwargs
+            self.statuses = list(statuses)
+            self.closed = False
+        
+        def request(self, method, url, **kwargs):
+            response = TestAPIEngine.FakeResponse(self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0], {})
+            response.url = url
+            return response
+        
+        def close(self):
+            self.closed = True
+    
+    @pytest.fixture
+    def sessions(self, monkeypatch):
+        created = []
+        
+        def factory(**kwargs):
+            created.append(self.FakeSession([200], **kwargs))
+            return created[-1]
+        
+        monkeypatch.setattr(robot_api_sessions, "create_session", factory)
+        return created
+    
+    def test_sessions_cached_by_base_url_and_headers(self, sessions):
+        """测试相同 base_url + 请求头复用会话，请求头不同时新建，suite 结束时全部关闭"""
+        library = robot_api_sessions.RobotAPISessions(pool_maxsize="20")
+        first = library.get_api_session("https://reqres.in/api/", {"A": "1", "B": "2"})
+        assert library.get_api_session("https://reqres.in/api", {"B": "2", "A": "1"}) is first
+        with_token = library.get_api_session("https://reqres.in/api", {"A": "1", "B": "2"}, auth_token="t")
+        assert with_token is not first
+        assert with_token.kwargs["headers"]["Authorization"] == "Bearer t"
+        assert first.kwargs["pool_maxsize"] == 20
+        library._end_suite("Suite", {})
+        assert all(session.closed for session in sessions)
+        assert library.get_api_session("https://reqres.in/api", {"A": "1", "B": "2"}) is not first
+    
+    def test_send_request_retries_until_expected_status(self, monkeypatch):
+        """测试状态码不符时重试，用尽次数后失败"""
+        session = self.FakeSession([503, 200])
+        monkeypatch.setattr(robot_api_sessions, "create_session", lambda **kwargs: session)
+        library = robot_api_sessions.RobotAPISessions()
+        assert library.send_api_request("get", "https://x", "/users", retries=2, delay=0).status_code == 200
+        session.statuses = [503]
+        with pytest.raises(AssertionError, match="Expected status 200 but got 503"):
+            library.send_api_request("get", "https://x", "/users", retries="2", delay="0")
+
+
+class TestSeleniumDriverPool:
+    """Selenium 驱动池测试"""
+    
+    class FakeDriver:
+        def __init__(self):
+            self.window_handles = ["main"]
+            self.scripts = []
+            self.cookies_cleared = False
+            self.url = None
+            self.alive = True
+            self.switch_to = self
+        
+        def window(self, handle):
+            self.current = handle
+        
+        def close(self):
+            self.window_handles.remove(self.current)
+        
+        def execute_script(self, script):
+            if not self.alive:
+                raise RuntimeError("session deleted")
+            self.scripts.append(script)
+            return 1
+        
+        def delete_all_cookies(self):
+            self.cookies_cleared = True
+        
+        def get(self, url):
+            self.url = url
+    
+    class FakeHelper:
+        def __init__(self, browser=None, headless=None, screenshot_on_failure=True):
+            self.browser = browser
+            self.headless = headless
+            self.screenshot_on_failure = screenshot_on_failure
+            self.driver = None
+            self.quit_called = False
+        
+        def start_browser(self):
+            self.driver = TestSeleniumDriverPool.FakeDriver()
+        
+        def quit(self):
+            self.quit_called = True
+            self.driver = None
+    
+    @pytest.fixture(autouse=True)
+    def fake_helper(self, monkeypatch):
+        monkeypatch.setattr(driver_pool, "SeleniumHelper", self.FakeHelper)
+    
+    def test_release_resets_state_and_reuses_driver(self):
+        """测试归还时清理标签页、Storage 和 Cookie 并回到空白页，再次借出复用同一驱动"""
+        pool = SeleniumDriverPool(max_idle=1, max_uses=0)
+        helper = pool.acquire("chrome", True)
+        helper.driver.window_handles.append("popup")
+        pool.release(helper)
+        driver = helper.driver
+        assert driver.window_handles == ["main"]
+        assert any("localStorage.clear()" in script and "sessionStorage.clear()" in script
+                   for script in driver.scripts)
+        assert driver.cookies_cleared and driver.url == "about:blank"
+        assert pool.acquire("chrome", True, screenshot_on_failure=False) is helper
+        assert helper.screenshot_on_failure is False
+        assert pool.acquire("chrome", True) is not helper
+    
+    def test_unhealthy_worn_out_and_surplus_drivers_are_closed(self):
+        """测试不健康、超过复用次数和超出空闲上限的驱动被关闭"""
+        pool = SeleniumDriverPool(max_idle=1, max_uses=2)
+        first, second = pool.acquire("chrome", True), pool.acquire("chrome", True)
+        pool.release(first)
+        pool.release(second)
+        assert second.quit_called and not first.quit_called
+        
+        first.driver.alive = False
+        replacement = pool.acquire("chrome", True)
+        assert replacement is not first and first.quit_called
+        
+        pool.release(replacement)
+        assert not replacement.quit_called
+        assert pool.acquire("chrome", True) is replacement
+        pool.release(replacement)
+        assert replacement.quit_called
+        pool.close_all()
+
+
+class TestAuthStateCache:
+    """登录态缓存测试"""
+    
+    @staticmethod
+    def write_state(path, *expires):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"cookies": [{"name": f"c{index}", "expires": value}
+                                                for index, value in enumerate(expires)]}), encoding="utf-8")
+    
+    def test_freshness_follows_cookie_expiry_and_age(self, tmp_path):
+        """测试 Cookie 在最小剩余有效期内过期或文件超过最长复用时间时视为过期"""
+        cache = AuthStateCache(state_dir=tmp_path, max_age=3600)
+        path = cache.state_path("standard")
+        assert not cache._is_fresh(path)
+        self.write_state(path, -1, time.time() + 600)
+        assert cache._is_fresh(path)
+        self.write_state(path, time.time() + 10)
+        assert not cache._is_fresh(path)
+        self.write_state(path, time.time() + 600)
+        old = time.time() - 7200
+        os.utime(path, (old, old))
+        assert not cache._is_fresh(path)
+        path.write_text("{broken", encoding="utf-8")
+        assert not cache._is_fresh(path)
+    
+    def test_concurrent_callers_log_in_once(self, tmp_path, monkeypatch):
+        """测试多个调用方同时缺少登录态时只登录一次，等待锁的调用方复用新保存的登录态"""
+        cache = AuthStateCache(state_dir=tmp_path, max_age=3600)
+        logins = []
+        
+        def fake_login(browser, user_type, path):
+            logins.append(user_type)
+            time.sleep(0.2)
+            self.write_state(path, time.time() + 600)
+        
+        monkeypatch.setattr(cache, "_login_and_save", fake_login)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            paths = list(executor.map(lambda _: cache.get_state(None, "standard"), range(3)))
+        assert logins == ["standard"]
+        assert set(paths) == {str(cache.state_path("standard"))}
+        
+        self.write_state(cache.state_path("standard"), time.time() + 10)
+        cache.get_state(None, "standard")
+        assert len(logins) == 2
+
+
+class TestSharedPlaywright:
+    """共享 Playwright 引用计数测试"""
+    
+    class FakeBrowser:
+        def __init__(self, key):
+            self.key = key
+            self.closed = False
+            self.fail_context = False
+        
+        def is_connected(self):
+            return not self.closed
+        
+        def new_context(self, **options):
+            if self.fail_context:
+                raise RuntimeError("context failed")
+            return options
+        
+        def close(self):
+            self.closed = True
+    
+    class FakePlaywright:
+        def __init__(self):
+            self.started = 0
+            self.stopped = 0
+        
+        def __call__(self):
+            return self
+        
+        def start(self):
+            self.started += 1
+            return self
+        
+        def stop(self):
+            self.stopped += 1
+    
+    @pytest.fixture
+    def playwright(self, monkeypatch):
+        fake = self.FakePlaywright()
+        monkeypatch.setattr(shared_playwright, "sync_playwright", fake)
+        monkeypatch.setattr(shared_playwright, "launch_browser",
+                            lambda playwright, name, headless: self.FakeBrowser((name, headless)))
+        return fake
+    
+    def test_stops_only_after_last_release(self, playwright):
+        """测试同一浏览器只启动一次，最后一个引用归还后才关闭浏览器并停止驱动"""
+        shared = SharedPlaywright(keep_alive=False)
+        chromium = shared.acquire_browser("Chromium", True)
+        assert shared.acquire_browser("chromium", True) is chromium
+        firefox = shared.acquire_browser("firefox", True)
+        assert playwright.started == 1
+        
+        shared.release_browser("chromium", True)
+        assert not chromium.closed
+        shared.release_browser("chromium", True)
+        assert chromium.closed and not firefox.closed and playwright.stopped == 0
+        shared.release_browser("chromium", True)
+        shared.release_browser("firefox", True)
+        assert firefox.closed and playwright.stopped == 1
+    
+    def test_keep_alive_and_failed_context_release(self, playwright):
+        """测试 keep_alive 时引用归零不关闭浏览器，创建上下文失败时归还引用"""
+        shared = SharedPlaywright(keep_alive=True)
+        browser = shared.acquire_browser()
+        browser.fail_context = True
+        with pytest.raises(RuntimeError):
+            shared.new_context()
+        shared.release_browser()
+        assert not browser.closed and shared._refs[("chromium", True)] == 0
+        shared.shutdown()
+        assert browser.closed and playwright.stopped == 1
+
+
+class TestPlaywrightHelper:
+    """PlaywrightHelper 浏览器归属测试"""
+    
+    class FakePage:
+        def __init__(self, context):
+            self.context = context
+            self.closed = False
+            self.visited = []
+        
+        def goto(self, url):
+            self.visited.append(url)
+        
+        def is_closed(self):
+            return self.closed or self.context.closed
+        
+        def evaluate(self, script, arg=None):
+            self.visited.append(arg)
+        
+        def wait_for_url(self, predicate, timeout):
+            pass
+    
+    class FakeContext:
+        def __init__(self, browser, options):
+            self.browser = browser
+            self.options = options
+            self.closed = False
+        
+        def new_page(self):
+            return TestPlaywrightHelper.FakePage(self)
+        
+        def close(self):
+            self.closed = True
+    
+    class FakeBrowser:
+        def __init__(self):
+            self.contexts = []
+            self.closed = False
+        
+        def new_context(self, **options):
+            self.contexts.append(TestPlaywrightHelper.FakeContext(self, options))
+            return self.contexts[-1]
+        
+        def close(self):
+            self.closed = True
+    
+    @pytest.fixture(autouse=True)
+    def routes(self, monkeypatch):
+        """记录 HAR / 资源屏蔽路由注册"""
+        applied = []
+        monkeypatch.setattr(playwright_helper, "apply_har", lambda context, flow: applied.append(("har", flow)))
+        monkeypatch.setattr(playwright_helper, "apply_resource_blocking",
+                            lambda context: applied.append(("blocking", context)))
+        return applied
+    
+    def test_attached_browser_survives_quit(self, routes):
+        """测试复用共享浏览器时 quit() 只关闭上下文，不关闭浏览器"""
+        browser = self.FakeBrowser()
+        helper = PlaywrightHelper("chromium", True)
+        page = helper.attach_to_browser(browser, har_flow="login", storage_state="state.json")
+        context = browser.contexts[0]
+        assert page.context is context and context.options["storage_state"] == "state.json"
+        assert routes == [("har", "login"), ("blocking", context)]
+        
+        helper.quit()
+        assert context.closed and not browser.closed
+        assert helper.browser is None and helper.page is None
+    
+    def test_new_page_isolates_contexts(self):
+        """测试 new_page 每次创建独立上下文，未启动浏览器时报错"""
+        with pytest.raises(RuntimeError):
+            PlaywrightHelper().new_page()
+        browser = self.FakeBrowser()
+        helper = PlaywrightHelper()
+        first = helper.attach_to_browser(browser)
+        second = helper.new_page()
+        assert first.context is not second.context and len(browser.contexts) == 2
+    
+    def test_owned_browser_closed_on_quit(self, monkeypatch):
+        """测试自行启动的浏览器在 quit() 时关闭并停止 Playwright"""
+        browser = self.FakeBrowser()
+        stopped = []
+        
+        class FakePlaywright:
+            def start(self):
+                return self
+            
+            def stop(self):
+                stopped.append(True)
+        
+        monkeypatch.setattr(playwright_helper, "sync_playwright", FakePlaywright)
+        monkeypatch.setattr(playwright_helper, "launch_browser", lambda playwright, name, headless: browser)
+        helper = PlaywrightHelper("chromium", True)
+        helper.start_browser()
+        helper.quit()
+        assert browser.contexts[0].closed and browser.closed and stopped == [True]
+    
+    def test_prewarmed_url_skips_first_navigation(self):
+        """测试接管预热上下文后首次导航到预热 URL 不重新加载，再次导航正常加载"""
+        browser = self.FakeBrowser()
+        context = browser.new_context()
+        page = context.new_page()
+        helper = PlaywrightHelper()
+        helper.attach_to_context(context, page, prewarmed_url="https://example.com")
+        helper.navigate_to("https://example.com")
+        helper.navigate_to("https://example.com")
+        assert page.visited == ["https://example.com"]
+        helper.quit()
+        assert context.closed and not browser.closed
+
+
+class TestContextPrewarmer:
+    """ContextPrewarmer 预热池测试（复用 TestPlaywrightHelper 的假浏览器）"""
+    
+    FakeBrowser = TestPlaywrightHelper.FakeBrowser
+    
+    @pytest.fixture(autouse=True)
+    def clock(self, monkeypatch):
+        """可控的 monotonic 时钟，并屏蔽资源屏蔽路由注册"""
+        now = [100.0]
+        monkeypatch.setattr(playwright_helper.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(playwright_helper, "apply_resource_blocking", lambda context: None)
+        return now
+    
+    def test_fill_and_refill_to_depth(self):
+        """测试 fill 预热 depth 个上下文，acquire 命中后立即补充"""
+        browser = self.FakeBrowser()
+        prewarmer = ContextPrewarmer(browser, depth=2, url="https://example.com", max_age=60)
+        prewarmer.fill()
+        assert len(browser.contexts) == 2
+        
+        context, page, url = prewarmer.acquire()
+        assert context is browser.contexts[0] and page.context is context
+        assert url == "https://example.com" and page.visited == ["https://example.com"]
+        assert len(browser.contexts) == 3 and len(prewarmer._ready) == 2
+        assert prewarmer.stats == {"hits": 1, "misses": 0, "discarded": 0}
+    
+    def test_stale_and_closed_pages_discarded(self, clock):
+        """测试超过 max_age 或页面已关闭的预热上下文被丢弃"""
+        browser = self.FakeBrowser()
+        prewarmer = ContextPrewarmer(browser, depth=2, url="", max_age=30)
+        prewarmer.fill()
+        stale, closed = browser.contexts
+        closed.closed = True
+        clock[0] += 31
+        
+        context, _, url = prewarmer.acquire()
+        assert stale.closed and context not in (stale, closed)
+        assert url == ""
+        assert prewarmer.stats == {"hits": 0, "misses": 1, "discarded": 2}
+    
+    def test_depth_zero_creates_on_demand(self):
+        """测试 depth=0 时不预热，每次 acquire 按需创建"""
+        browser = self.FakeBrowser()
+        prewarmer = ContextPrewarmer(browser, depth=0, url="", max_age=60)
+        prewarmer.fill()
+        assert browser.contexts == []
+        
+        first, _, _ = prewarmer.acquire()
+        second, _, _ = prewarmer.acquire()
+        assert browser.contexts == [first, second] and not prewarmer._ready
+        assert prewarmer.stats["misses"] == 2
+    
+    def test_close_discards_unused_contexts(self):
+        """测试 close 只关闭未使用的预热上下文，不关闭浏览器和已交出的上下文"""
+        browser = self.FakeBrowser()
+        prewarmer = ContextPrewarmer(browser, depth=2, url="", max_age=60)
+        prewarmer.fill()
+        in_use, _, _ = prewarmer.acquire()
+        
+        prewarmer.close()
+        assert not in_use.closed and not browser.closed
+        assert [context.closed for context in browser.contexts[1:]] == [True, True]
+        assert prewarmer.stats["discarded"] == 2
+    
+    def test_ui_operations_reuses_prewarmed_page(self):
+        """测试 UIOperations 接管预热上下文后首次导航到预热 URL 不重新加载"""
+        browser = self.FakeBrowser()
+        prewarmer = ContextPrewarmer(browser, depth=1, url="https://example.com", max_age=60)
+        ui = UIOperations()
+        page = ui.attach_to_context(*prewarmer.acquire())
+        ui.navigate_to("https://example.com")
+        ui.navigate_to("https://example.com")
+        assert page.visited == ["https://example.com", "https://example.com"]
+        ui.close_browser()
+        assert page.context.closed and not browser.closed
+
+class TestAsyncUIOperations:
+    """异步UI操作层测试（假的异步浏览器 / 上下文 / 页面）"""
+    
+    class FakePage:
+        url = "https://www.saucedemo.com/"
+        
+        def __init__(self, context=None, batch_results=None):
+            self.context = context
+            self.batch_results = batch_results or []
+            self.actions = []
+            self.visible = set()
+        
+        async def evaluate(self, script, arg=None):
+            return self.batch_results
+        
+        async def fill(self, selector, text, timeout):
+            self.actions.append((selector, text, timeout))
+        
+        async def click(self, selector, timeout):
+            self.actions.append((selector, None, timeout))
+        
+        def locator(self, selector):
+            return TestAsyncUIOperations.FakeLocator(self, [selector])
+    
+    class FakeLocator:
+        """支持 or_ / first / wait_for / is_visible 的假 Locator"""
+        
+        def __init__(self, page, selectors):
+            self.page = page
+            self.selectors = selectors
+        
+        def or_(self, other):
+            return TestAsyncUIOperations.FakeLocator(self.page, self.selectors + other.selectors)
+        
+        @property
+        def first(self):
+            return self
+        
+        async def wait_for(self, state, timeout):
+            if not self.page.visible.intersection(self.selectors):
+                raise PlaywrightTimeoutError("timeout")
+        
+        async def is_visible(self):
+            return bool(self.page.visible.intersection(self.selectors))
+    
+    class FakeContext:
+        def __init__(self, browser, options):
+            self.browser = browser
+            self.options = options
+            self.closed = False
+        
+        async def new_page(self):
+            return TestAsyncUIOperations.FakePage(self)
+        
+        async def close(self):
+            self.closed = True
+    
+    class FakeBrowser:
+        def __init__(self):
+            self.contexts = []
+            self.closed = False
+        
+        async def new_context(self, **options):
+            self.contexts.append(TestAsyncUIOperations.FakeContext(self, options))
+            return self.contexts[-1]
+        
+        async def close(self):
+            self.closed = True
+    
+    class FakePolicy:
+        def __init__(self, seconds=2.0):
+            self.seconds = seconds
+            self.recorded = []
+        
+        def timeout_for(self, url, locator):
+            return self.seconds
+        
+        def record(self, url, locator, seconds):
+            self.recorded.append((url, locator))
+    
+    @pytest.fixture(autouse=True)
+    def routes(self, monkeypatch):
+        """记录异步上下文上的 HAR / 资源屏蔽路由注册"""
+        applied = []
+        
+        async def fake_har(context, flow=None):
+            applied.append(("har", flow))
+        
+        async def fake_blocking(context):
+            applied.append(("blocking", context))
+        
+        monkeypatch.setattr(async_ui_operations, "async_apply_har", fake_har)
+        monkeypatch.setattr(async_ui_operations, "async_apply_resource_blocking", fake_blocking)
+        return applied
+    
+    def make_ui(self, page):
+        ui = AsyncUIOperations()
+        ui.page = page
+        ui.timeouts = self.FakePolicy()
+        return ui
+    
+    def test_timed_uses_adaptive_timeout_and_records(self):
+        """测试 _timed 未显式传入超时时使用自适应超时，并记录定位器耗时"""
+        page = self.FakePage()
+        ui = self.make_ui(page)
+        asyncio.run(ui.fill("id=user-name", "standard_user"))
+        asyncio.run(ui.fill("id=password", "secret", timeout=5))
+        assert page.actions == [(playwright_selector("id=user-name"), "standard_user", 2000),
+                               (playwright_selector("id=password"), "secret", 5000)]
+        assert ui.timeouts.recorded == [(page.url, "id=user-name"), (page.url, "id=password")]
+    
+    def test_fill_form_falls_back_per_field(self, monkeypatch):
+        """测试批量填写未完成和无法换算为 DOM 查询的字段回退为逐字段 fill"""
+        monkeypatch.setattr(async_ui_operations.settings, "FORM_BATCH_FILL", True)
+        page = self.FakePage(batch_results=[True, False])
+        ui = self.make_ui(page)
+        asyncio.run(ui.fill_form({"id=first-name": "Ann", "id=last-name": "Lee", "text=Zip": 12345}))
+        assert [(selector, text) for selector, text, _ in page.actions] == [
+            (playwright_selector("text=Zip"), "12345"),
+            (playwright_selector("id=last-name"), "Lee"),
+        ]
+    
+    def test_new_session_shares_browser(self, routes):
+        """测试 new_session 在同一浏览器上创建独立上下文，并经过 HAR / 资源屏蔽"""
+        with pytest.raises(RuntimeError):
+            asyncio.run(AsyncUIOperations().new_session())
+        browser = self.FakeBrowser()
+        root = AsyncUIOperations()
+        root.browser = browser
+        session = asyncio.run(root.new_session(storage_state="state.json", har_flow="checkout"))
+        context = browser.contexts[0]
+        assert session.browser is browser and session.context is context and session.page.context is context
+        assert context.options["storage_state"] == "state.json"
+        assert routes == [("har", "checkout"), ("blocking", context)]
+        assert not session._owns_browser
+    
+    def test_close_browser_owned_and_shared(self, monkeypatch):
+        """测试会话关闭只关闭上下文，自行启动的实例同时关闭浏览器和 Playwright"""
+        browser = self.FakeBrowser()
+        stopped = []
+        
+        class FakePlaywright:
+            async def start(self):
+                return self
+            
+            async def stop(self):
+                stopped.append(True)
+        
+        async def fake_launch(playwright, name, headless, **options):
+            return browser
+        
+        monkeypatch.setattr(async_ui_operations, "async_playwright", FakePlaywright)
+        monkeypatch.setattr(async_ui_operations, "launch_browser", fake_launch)
+        
+        async def scenario():
+            root = AsyncUIOperations()
+            await root.start_browser()
+            session = await root.new_session()
+            await session.close_browser()
+            assert session.context is None and not browser.closed and stopped == []
+            await root.close_browser()
+        
+        asyncio.run(scenario())
+        assert all(context.closed for context in browser.contexts)
+        assert browser.closed and stopped == [True]
+    
+    def test_login_returns_on_error(self):
+        """测试登录失败时 login 等到错误提示即返回，不等满超时抛异常"""
+        page = self.FakePage()
+        saucedemo = AsyncSauceDemoOperations(self.make_ui(page))
+        page.visible.add(saucedemo.locators.LOGIN_ERROR_CONTAINER)
+        asyncio.run(saucedemo.login("locked_out_user", "secret_sauce"))
+        locators = saucedemo.locators
+        assert [text for _, text, _ in page.actions] == ["locked_out_user", "secret_sauce", None]
+        assert saucedemo.ui.timeouts.recorded[-1] == (
+            page.url, f"{locators.PRODUCTS_CONTAINER} | {locators.LOGIN_ERROR_CONTAINER}")
+    
+    def test_retry_supports_coroutines(self, monkeypatch):
+        """测试重试装饰器作用于协程函数时异步重试"""
+        calls = []
+        sleeps = []
+        
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+        
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        
+        @retry_on_failure(max_attempts=3, delay=0.5, exceptions=(PlaywrightTimeoutError,))
+        async def flaky():
+            calls.append(True)
+            if len(calls) < 3:
+                raise PlaywrightTimeoutError("timeout")
+            return "ok"
+        
+        assert asyncio.run(flaky()) == "ok"
+        assert len(calls) == 3 and sleeps == [0.5, 1.0]
+
 class TestFixtures:
     """测试 pytest fixtures"""
     
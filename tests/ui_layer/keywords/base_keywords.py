@@ -9,7 +9,13 @@
 from robot.api.deco import keyword
 from robot.api import logger
 from robot.libraries.BuiltIn import BuiltIn
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+import config.settings as settings
+from utils.shared_playwright import get_shared_playwright
+from utils.wait_engine import WaitEngine
+from utils.page_snapshot import invalidate_snapshot
+from utils.form_fill import batch_fill
+from utils.dom_probe import DomProbe, check_mode
 
 
 class BaseKeywords:
@@ -21,21 +27,17 @@ class BaseKeywords:
         self.page = None
         self.browser = None
         self.context = None
-        self.playwright = None
+        self.browser_type = None
+        self._ready_state = None
+        self._ready_locator = None
     
     @keyword("打开浏览器")
     def open_browser(self, url, browser_type="chromium"):
-        """打开浏览器并导航到指定 URL"""
+        """打开浏览器并导航到指定 URL（浏览器进程级共享，每次打开创建独立的上下文）"""
         try:
-            self.playwright = sync_playwright().start()
-            if browser_type == "chromium":
-                self.browser = self.playwright.chromium.launch(headless=False)
-            elif browser_type == "firefox":
-                self.browser = self.playwright.firefox.launch(headless=False)
-            elif browser_type == "webkit":
-                self.browser = self.playwright.webkit.launch(headless=False)
-            
-            self.context = self.browser.new_context()
+            self.context = get_shared_playwright().new_context(browser_type, headless=False)
+            self.browser_type = browser_type
+            self.browser = self.context.browser
             self.page = self.context.new_page()
             self.page.goto(url)
             logger.info(f"浏览器已打开，访问 URL: {url}")
@@ -47,18 +49,17 @@ class BaseKeywords:
     def close_browser(self):
         """关闭浏览器"""
         try:
-            if self.page:
-                self.page.close()
             if self.context:
-                self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
+                # 只关闭本套件的上下文，共享浏览器由引用计数决定是否关闭
+                get_shared_playwright().close_context(self.context, self.browser_type, headless=False)
             logger.info("浏览器已关闭")
         except Exception as e:
             logger.error(f"关闭浏览器失败: {str(e)}")
             raise
+        finally:
+            self.page = None
+            self.context = None
+            self.browser = None
     
     @keyword("导航到")
     def navigate_to(self, url):
@@ -74,6 +75,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.click(locator)
+        self._after_mutation()
         logger.info(f"点击元素: {locator}")
     
     @keyword("输入")
@@ -82,6 +84,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.fill(locator, text)
+        self._after_mutation()
         logger.info(f"输入文本 '{text}' 到: {locator}")
     
     @keyword("清空输入框")
@@ -90,6 +93,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.fill(locator, "")
+        self._after_mutation()
         logger.info(f"清空输入框: {locator}")
     
     @keyword("获取文本")
@@ -144,6 +148,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.select_option(locator, option_value)
+        self._after_mutation()
         logger.info(f"选择选项: {locator} - {option_value}")
     
     @keyword("获取页面标题")
@@ -185,18 +190,83 @@ class BaseKeywords:
                 raise AssertionError(f"元素不可点击: {locator}")
         logger.info(f"元素可点击: {locator}")
     
+    @keyword("等待文本变化")
+    def wait_for_text_change(self, locator, initial_text, timeout=10000):
+        """等待元素文本不再等于初始文本（浏览器内监听 DOM 变化，条件满足立即返回）"""
+        if not self._waits().text_changed(locator, initial_text, timeout=int(timeout)):
+            raise AssertionError(f"等待文本变化超时: {locator}")
+        logger.info(f"文本已变化: {locator}")
+    
+    @keyword("等待元素数量")
+    def wait_for_element_count(self, locator, count, timeout=10000):
+        """等待匹配元素数量达到指定值"""
+        if not self._waits().count_reached(locator, int(count), timeout=int(timeout)):
+            raise AssertionError(f"等待元素数量超时: {locator} 未达到 {count}")
+        logger.info(f"元素数量已达到: {locator} >= {count}")
+    
+    @keyword("等待属性值")
+    def wait_for_attribute_value(self, locator, attribute, value, timeout=10000):
+        """等待元素属性等于指定值"""
+        if not self._waits().attribute_equals(locator, attribute, value, timeout=int(timeout)):
+            raise AssertionError(f"等待属性值超时: {locator} - {attribute} != {value}")
+        logger.info(f"属性值已满足: {locator} - {attribute} = {value}")
+    
+    @keyword("等待元素稳定")
+    def wait_for_element_stable(self, locator=None, quiet=100, timeout=10000):
+        """等待元素（默认整个页面）在安静期内无 DOM 变化且位置不变"""
+        if not self._waits().element_stable(locator, quiet=int(quiet), timeout=int(timeout)):
+            raise AssertionError(f"等待元素稳定超时: {locator or 'page'}")
+        logger.info(f"元素已稳定: {locator or 'page'}")
+    
+    def _after_mutation(self):
+        """页面被点击/输入/选择等操作修改后调用，使缓存的页面快照失效"""
+        invalidate_snapshot(self.page)
+    
+    def _probe(self):
+        """按声明的就绪状态读取当前 DOM 的探针"""
+        if not self.page:
+            raise RuntimeError("浏览器未初始化")
+        return DomProbe(self.page, self._ready_state, self._ready_locator)
+    
+    def _waits(self):
+        """当前页面的事件驱动等待引擎（Robot 静态库会把公开属性当作关键字扫描，因此保持私有）"""
+        if not self.page:
+            raise RuntimeError("浏览器未初始化")
+        return WaitEngine(self.page)
+    
+    @keyword("声明页面就绪状态")
+    def declare_page_ready(self, ready_state="complete", locator=None):
+        """
+        声明即时断言（now 模式）读取 DOM 前页面需达到的状态
+        
+        Args:
+            ready_state: document.readyState 需达到的值（loading/interactive/complete）
+            locator: 就绪元素（CSS / XPath），出现后页面才视为就绪，例如页面主容器
+        """
+        self._ready_state = ready_state
+        self._ready_locator = locator or None
+        logger.info(f"页面就绪状态: {ready_state}" + (f"，就绪元素: {locator}" if locator else ""))
+    
     @keyword("验证元素不存在")
-    def element_should_not_exist(self, locator, timeout=1000):
-        """验证元素不存在"""
+    def element_should_not_exist(self, locator, timeout=1000, mode="now"):
+        """
+        验证元素不存在
+        
+        Args:
+            mode: now（默认）页面就绪并渲染一帧后按当前 DOM 判断；eventually 等待元素移除，最长 timeout 毫秒
+        """
         if not self.page:
             raise RuntimeError("浏览器未初始化")
-        try:
-            self.page.wait_for_selector(locator, timeout=timeout, state="detached")
-        except Exception:
-            # 元素存在，需要检查
-            element = self.page.query_selector(locator)
-            if element:
-                raise AssertionError(f"元素不应该存在，但找到了: {locator}")
+        if check_mode(mode) == "eventually":
+            try:
+                self.page.wait_for_selector(locator, timeout=timeout, state="detached")
+                logger.info(f"元素不存在: {locator}")
+                return
+            except Exception:
+                pass
+        state = self._probe().state(locator)
+        if state.exists:
+            raise AssertionError(f"元素不应该存在，但找到了: {locator}")
         logger.info(f"元素不存在: {locator}")
     
     @keyword("验证文本等于")
@@ -227,8 +297,7 @@ class BaseKeywords:
         """验证元素不可见"""
         if not self.page:
             raise RuntimeError("浏览器未初始化")
-        element = self.page.query_selector(locator)
-        if element and element.is_visible():
+        if self._probe().state(locator).visible:
             raise AssertionError(f"元素应该不可见，但可见: {locator}")
         logger.info(f"元素不可见: {locator}")
     
@@ -264,6 +333,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.dblclick(locator)
+        self._after_mutation()
         logger.info(f"双击元素: {locator}")
     
     @keyword("右键点击")
@@ -272,6 +342,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.click(locator, button="right")
+        self._after_mutation()
         logger.info(f"右键点击元素: {locator}")
     
     @keyword("悬停在元素上")
@@ -282,6 +353,26 @@ class BaseKeywords:
         self.page.hover(locator)
         logger.info(f"悬停在元素上: {locator}")
     
+    @keyword("批量填写表单")
+    def fill_form(self, form_data, *per_field):
+        """
+        一次页面脚本调用填写多个输入框
+        
+        Args:
+            form_data: 定位器 -> 文本的字典，例如 &{form}
+            *per_field: 有自定义输入处理、需要逐字段输入的定位器
+        """
+        if not self.page:
+            raise RuntimeError("浏览器未初始化")
+        values = {locator: str(text) for locator, text in form_data.items()}
+        pending = list(values)
+        if settings.FORM_BATCH_FILL:
+            pending = batch_fill(self.page, values, per_field)
+        for locator in pending:
+            self.page.fill(locator, values[locator])
+        self._after_mutation()
+        logger.info(f"批量填写表单: {len(values)} 个字段，逐字段输入 {len(pending)} 个")
+    
     @keyword("清空并输入")
     def clear_and_input_text(self, locator, text):
         """清空输入框并输入新文本"""
@@ -289,6 +380,7 @@ class BaseKeywords:
             raise RuntimeError("浏览器未初始化")
         self.page.fill(locator, "")
         self.page.fill(locator, text)
+        self._after_mutation()
         logger.info(f"清空并输入文本 '{text}' 到: {locator}")
     
     @keyword("上传文件")
@@ -297,6 +389,7 @@ class BaseKeywords:
         if not self.page:
             raise RuntimeError("浏览器未初始化")
         self.page.set_input_files(locator, file_path)
+        self._after_mutation()
         logger.info(f"上传文件: {file_path} 到: {locator}")
     
     @keyword("接受对话框")
@@ -10,6 +10,8 @@ from robot.api.deco import keyword
 from robot.api import logger
 from .base_keywords import BaseKeywords
 from ..locators.saucedemo_locators import SauceDemoLocators
+from utils.auth_state import get_auth_state_cache
+from utils.page_snapshot import get_snapshot
 
 
 class SauceDemoKeywords(BaseKeywords):
@@ -27,6 +29,22 @@ class SauceDemoKeywords(BaseKeywords):
         self.click(self.locators.LOGIN_BUTTON)
         logger.info(f"已使用用户 {username} 登录")
     
+    @keyword("使用缓存登录态进入 SauceDemo")
+    def login_saucedemo_from_cache(self, user_type="standard"):
+        """使用缓存的 storage_state 以已登录状态打开产品页（需先打开浏览器）"""
+        if not self.browser:
+            raise RuntimeError("浏览器未初始化")
+        cache = get_auth_state_cache()
+        if self.page:
+            self.page.close()
+        if self.context:
+            self.context.close()
+        self.context = cache.new_context(self.browser, user_type)
+        self.page = self.context.new_page()
+        self.page.goto(cache.inventory_url)
+        self.page.wait_for_selector(self.locators.PRODUCTS_CONTAINER)
+        logger.info(f"已使用缓存登录态进入产品页: {user_type}")
+    
     @keyword("添加产品到购物车")
     def add_product_to_cart(self, product_index=0):
         """添加产品到购物车"""
@@ -37,15 +55,16 @@ class SauceDemoKeywords(BaseKeywords):
         product = products[product_index]
         add_btn = product.query_selector(self.locators.PRODUCT_ADD_BTN)
         add_btn.click()
+        self._after_mutation()
         logger.info(f"已添加产品 {product_index} 到购物车")
     
     @keyword("验证购物车数量")
     def verify_cart_count(self, expected_count):
         """验证购物车中的产品数量"""
-        count_text = self.get_text(self.locators.SHOPPING_CART_BADGE)
-        if int(count_text) != int(expected_count):
-            raise AssertionError(f"购物车数量不匹配。期望: {expected_count}，实际: {count_text}")
-        logger.info(f"购物车数量验证通过: {count_text}")
+        actual_count = get_snapshot(self.page).cart_badge
+        if actual_count != int(expected_count):
+            raise AssertionError(f"购物车数量不匹配。期望: {expected_count}，实际: {actual_count}")
+        logger.info(f"购物车数量验证通过: {actual_count}")
     
     @keyword("前往购物车")
     def go_to_cart(self):
@@ -62,9 +81,11 @@ class SauceDemoKeywords(BaseKeywords):
     @keyword("填写结账信息")
     def fill_checkout_info(self, first_name, last_name, postal_code):
         """填写结账表单信息"""
-        self.input_text(self.locators.CHECKOUT_FIRST_NAME, first_name)
-        self.input_text(self.locators.CHECKOUT_LAST_NAME, last_name)
-        self.input_text(self.locators.CHECKOUT_POSTAL_CODE, postal_code)
+        self.fill_form({
+            self.locators.CHECKOUT_FIRST_NAME: first_name,
+            self.locators.CHECKOUT_LAST_NAME: last_name,
+            self.locators.CHECKOUT_POSTAL_CODE: postal_code,
+        })
         logger.info(f"已填写结账信息: {first_name} {last_name}")
     
     @keyword("完成结账")
@@ -1,11 +1,19 @@
 # -*- coding: utf-8 -*-
 """
 定位器基类：通用的页面元素定位器
+子类定义时统一解析全部定位器，无效前缀立即报错，tag= 等前缀换算为 Playwright 选择器
 """
 
+from utils.locator_registry import compile_locators
+
+
 class BaseLocators:
     """基础定位器 - 通用元素"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._compiled = compile_locators(cls)
+    
     # 页面通用元素
     PAGE_TITLE = "tag=title"
     PAGE_BODY = "tag=body"
@@ -29,3 +37,6 @@ class BaseLocators:
     ERROR_MESSAGE = "css=.alert-error"
     MODAL_DIALOG = "css=.modal"
     MODAL_CLOSE_BTN = "css=.modal button.close"
+
+
+BaseLocators._compiled = compile_locators(BaseLocators)
@@ -45,6 +45,7 @@ class SauceDemoLocators(BaseLocators):
     MENU_LOGOUT = "id=logout_sidebar_link"
     MENU_INVENTORY = "id=inventory_sidebar_link"
     MENU_CART = "id=cart_sidebar_link"
+    HEADER_TITLE = "css=.title"
     
     # ========== 排序和过滤 ==========
     SORT_DROPDOWN = "css=select[data-test='product_sort_container']"
@@ -6,6 +6,8 @@
 
 from robot.api.deco import keyword
 from robot.api import logger
+from utils.page_snapshot import get_snapshot
+from utils.dom_probe import DomProbe
 from ..keywords.base_keywords import BaseKeywords
 
 
@@ -23,16 +25,26 @@ class BasePage(BaseKeywords):
             self.page = base_keywords.page
             self.browser = base_keywords.browser
             self.context = base_keywords.context
-            self.playwright = base_keywords.playwright
+            self.browser_type = base_keywords.browser_type
+            self._ready_state = base_keywords._ready_state
+            self._ready_locator = base_keywords._ready_locator
         else:
             super().__init__()
     
+    @keyword("获取页面快照")
+    def snapshot(self, refresh=False):
+        """一次读取整页业务状态（商品、价格、按钮、徽章、错误提示），页面未被修改时直接复用缓存"""
+        if not self.page:
+            raise RuntimeError("浏览器未初始化")
+        return get_snapshot(self.page, refresh=refresh)
+    
     @keyword("页面应该包含文本")
     def page_should_contain_text(self, text, timeout=5000):
-        """验证页面包含指定文本"""
+        """验证页面包含指定文本（页面达到声明的就绪状态后立即判断，不等待网络空闲）"""
         if not self.page:
             raise RuntimeError("浏览器未初始化")
-        self.page.wait_for_load_state("networkidle", timeout=timeout)
+        probe = DomProbe(self.page, self._ready_state, self._ready_locator, timeout=int(timeout))
+        probe.ready()
         content = self.page.content()
         if text not in content:
             raise AssertionError(f"页面不包含文本: {text}")
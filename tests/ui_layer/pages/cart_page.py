@@ -33,7 +33,7 @@ class CartPage(BasePage):
     @keyword("获取购物车商品数量")
     def get_cart_item_count(self):
         """获取购物车中的商品数量"""
-        count = self.get_element_count(self.locators.CART_ITEM)
+        count = self.snapshot().item_count
         logger.info(f"购物车商品数量: {count}")
         return count
     
@@ -47,20 +47,10 @@ class CartPage(BasePage):
     
     @keyword("获取购物车徽章数量")
     def get_cart_badge_count(self):
-        """获取购物车图标上的徽章数量"""
-        try:
-            badge = self.page.query_selector(self.locators.SHOPPING_CART_BADGE)
-            if badge:
-                count_text = badge.text_content()
-                count = int(count_text) if count_text else 0
-                logger.info(f"购物车徽章数量: {count}")
-                return count
-            else:
-                logger.info("购物车徽章不存在（购物车为空）")
-                return 0
-        except Exception as e:
-            logger.info(f"获取购物车徽章数量失败: {e}")
-            return 0
+        """获取购物车图标上的徽章数量（徽章不存在即购物车为空，返回 0）"""
+        count = self.snapshot().cart_badge
+        logger.info(f"购物车徽章数量: {count}")
+        return count
     
     @keyword("验证购物车徽章数量")
     def verify_cart_badge_count(self, expected_count):
@@ -94,6 +84,7 @@ class CartPage(BasePage):
         remove_btn = item.query_selector("css=.cart_button")
         if remove_btn:
             remove_btn.click()
+            self._after_mutation()
             logger.info(f"已移除购物车中的商品 {item_index}")
         else:
             raise ValueError(f"商品 {item_index} 没有找到移除按钮")
@@ -46,9 +46,11 @@ class CheckoutPage(BasePage):
     @keyword("填写结账信息")
     def fill_checkout_information(self, first_name, last_name, postal_code):
         """填写完整的结账信息"""
-        self.enter_first_name(first_name)
-        self.enter_last_name(last_name)
-        self.enter_postal_code(postal_code)
+        self.fill_form({
+            self.locators.CHECKOUT_FIRST_NAME: first_name,
+            self.locators.CHECKOUT_LAST_NAME: last_name,
+            self.locators.CHECKOUT_POSTAL_CODE: postal_code,
+        })
         logger.info(f"已填写结账信息: {first_name} {last_name}, {postal_code}")
     
     @keyword("点击继续按钮")
@@ -75,14 +77,23 @@ class CheckoutPage(BasePage):
     def verify_order_complete(self, expected_message="Thank you"):
         """验证订单完成提示信息"""
         self.wait_for_element(self.locators.ORDER_COMPLETE_MSG)
-        self.element_should_exist(self.locators.ORDER_COMPLETE_MSG)
-        if expected_message:
-            self.text_should_contain(self.locators.ORDER_COMPLETE_MSG, expected_message)
+        message = self.snapshot().complete_message
+        if message is None:
+            raise AssertionError(f"元素不存在: {self.locators.ORDER_COMPLETE_MSG}")
+        if expected_message and expected_message not in message:
+            raise AssertionError(f"文本不匹配。期望包含: {expected_message}，实际: {message}")
         logger.info("订单完成验证通过")
     
+    @keyword("获取结账错误提示")
+    def get_checkout_error(self):
+        """获取结账表单的错误提示，没有错误时返回 None"""
+        error = self.snapshot().error
+        logger.info(f"结账错误提示: {error}")
+        return error
+    
     @keyword("获取订单完成消息")
     def get_order_complete_message(self):
         """获取订单完成消息文本"""
-        message = self.get_text(self.locators.ORDER_COMPLETE_MSG)
+        message = self.snapshot().complete_message or ""
         logger.info(f"订单完成消息: {message}")
         return message
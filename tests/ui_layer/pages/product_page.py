@@ -34,7 +34,7 @@ class ProductPage(BasePage):
     @keyword("获取产品数量")
     def get_product_count(self):
         """获取产品数量"""
-        count = self.get_element_count(self.locators.PRODUCT_ITEM)
+        count = self.snapshot().item_count
         logger.info(f"产品数量: {count}")
         return count
     
@@ -50,6 +50,7 @@ class ProductPage(BasePage):
         if not add_btn:
             raise ValueError(f"产品 {product_index} 没有找到添加按钮")
         add_btn.click()
+        self._after_mutation()
         logger.info(f"已添加产品 {product_index} 到购物车")
     
     @keyword("移除产品从购物车")
@@ -63,37 +64,38 @@ class ProductPage(BasePage):
         remove_btn = product.query_selector(self.locators.PRODUCT_REMOVE_BTN)
         if remove_btn:
             remove_btn.click()
+            self._after_mutation()
             logger.info(f"已移除产品 {product_index} 从购物车")
         else:
             logger.warn(f"产品 {product_index} 未在购物车中")
     
+    @keyword("获取所有产品名称")
+    def get_all_product_names(self):
+        """一次获取所有产品名称"""
+        return self.snapshot().item_names
+    
+    @keyword("获取所有产品价格")
+    def get_all_product_prices(self):
+        """一次获取所有产品价格"""
+        return self.snapshot().item_prices
+    
     @keyword("获取产品名称")
     def get_product_name(self, product_index=0):
         """获取指定产品的名称"""
-        products = self.get_product_list()
-        if product_index >= len(products):
+        names = self.get_all_product_names()
+        if product_index >= len(names):
             raise IndexError(f"产品索引超出范围: {product_index}")
-        
-        product = products[product_index]
-        name_element = product.query_selector(self.locators.PRODUCT_NAME)
-        if not name_element:
-            raise ValueError(f"产品 {product_index} 没有找到名称元素")
-        name = name_element.text_content()
+        name = names[product_index]
         logger.info(f"产品 {product_index} 名称: {name}")
         return name
     
     @keyword("获取产品价格")
     def get_product_price(self, product_index=0):
         """获取指定产品的价格"""
-        products = self.get_product_list()
-        if product_index >= len(products):
+        prices = self.get_all_product_prices()
+        if product_index >= len(prices):
             raise IndexError(f"产品索引超出范围: {product_index}")
-        
-        product = products[product_index]
-        price_element = product.query_selector(self.locators.PRODUCT_PRICE)
-        if not price_element:
-            raise ValueError(f"产品 {product_index} 没有找到价格元素")
-        price_text = price_element.text_content()
+        price_text = prices[product_index]
         logger.info(f"产品 {product_index} 价格: {price_text}")
         return price_text
     
@@ -124,16 +126,11 @@ class ProductPage(BasePage):
     @keyword("验证产品已排序")
     def verify_products_sorted(self, sort_type='az'):
         """验证产品是否按指定方式排序"""
-        products = self.get_product_list()
-        if len(products) < 2:
+        product_names = self.get_all_product_names()
+        if len(product_names) < 2:
             logger.info("产品数量少于2个，无需验证排序")
             return
         
-        product_names = []
-        for i in range(len(products)):
-            name = self.get_product_name(i)
-            product_names.append(name)
-        
         sorted_names = sorted(product_names) if sort_type == 'az' else sorted(product_names, reverse=True)
         if product_names != sorted_names:
             raise AssertionError(f"产品未按 {sort_type} 排序")
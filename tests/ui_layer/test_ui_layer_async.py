@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+UI 层测试 - 异步版本
+使用 AsyncUIOperations / AsyncSauceDemoOperations，在一个事件循环中并发驱动多个页面
+"""
+
+import asyncio
+
+import pytest
+from utils.async_ui_operations import AsyncUIOperations
+from utils.async_business_operations import AsyncSauceDemoOperations, run_purchase_flows_concurrently
+from utils.test_data_manager import TestDataManager
+
+
+@pytest.mark.ui
+@pytest.mark.playwright
+class TestSauceDemoAsyncUI:
+    """SauceDemo 应用异步 UI 测试"""
+
+    def test_login_success(self):
+        """测试成功登录"""
+        async def scenario():
+            async with AsyncUIOperations(browser_type="chromium", headless=True) as ui_ops:
+                await ui_ops.start_browser('https://www.saucedemo.com/')
+                saucedemo = AsyncSauceDemoOperations(ui_ops)
+                await saucedemo.login('standard_user', 'secret_sauce')
+                await saucedemo.verify_login_success()
+
+        asyncio.run(scenario())
+
+    def test_login_failed(self):
+        """测试无效用户登录失败"""
+        async def scenario():
+            async with AsyncUIOperations(browser_type="chromium", headless=True) as ui_ops:
+                await ui_ops.start_browser('https://www.saucedemo.com/')
+                saucedemo = AsyncSauceDemoOperations(ui_ops)
+                await saucedemo.login('invalid_user', 'wrong_password')
+                await saucedemo.verify_login_failed()
+
+        asyncio.run(scenario())
+
+    def test_parallel_purchase_flows(self):
+        """测试多个用户类型的购买流程并发执行"""
+        data_manager = TestDataManager()
+        users = [data_manager.get_test_user(user_type)
+                 for user_type in ("standard", "performance_glitch")]
+
+        results = asyncio.run(run_purchase_flows_concurrently(
+            users=users,
+            product_indices=[0, 1],
+            checkout=data_manager.get_checkout_data(),
+        ))
+
+        failures = [(username, error) for username, error in results if error is not None]
+        assert not failures, f"并发购买流程失败: {failures}"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
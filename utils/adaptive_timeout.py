@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+自适应定位器超时
+记录每个定位器在各页面、各环境（站点）上实际可操作所用的时间并持久化，
+超时取历史耗时的高分位数加余量：定位器失效时几秒内失败，慢但正常的元素仍有足够时间。
+
+历史样本不足（首次出现或冷启动）的定位器使用 ADAPTIVE_TIMEOUT_COLD；
+调用方显式传入 timeout 时不使用自适应超时。
+"""
+
+import atexit
+import logging
+import math
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import config.settings as settings
+from utils.json_store import LockedJSONStore
+
+logger = logging.getLogger(__name__)
+
+
+def timing_key(url: Optional[str], locator: str) -> str:
+    """历史记录键：站点 + 页面路径 + 定位器（忽略查询参数和锚点）"""
+    parts = urlsplit(url or "")
+    return f"{parts.netloc}{parts.path or '/'}|{locator}"
+
+
+def quantile(samples: List[float], q: float) -> float:
+    """分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class TimingStore(LockedJSONStore):
+    """定位器耗时历史 - 每个键保留最近的若干个样本"""
+
+    DESCRIPTION = "定位器耗时历史"
+
+    def __init__(self, path: Optional[Path] = None, max_samples: Optional[int] = None):
+        """
+        初始化耗时历史
+
+        Args:
+            path: 历史文件，默认 settings.ADAPTIVE_TIMEOUT_STORE
+            max_samples: 每个键保留的最近样本数，默认 settings.ADAPTIVE_TIMEOUT_HISTORY
+        """
+        super().__init__(path or settings.ADAPTIVE_TIMEOUT_STORE)
+        self.max_samples = max_samples or settings.ADAPTIVE_TIMEOUT_HISTORY
+
+    def samples(self, key: str) -> List[float]:
+        """某个键的历史样本（秒）"""
+        with self._lock:
+            return list(self._load().get(key, []))
+
+    def record(self, key: str, seconds: float):
+        """记录一次耗时"""
+        with self._lock:
+            history = self._load().setdefault(key, [])
+            history.append(round(seconds, 3))
+            del history[:-self.max_samples]
+            self._pending.setdefault(key, []).append(round(seconds, 3))
+
+    def _merge(self, data: Dict[str, List[float]], pending: Dict[str, List[float]]):
+        """追加本进程的样本，只保留最近 max_samples 个"""
+        for key, values in pending.items():
+            data[key] = (data.get(key, []) + values)[-self.max_samples:]
+
+
+class AdaptiveTimeoutPolicy:
+    """超时策略：历史耗时高分位数 + 余量，限制在 [minimum, maximum] 内"""
+
+    def __init__(self, store: TimingStore, quantile_value: Optional[float] = None,
+                 margin: Optional[float] = None, minimum: Optional[float] = None,
+                 maximum: Optional[float] = None, cold: Optional[float] = None,
+                 min_samples: Optional[int] = None, enabled: Optional[bool] = None):
+        self.store = store
+        self.quantile = quantile_value if quantile_value is not None else settings.ADAPTIVE_TIMEOUT_QUANTILE
+        self.margin = margin if margin is not None else settings.ADAPTIVE_TIMEOUT_MARGIN
+        self.minimum = minimum if minimum is not None else settings.ADAPTIVE_TIMEOUT_MIN
+        self.maximum = maximum if maximum is not None else settings.TIMEOUT
+        self.cold = cold if cold is not None else settings.ADAPTIVE_TIMEOUT_COLD
+        self.min_samples = min_samples if min_samples is not None else settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES
+        self.enabled = settings.ADAPTIVE_TIMEOUT if enabled is None else enabled
+
+    def timeout_for(self, url: Optional[str], locator: str) -> float:
+        """定位器的超时时间（秒）"""
+        if not self.enabled:
+            return self.maximum
+        samples = self.store.samples(timing_key(url, locator))
+        if len(samples) < self.min_samples:
+            return self.cold
+        timeout = quantile(samples, self.quantile) + self.margin
+        return min(self.maximum, max(self.minimum, timeout))
+
+    def record(self, url: Optional[str], locator: str, seconds: float):
+        """记录定位器本次可操作所用时间"""
+        self.store.record(timing_key(url, locator), seconds)
+
+
+_policy: Optional[AdaptiveTimeoutPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_timeout_policy() -> AdaptiveTimeoutPolicy:
+    """进程级超时策略（退出时写回历史）"""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = AdaptiveTimeoutPolicy(TimingStore())
+            atexit.register(_policy.store.flush)
+        return _policy
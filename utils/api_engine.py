@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+数据驱动 API 用例引擎
+读取声明式的用例定义（如 APITestCaseConfig 中的字典：method / endpoint / params / expected_status /
+expected_fields），在有界线程池中并发执行，每个主机一个连接池会话，校验状态码和响应字段。
+
+endpoint 中的 {占位符} 用 params 中的同名值填充，其余 params 作为查询参数；
+响应为列表时校验第一个元素的字段。
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import config.settings as settings
+from utils.http_client import create_session
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class APICase:
+    """API 用例"""
+
+    id: str
+    name: str
+    method: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    expected_status: int = 200
+    expected_fields: tuple = ()
+
+    @property
+    def host(self) -> str:
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class CaseResult:
+    """用例执行结果"""
+
+    case: APICase
+    status_code: Optional[int] = None
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    def describe(self) -> str:
+        """失败描述"""
+        return f"{self.case.name} [{self.case.method} {self.case.url}]: " + "；".join(self.errors)
+
+
+def build_case(case_id: str, definition: Dict[str, Any], base_url: Optional[str] = None) -> APICase:
+    """
+    把用例定义字典转换为 APICase
+
+    Raises:
+        ValueError: 缺少 method / endpoint 或基础地址
+    """
+    missing = [key for key in ("method", "endpoint") if not definition.get(key)]
+    if missing:
+        raise ValueError(f"用例 {case_id} 缺少字段: {', '.join(missing)}")
+    root = definition.get("base_url") or base_url
+    if not root:
+        raise ValueError(f"用例 {case_id} 缺少 base_url")
+    params = dict(definition.get("params") or {})
+    endpoint = definition["endpoint"]
+    path_values = {key: params.pop(key) for key in list(params) if "{" + key + "}" in endpoint}
+    return APICase(
+        id=case_id,
+        name=definition.get("name", case_id),
+        method=definition["method"].upper(),
+        url=root.rstrip("/") + endpoint.format(**path_values),
+        params=params,
+        json=definition.get("json"),
+        headers=dict(definition.get("headers") or {}),
+        expected_status=definition.get("expected_status", 200),
+        expected_fields=tuple(definition.get("expected_fields") or ()),
+    )
+
+
+def load_cases(source, base_url: Optional[str] = None) -> List[APICase]:
+    """
+    读取用例定义：类中全部大写的字典属性（按定义顺序），或 {用例 id: 定义} 字典
+
+    Args:
+        source: 用例配置类或字典
+        base_url: 定义中没有 base_url 时使用的基础地址
+    """
+    definitions = source if isinstance(source, dict) else {
+        name: value for name, value in vars(source).items() if name.isupper() and isinstance(value, dict)
+    }
+    return [build_case(case_id, definition, base_url) for case_id, definition in definitions.items()]
+
+
+def validate(case: APICase, response) -> List[str]:
+    """校验状态码和响应字段，返回错误列表"""
+    errors = []
+    if response.status_code != case.expected_status:
+        errors.append(f"状态码 {response.status_code}，期望 {case.expected_status}")
+    if not case.expected_fields:
+        return errors
+    try:
+        body = response.json()
+    except ValueError:
+        return errors + ["响应不是 JSON"]
+    if isinstance(body, list):
+        if not body:
+            return errors + ["响应列表为空"]
+        body = body[0]
+    if not isinstance(body, dict):
+        return errors + [f"响应不是 JSON 对象: {type(body).__name__}"]
+    missing = [name for name in case.expected_fields if name not in body]
+    if missing:
+        errors.append(f"缺少字段: {', '.join(missing)}")
+    return errors
+
+
+class APIEngine:
+    """在有界线程池中并发执行 API 用例，每个主机复用一个连接池会话"""
+
+    def __init__(self, max_workers: Optional[int] = None, headers: Optional[Dict[str, str]] = None,
+                 session_factory: Callable = create_session):
+        """
+        初始化引擎
+
+        Args:
+            max_workers: 并发数，默认 settings.API_ENGINE_WORKERS
+            headers: 公共请求头
+            session_factory: 会话工厂，参数同 utils.http_client.create_session
+        """
+        self.max_workers = max_workers or settings.API_ENGINE_WORKERS
+        self.headers = headers or {}
+        self.session_factory = session_factory
+        self._sessions = {}
+
+    def run(self, cases: Sequence[APICase]) -> Dict[str, CaseResult]:
+        """并发执行用例，返回 用例 id -> 结果"""
+        for host in {case.host for case in cases}:
+            if host not in self._sessions:
+                # 每个主机的连接数与并发数一致，线程不必等待空闲连接
+                self._sessions[host] = self.session_factory(headers=self.headers, pool_maxsize=self.max_workers)
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="api-engine") as executor:
+            results = list(executor.map(self.run_case, cases))
+        logger.info(f"API 引擎执行 {len(results)} 个用例，耗时 {time.monotonic() - started:.2f}s，"
+                    f"失败 {sum(not result.passed for result in results)} 个")
+        return {result.case.id: result for result in results}
+
+    def run_case(self, case: APICase) -> CaseResult:
+        """执行单个用例（请求异常记为失败，不抛出）"""
+        result = CaseResult(case)
+        session = self._sessions.get(case.host)
+        if session is None:
+            session = self._sessions[case.host] = self.session_factory(headers=self.headers)
+        started = time.monotonic()
+        try:
+            response = session.request(case.method, case.url, params=case.params or None, json=case.json,
+                                       headers=case.headers or None)
+        except Exception as e:
+            result.errors.append(f"请求失败: {e}")
+        else:
+            result.status_code = response.status_code
+            result.errors.extend(validate(case, response))
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def close(self):
+        """关闭全部会话"""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
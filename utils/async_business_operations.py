@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+异步业务操作封装层 - 与 SauceDemoOperations 保持相同的方法接口
+配合 AsyncUIOperations 在一个事件循环中并发执行多个业务流程
+"""
+
+import asyncio
+import logging
+from typing import Optional, List, Dict, Tuple
+
+import config.settings as settings
+from utils.async_ui_operations import AsyncUIOperations
+from utils.auth_state import AuthStateCache, get_auth_state_cache
+from utils.bulk_extract import parse_price
+from tests.ui_layer.locators.saucedemo_locators import SauceDemoLocators
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSauceDemoOperations:
+    """
+    SauceDemo异步业务操作封装 - 方法与 SauceDemoOperations 一一对应（均为协程）
+
+    同步层通过页面快照读取的购物车数量、产品数量，这里直接查询页面
+    """
+
+    def __init__(self, ui_ops: AsyncUIOperations):
+        """
+        初始化SauceDemo异步操作
+
+        Args:
+            ui_ops: AsyncUIOperations实例
+        """
+        self.ui = ui_ops
+        self.locators = SauceDemoLocators()
+
+    async def login(self, username: str, password: str):
+        """登录操作"""
+        logger.info(f"执行登录操作(async): 用户名={username}")
+        try:
+            await self.ui.fill(self.locators.LOGIN_USERNAME_INPUT, username)
+            await self.ui.fill(self.locators.LOGIN_PASSWORD_INPUT, password)
+            await self.ui.click(self.locators.LOGIN_BUTTON)
+            # 登录成功（产品列表）或失败（错误提示）任一出现即可确定结果
+            outcome = await self.ui.wait_for_any(self.locators.PRODUCTS_CONTAINER,
+                                                 self.locators.LOGIN_ERROR_CONTAINER, timeout=10)
+            logger.info(f"登录操作完成: {'成功' if outcome == self.locators.PRODUCTS_CONTAINER else '失败'}")
+        except Exception as e:
+            logger.error(f"登录失败: {e}")
+            raise
+
+    async def login_from_cache(self, user_type: str = "standard", cache: Optional[AuthStateCache] = None):
+        """
+        使用缓存的登录态直接进入产品列表页（跳过 UI 登录）
+
+        Args:
+            user_type: 用户类型 (standard/problem/performance_glitch 等)
+            cache: 登录态缓存，默认使用进程级缓存
+        """
+        cache = cache or get_auth_state_cache()
+        logger.info(f"使用缓存登录态进入产品页(async): 用户类型={user_type}")
+        state = await cache.async_get_state(self.ui.browser, user_type)
+        await self.ui.new_context(url=cache.inventory_url, storage_state=state)
+        await self.ui.wait_for_element(self.locators.PRODUCTS_CONTAINER, timeout=10)
+
+    async def verify_login_success(self):
+        """验证登录成功"""
+        await self.ui.assert_element_exists(self.locators.PRODUCTS_CONTAINER)
+
+    async def verify_login_failed(self, expected_error: Optional[str] = None):
+        """验证登录失败"""
+        # login() 已等到结果出现，这里直接按当前页面判断，成功登录时不再等满超时
+        await self.ui.assert_element_exists(self.locators.LOGIN_ERROR_CONTAINER, mode="now")
+        if expected_error:
+            await self.ui.assert_text_contains(self.locators.LOGIN_ERROR_CONTAINER, expected_error)
+
+    async def add_product_to_cart(self, product_index: int = 0):
+        """添加产品到购物车"""
+        products = await self.ui.page.query_selector_all(self.locators.PRODUCT_ITEM)
+        if product_index >= len(products):
+            error_msg = f"产品索引超出范围: {product_index}，总数: {len(products)}"
+            logger.error(error_msg)
+            raise IndexError(error_msg)
+
+        add_btn = await products[product_index].query_selector(self.locators.PRODUCT_ADD_BTN)
+        if add_btn:
+            await add_btn.click()
+        else:
+            logger.warning(f"未找到添加按钮: 索引={product_index}")
+
+    async def add_multiple_products_to_cart(self, indices: List[int]):
+        """添加多个产品到购物车"""
+        for index in indices:
+            await self.add_product_to_cart(index)
+
+    async def verify_cart_count(self, expected_count: int):
+        """验证购物车数量"""
+        count_text = await self.ui.get_text(self.locators.SHOPPING_CART_BADGE)
+        actual_count = int(count_text) if count_text else 0
+        if actual_count != expected_count:
+            raise AssertionError(f"购物车数量不匹配。期望: {expected_count}，实际: {actual_count}")
+
+    async def go_to_cart(self):
+        """前往购物车"""
+        await self.ui.click(self.locators.SHOPPING_CART_LINK)
+        await self.ui.wait_for_element(self.locators.CHECKOUT_BUTTON)
+
+    async def go_to_checkout(self):
+        """前往结账"""
+        await self.ui.click(self.locators.CHECKOUT_BUTTON)
+        await self.ui.wait_for_element(self.locators.CHECKOUT_FIRST_NAME)
+
+    async def fill_checkout_info(self, first_name: str, last_name: str, postal_code: str):
+        """填写结账信息"""
+        await self.ui.fill_form({
+            self.locators.CHECKOUT_FIRST_NAME: first_name,
+            self.locators.CHECKOUT_LAST_NAME: last_name,
+            self.locators.CHECKOUT_POSTAL_CODE: postal_code,
+        })
+
+    async def complete_checkout(self):
+        """完成结账"""
+        await self.ui.click(self.locators.CHECKOUT_CONTINUE_BTN)
+        await self.ui.wait_for_element(self.locators.CHECKOUT_FINISH_BTN)
+        await self.ui.click(self.locators.CHECKOUT_FINISH_BTN)
+
+    async def verify_order_complete(self):
+        """验证订单完成"""
+        await self.ui.assert_element_exists(self.locators.ORDER_COMPLETE_MSG)
+        await self.ui.assert_text_contains(self.locators.ORDER_COMPLETE_MSG, "Thank you")
+
+    async def complete_purchase_flow(self, username: str, password: str,
+                                     product_indices: List[int],
+                                     first_name: str, last_name: str, postal_code: str):
+        """完整的购买流程"""
+        await self.login(username, password)
+        await self.verify_login_success()
+        await self.add_multiple_products_to_cart(product_indices)
+        await self.verify_cart_count(len(product_indices))
+        await self.go_to_cart()
+        await self.go_to_checkout()
+        await self.fill_checkout_info(first_name, last_name, postal_code)
+        await self.complete_checkout()
+        await self.verify_order_complete()
+
+    async def sort_products(self, sort_option: str):
+        """排序产品
+        Args:
+            sort_option: 排序选项 (az, za, lohi, hilo)
+        """
+        if sort_option.lower() not in ("az", "za", "lohi", "hilo"):
+            raise ValueError(f"不支持的排序选项: {sort_option}")
+        await self.ui.select_option(self.locators.SORT_DROPDOWN, sort_option.lower())
+        # 等待产品列表重新渲染完成
+        await self.ui.wait_for_element_stable(self.locators.PRODUCTS_CONTAINER, quiet=50, timeout=5)
+
+    async def get_product_names(self) -> List[str]:
+        """获取所有产品名称"""
+        return await self.ui.get_all_texts(self.locators.PRODUCT_NAME)
+
+    async def get_product_prices(self) -> List[str]:
+        """获取所有产品价格"""
+        return await self.ui.get_all_texts(self.locators.PRODUCT_PRICE)
+
+    async def get_products(self) -> List[Dict[str, Optional[str]]]:
+        """一次获取所有产品的名称和价格"""
+        return await self.ui.get_rows(self.locators.PRODUCT_ITEM, {
+            "name": self.locators.PRODUCT_NAME,
+            "price": self.locators.PRODUCT_PRICE,
+        })
+
+    async def logout(self):
+        """退出登录"""
+        await self.ui.click(self.locators.HAMBURGER_MENU)
+        await self.ui.wait_for_element(self.locators.MENU_LOGOUT)
+        await self.ui.click(self.locators.MENU_LOGOUT)
+
+    async def remove_product_from_cart(self, product_index: int = 0):
+        """从购物车移除产品"""
+        cart_items = await self.ui.page.query_selector_all(self.locators.CART_ITEM)
+        if product_index >= len(cart_items):
+            raise IndexError(f"购物车产品索引超出范围: {product_index}")
+
+        remove_btn = await cart_items[product_index].query_selector(self.locators.PRODUCT_REMOVE_BTN)
+        if remove_btn:
+            await remove_btn.click()
+
+    async def get_cart_item_count(self) -> int:
+        """获取购物车中的产品数量"""
+        return await self.ui.get_element_count(self.locators.CART_ITEM)
+
+    async def continue_shopping(self):
+        """继续购物（从购物车返回产品列表）"""
+        await self.ui.click(self.locators.CONTINUE_SHOPPING_BTN)
+        await self.ui.wait_for_element(self.locators.PRODUCTS_CONTAINER)
+
+    async def verify_product_count(self, expected_count: int):
+        """验证产品列表数量"""
+        actual_count = await self.ui.get_element_count(self.locators.PRODUCT_ITEM)
+        if actual_count != expected_count:
+            raise AssertionError(f"产品数量不匹配。期望: {expected_count}，实际: {actual_count}")
+
+    async def get_all_product_names(self) -> List[str]:
+        """获取所有产品名称列表"""
+        return await self.get_product_names()
+
+    async def filter_products_by_price_range(self, min_price: float = None, max_price: float = None):
+        """根据价格范围筛选产品，返回符合条件的产品索引"""
+        filtered_products = []
+
+        for i, price_text in enumerate(await self.get_product_prices()):
+            price_value = parse_price(price_text)
+            if price_value is None:
+                continue
+            if min_price and price_value < min_price:
+                continue
+            if max_price and price_value > max_price:
+                continue
+            filtered_products.append(i)
+
+        return filtered_products
+
+
+async def run_purchase_flows_concurrently(users: List[Dict[str, str]], product_indices: List[int],
+                                          checkout: Dict[str, str], concurrency: int = 10,
+                                          browser_type: str = "chromium",
+                                          headless: bool = True) -> List[Tuple[str, Optional[Exception]]]:
+    """
+    在一个浏览器中并发执行多个用户的完整购买流程
+
+    Args:
+        users: 用户列表，每项包含 username/password
+        product_indices: 每个用户要购买的产品索引
+        checkout: 结账信息，包含 first_name/last_name/postal_code
+        concurrency: 同时运行的流程（页面）数量上限
+        browser_type: 浏览器类型
+        headless: 是否无头模式
+
+    Returns:
+        [(username, 异常或 None), ...]，顺序与 users 一致
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncUIOperations(browser_type=browser_type, headless=headless) as root:
+        await root.start_browser()
+
+        async def run_one(user: Dict[str, str]) -> None:
+            async with semaphore:
+                session = await root.new_session(url=settings.BASE_URL)
+                try:
+                    await AsyncSauceDemoOperations(session).complete_purchase_flow(
+                        username=user["username"],
+                        password=user["password"],
+                        product_indices=product_indices,
+                        first_name=checkout["first_name"],
+                        last_name=checkout["last_name"],
+                        postal_code=checkout["postal_code"],
+                    )
+                finally:
+                    await session.close_browser()
+
+        results = await asyncio.gather(*(run_one(user) for user in users), return_exceptions=True)
+
+    return [(user["username"], result) for user, result in zip(users, results)]
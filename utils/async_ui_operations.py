@@ -0,0 +1,667 @@
+# -*- coding: utf-8 -*-
+"""
+异步UI操作封装层 - 基于 playwright.async_api
+与 UIOperations 保持相同的方法接口，单个事件循环即可同时驱动多个页面
+"""
+
+import logging
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Literal
+
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, TimeoutError as PlaywrightTimeoutError
+import config.settings as settings
+from utils.retry_decorator import retry_on_failure
+from utils.playwright_helper import build_context_options, launch_browser
+from utils.har_replay import async_apply_har
+from utils.resource_blocking import async_apply_resource_blocking
+from utils.bulk_extract import TEXTS_JS, ATTRIBUTES_JS, ROWS_JS, parse_field
+from utils.form_fill import async_batch_fill
+from utils.locator_registry import get_locator, playwright_selector
+from utils.adaptive_timeout import get_timeout_policy
+from utils.dom_probe import DomProbe, ElementState, check_mode
+from utils.wait_engine import AsyncWaitEngine, dom_query
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncUIOperations:
+    """
+    异步UI操作封装类 - 方法与 UIOperations 一一对应（均为协程）
+
+    页面快照（mark_page_changed / mutation_count）只在同步层使用，异步层不维护
+    """
+
+    def __init__(self, browser_type: str = "chromium", headless: bool = True, debug_mode: bool = False):
+        """
+        初始化异步UI操作
+
+        Args:
+            browser_type: 浏览器类型 (chromium/firefox/webkit)
+            headless: 是否无头模式
+            debug_mode: 调试模式（启用慢速模式和元素高亮）
+        """
+        self.browser_type = browser_type
+        self.headless = headless
+        self.debug_mode = debug_mode
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self._screenshot_counter = 0
+        # 浏览器由自身启动时才在 close_browser() 中关闭；new_session() 创建的会话只关闭上下文
+        self._owns_browser = False
+        # 未显式传入 timeout 时按定位器历史耗时决定超时
+        self.timeouts = get_timeout_policy()
+        # 即时断言前页面需达到的就绪状态（见 declare_ready）
+        self.ready_state = settings.ASSERT_READY_STATE
+        self.ready_locator: Optional[str] = None
+
+        logger.info(f"初始化 AsyncUIOperations: browser={browser_type}, headless={headless}")
+
+    async def start_browser(self, url: Optional[str] = None, storage_state: Optional[str] = None,
+                            har_flow: Optional[str] = None):
+        """
+        启动浏览器并可选导航到URL
+
+        Args:
+            url: 启动后导航的URL
+            storage_state: 登录态文件，提供时上下文以已登录状态创建
+            har_flow: HAR 录制/回放使用的页面流程名称
+        """
+        logger.info(f"启动浏览器(async): {self.browser_type}")
+        self.playwright = await async_playwright().start()
+
+        launch_options = {}
+        if self.debug_mode:
+            launch_options["slow_mo"] = 100
+
+        self.browser = await launch_browser(self.playwright, self.browser_type, self.headless, **launch_options)
+        self._owns_browser = True
+        return await self.new_context(url=url, storage_state=storage_state, har_flow=har_flow)
+
+    async def new_session(self, url: Optional[str] = None, storage_state: Optional[str] = None,
+                          har_flow: Optional[str] = None) -> "AsyncUIOperations":
+        """
+        在同一浏览器上创建一个独立的会话（新的上下文和页面）
+
+        多个会话共享一个浏览器进程，可通过 asyncio.gather 并发驱动
+        """
+        if not self.browser:
+            raise RuntimeError("浏览器未初始化，请先调用 start_browser()")
+        session = AsyncUIOperations(self.browser_type, self.headless, self.debug_mode)
+        session.browser = self.browser
+        await session.new_context(url=url, storage_state=storage_state, har_flow=har_flow)
+        return session
+
+    async def new_context(self, url: Optional[str] = None, storage_state: Optional[str] = None,
+                          har_flow: Optional[str] = None):
+        """
+        关闭当前上下文并在同一浏览器上创建新的上下文和页面
+
+        Args:
+            url: 创建后导航的URL
+            storage_state: 登录态文件，提供时上下文以已登录状态创建
+            har_flow: HAR 录制/回放使用的页面流程名称
+        """
+        if not self.browser:
+            raise RuntimeError("浏览器未初始化，请先调用 start_browser()")
+        if self.context:
+            await self.context.close()
+
+        context_options = {
+            "record_video_dir": str(settings.REPORTS_DIR / "videos") if self.debug_mode else None,
+        }
+        if storage_state:
+            context_options["storage_state"] = storage_state
+        self.context = await self.browser.new_context(**build_context_options(**context_options))
+        # HAR 路由先注册，资源屏蔽路由后注册、优先匹配
+        await async_apply_har(self.context, har_flow)
+        await async_apply_resource_blocking(self.context)
+        self.page = await self.context.new_page()
+
+        if url:
+            await self.navigate_to(url)
+
+        return self.page
+
+    async def close_browser(self):
+        """关闭上下文；若浏览器由本实例启动，则一并关闭浏览器"""
+        try:
+            if self.context:
+                await self.context.close()
+                self.context = None
+                self.page = None
+            if self._owns_browser:
+                if self.browser:
+                    await self.browser.close()
+                if self.playwright:
+                    await self.playwright.stop()
+        except Exception as e:
+            logger.error(f"关闭浏览器时出错: {e}")
+
+    # ========== 基础操作 ==========
+
+    async def navigate_to(self, url: str):
+        """导航到URL"""
+        self._ensure_page()
+        await self.page.goto(url)
+
+    async def click(self, locator: str, timeout: int = None):
+        """点击元素"""
+        self._ensure_page()
+        await self._timed(locator, timeout, lambda timeout_ms: self.page.click(playwright_selector(locator), timeout=timeout_ms))
+
+    async def fill(self, locator: str, text: str, timeout: int = None):
+        """填充输入框"""
+        self._ensure_page()
+        await self._timed(locator, timeout, lambda timeout_ms: self.page.fill(playwright_selector(locator), text, timeout=timeout_ms))
+
+    async def get_text(self, locator: str, timeout: int = None) -> str:
+        """获取元素文本"""
+        self._ensure_page()
+        text = await self._timed(
+            locator, timeout,
+            lambda timeout_ms: self.page.text_content(playwright_selector(locator), timeout=timeout_ms))
+        return text or ""
+
+    async def wait_for_element(self, locator: str, timeout: int = None, state: str = "visible"):
+        """等待元素出现"""
+        self._ensure_page()
+        await self._timed(locator, timeout, lambda timeout_ms: self.page.wait_for_selector(playwright_selector(locator), timeout=timeout_ms, state=state))
+
+    async def is_element_visible(self, locator: str, timeout: int = 5000,
+                                 mode: Literal["eventually", "now"] = "eventually") -> bool:
+        """
+        检查元素是否可见
+
+        Args:
+            locator: 元素定位器
+            timeout: eventually 模式下最长等待时间（毫秒）
+            mode: eventually 等待元素出现；now 页面就绪后立即判断当前状态
+        """
+        self._ensure_page()
+        if check_mode(mode) == "now":
+            return (await self.element_state(locator)).visible
+        try:
+            await self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="visible")
+            return True
+        except Exception:
+            return False
+
+    async def element_state(self, locator: str) -> ElementState:
+        """页面达到声明的就绪状态并渲染一帧后，元素当前的数量与可见性（不等待元素本身）"""
+        self._ensure_page()
+        return await DomProbe(self.page, self.ready_state, self.ready_locator).async_state(locator)
+
+    def declare_ready(self, ready_state: Optional[str] = None, locator: Optional[str] = None):
+        """
+        声明即时断言的就绪状态
+
+        Args:
+            ready_state: document.readyState 需达到的值（loading/interactive/complete）
+            locator: 就绪元素，出现后页面才视为就绪，例如页面主容器；None 表示不要求
+        """
+        self.ready_state = ready_state or settings.ASSERT_READY_STATE
+        self.ready_locator = locator
+
+    async def wait_for_any(self, *locators: str, timeout: Optional[int] = None) -> str:
+        """
+        等待多个元素中任一可见，返回先出现的定位器（用于成功/失败两种结果都可能出现的操作）
+
+        Args:
+            *locators: 元素定位器
+            timeout: 超时时间（秒）
+        """
+        self._ensure_page()
+        combined = self.locator(locators[0])
+        for locator in locators[1:]:
+            combined = combined.or_(self.locator(locator))
+        key = " | ".join(locators)
+        await self._timed(key, timeout, lambda timeout_ms: combined.first.wait_for(state="visible", timeout=timeout_ms))
+        for locator in locators:
+            if await self.locator(locator).first.is_visible():
+                return locator
+        return locators[0]
+
+    async def get_element_count(self, locator: str) -> int:
+        """获取匹配的元素数量"""
+        self._ensure_page()
+        return await self.locator(locator).count()
+
+    # ========== 高级操作 ==========
+
+    async def fill_form(self, form_data: dict, per_field: Optional[List[str]] = None):
+        """
+        填充表单（字典形式），一次页面脚本调用填写所有字段
+
+        Args:
+            form_data: 定位器 -> 值
+            per_field: 有自定义输入处理、需要逐字段 fill 的定位器
+        """
+        self._ensure_page()
+        values = {locator: str(value) for locator, value in form_data.items()}
+        pending = list(values)
+        if settings.FORM_BATCH_FILL:
+            pending = await async_batch_fill(self.page, values, per_field or ())
+        for locator in pending:
+            await self.fill(locator, values[locator])
+
+    async def click_multiple(self, locators: List[str], wait_between: float = 0.5):
+        """
+        依次点击多个元素，每次点击后等待页面重新渲染结束
+
+        Args:
+            locators: 元素定位器列表
+            wait_between: 每次点击后等待 DOM 稳定的最长时间（秒）
+        """
+        for locator in locators:
+            await self.click(locator)
+            await self.waits.dom_settled(timeout=int(wait_between * 1000))
+
+    async def get_all_texts(self, locator: str) -> List[str]:
+        """获取所有匹配元素的文本列表（一次浏览器往返）"""
+        self._ensure_page()
+        return await self.locator(locator).evaluate_all(TEXTS_JS)
+
+    async def get_all_attributes(self, locator: str, attribute: str) -> List[Optional[str]]:
+        """获取所有匹配元素的属性值列表（一次浏览器往返）"""
+        self._ensure_page()
+        return await self.locator(locator).evaluate_all(ATTRIBUTES_JS, attribute)
+
+    async def get_rows(self, row_locator: str, fields: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+        """
+        获取结构化行数据（一次浏览器往返）
+
+        Args:
+            row_locator: 行元素定位器
+            fields: 字段名 -> 字段定义，如 {"name": "css=.name", "link": "css=a@href"}
+        """
+        self._ensure_page()
+        parsed = {key: parse_field(spec) for key, spec in fields.items()}
+        return await self.locator(row_locator).evaluate_all(ROWS_JS, parsed)
+
+    async def select_option(self, locator: str, value: str):
+        """选择下拉框选项"""
+        self._ensure_page()
+        await self.page.select_option(playwright_selector(locator), value)
+
+    async def scroll_to_element(self, locator: str):
+        """滚动到元素"""
+        self._ensure_page()
+        await self.locator(locator).scroll_into_view_if_needed()
+
+    async def take_screenshot(self, filename: str = "screenshot.png"):
+        """截图"""
+        self._ensure_page()
+        filepath = settings.REPORTS_DIR / filename
+        await self.page.screenshot(path=str(filepath))
+        return filepath
+
+    async def get_page_title(self) -> str:
+        """获取页面标题"""
+        self._ensure_page()
+        return await self.page.title()
+
+    async def get_current_url(self) -> str:
+        """获取当前URL"""
+        self._ensure_page()
+        return self.page.url
+
+    async def wait_for_url_contains(self, url_part: str, timeout: int = 30000):
+        """等待URL包含指定部分"""
+        self._ensure_page()
+        await self.page.wait_for_url(f"*{url_part}*", timeout=timeout)
+
+    async def wait_for_text(self, text: str, timeout: int = 30000):
+        """等待页面出现指定文本"""
+        self._ensure_page()
+        await self.page.wait_for_selector(f"text={text}", timeout=timeout)
+
+    # ========== 验证操作 ==========
+
+    async def assert_element_exists(self, locator: str, timeout: int = 5000,
+                                    mode: Literal["eventually", "now"] = "eventually"):
+        """断言元素存在（可见）；mode=now 时不等待，按页面当前状态判断"""
+        if not await self.is_element_visible(locator, timeout, mode=mode):
+            raise AssertionError(f"元素不存在: {locator}")
+
+    async def assert_element_not_exists(self, locator: str, timeout: int = 5000,
+                                        mode: Literal["eventually", "now"] = "now"):
+        """
+        断言元素不存在
+
+        Args:
+            mode: now（默认）页面就绪后立即判断；eventually 等待元素移除，最长 timeout 毫秒
+        """
+        self._ensure_page()
+        if check_mode(mode) == "eventually":
+            try:
+                await self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="detached")
+                return
+            except PlaywrightTimeoutError:
+                pass
+        state = await self.element_state(locator)
+        if state.exists:
+            raise AssertionError(f"元素不应该存在，但找到了 {state.count} 个: {locator}")
+
+    async def assert_element_not_visible(self, locator: str, timeout: int = 5000,
+                                         mode: Literal["eventually", "now"] = "now"):
+        """
+        断言元素不可见（不存在或隐藏）
+
+        Args:
+            mode: now（默认）页面就绪后立即判断；eventually 等待元素隐藏，最长 timeout 毫秒
+        """
+        self._ensure_page()
+        if check_mode(mode) == "eventually":
+            try:
+                await self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="hidden")
+                return
+            except PlaywrightTimeoutError:
+                pass
+        if (await self.element_state(locator)).visible:
+            raise AssertionError(f"元素应该不可见，但可见: {locator}")
+
+    async def assert_text_contains(self, locator: str, expected_text: str):
+        """断言元素文本包含指定内容"""
+        actual_text = await self.get_text(locator)
+        if expected_text not in actual_text:
+            raise AssertionError(f"文本不匹配。期望包含: {expected_text}，实际: {actual_text}")
+
+    async def assert_text_equals(self, locator: str, expected_text: str):
+        """断言元素文本等于指定内容"""
+        actual_text = await self.get_text(locator)
+        if actual_text.strip() != expected_text.strip():
+            raise AssertionError(f"文本不匹配。期望: '{expected_text}'，实际: '{actual_text}'")
+
+    async def assert_element_count(self, locator: str, expected_count: int):
+        """断言元素数量"""
+        actual_count = await self.get_element_count(locator)
+        if actual_count != expected_count:
+            raise AssertionError(f"元素数量不匹配。期望: {expected_count}，实际: {actual_count}")
+
+    async def assert_url_contains(self, expected_url_part: str):
+        """断言URL包含指定部分"""
+        actual_url = await self.get_current_url()
+        if expected_url_part not in actual_url:
+            raise AssertionError(f"URL不包含: {expected_url_part}，实际: {actual_url}")
+
+    async def assert_page_title_contains(self, expected_text: str):
+        """断言页面标题包含指定文本"""
+        title = await self.get_page_title()
+        if expected_text not in title:
+            raise AssertionError(f"页面标题不包含: {expected_text}，实际: {title}")
+
+    # ========== 增强功能 ==========
+
+    async def smart_wait(self, locator: str, condition: Literal["visible", "hidden", "attached", "detached"] = "visible",
+                         timeout: Optional[int] = None) -> bool:
+        """
+        智能等待 - 等待元素满足特定条件
+
+        Args:
+            locator: 元素定位器
+            condition: 等待条件 (visible/hidden/attached/detached)
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否成功等待到元素
+        """
+        self._ensure_page()
+        try:
+            await self._timed(
+                locator, timeout,
+                lambda timeout_ms: self.page.wait_for_selector(
+                    playwright_selector(locator), timeout=timeout_ms, state=condition))
+            logger.debug(f"智能等待成功: {locator} ({condition})")
+            return True
+        except PlaywrightTimeoutError:
+            logger.warning(f"智能等待超时: {locator} ({condition})")
+            return False
+
+    @retry_on_failure(max_attempts=3, delay=0.5, exceptions=(PlaywrightTimeoutError,))
+    async def click_with_retry(self, locator: str, timeout: Optional[int] = None):
+        """
+        带重试的点击操作 - 处理偶发性点击失败
+
+        Args:
+            locator: 元素定位器
+            timeout: 超时时间（秒）
+        """
+        self._ensure_page()
+
+        if self.debug_mode:
+            await self.highlight_element(locator)
+
+        await self._timed(locator, timeout, lambda timeout_ms: self.page.click(playwright_selector(locator), timeout=timeout_ms))
+        logger.info(f"点击元素: {locator}")
+
+    async def highlight_element(self, locator: str, duration: float = 0.5):
+        """
+        高亮元素 - 调试模式下突出显示元素
+
+        Args:
+            locator: 元素定位器
+            duration: 高亮持续时间（秒）
+        """
+        if not self.debug_mode:
+            return
+
+        self._ensure_page()
+        query = dom_query(locator)
+        if query is None:
+            return
+        try:
+            await self.page.evaluate("""
+                ({ query, duration }) => {
+                    const element = query.type === 'xpath'
+                        ? document.evaluate(query.value, document, null,
+                            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                        : document.querySelector(query.value);
+                    if (element) {
+                        element.style.border = '3px solid red';
+                        element.style.backgroundColor = 'yellow';
+                        setTimeout(() => {
+                            element.style.border = '';
+                            element.style.backgroundColor = '';
+                        }, duration);
+                    }
+                }
+            """, {"query": query, "duration": duration * 1000})
+        except Exception as e:
+            logger.debug(f"元素高亮失败: {e}")
+
+    async def auto_screenshot(self, name: Optional[str] = None) -> Path:
+        """
+        自动截图 - 保存当前页面截图
+
+        Args:
+            name: 截图文件名（可选）
+
+        Returns:
+            截图文件路径
+        """
+        self._ensure_page()
+
+        if name is None:
+            self._screenshot_counter += 1
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            name = f"screenshot_{timestamp}_{self._screenshot_counter}.png"
+
+        if not name.endswith('.png'):
+            name += '.png'
+
+        filepath = settings.REPORTS_DIR / "screenshots" / name
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        await self.page.screenshot(path=str(filepath), full_page=True)
+        logger.info(f"截图已保存: {filepath}")
+
+        return filepath
+
+    async def wait_for_network_idle(self, timeout: int = 30):
+        """
+        等待网络空闲 - 等待所有网络请求完成
+
+        Args:
+            timeout: 超时时间（秒）
+        """
+        self._ensure_page()
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+            logger.debug("网络已空闲")
+        except PlaywrightTimeoutError:
+            logger.warning(f"等待网络空闲超时: {timeout}秒")
+
+    async def execute_javascript(self, script: str) -> Any:
+        """
+        执行 JavaScript 代码
+
+        Args:
+            script: JavaScript 代码
+
+        Returns:
+            执行结果
+        """
+        self._ensure_page()
+        result = await self.page.evaluate(script)
+        logger.debug(f"执行 JavaScript: {script[:50]}...")
+        return result
+
+    async def get_attribute(self, locator: str, attribute: str) -> Optional[str]:
+        """
+        获取元素属性值
+
+        Args:
+            locator: 元素定位器
+            attribute: 属性名
+
+        Returns:
+            属性值
+        """
+        self._ensure_page()
+        return await self.page.get_attribute(playwright_selector(locator), attribute)
+
+    async def is_element_enabled(self, locator: str) -> bool:
+        """
+        检查元素是否可用
+
+        Args:
+            locator: 元素定位器
+
+        Returns:
+            是否可用
+        """
+        self._ensure_page()
+        return await self.page.is_enabled(playwright_selector(locator))
+
+    async def wait_for_text_change(self, locator: str, initial_text: str, timeout: int = 10) -> bool:
+        """
+        等待元素文本变化
+
+        Args:
+            locator: 元素定位器
+            initial_text: 初始文本
+            timeout: 超时时间（秒）
+
+        Returns:
+            文本是否已变化
+        """
+        self._ensure_page()
+        if await self.waits.text_changed(locator, initial_text, timeout=timeout * 1000):
+            logger.debug(f"文本已变化: {initial_text} -> {await self.get_text(locator)}")
+            return True
+
+        logger.warning(f"等待文本变化超时: {locator}")
+        return False
+
+    async def wait_for_count(self, locator: str, count: int, timeout: int = 10, exact: bool = False) -> bool:
+        """
+        等待匹配元素数量达到指定值
+
+        Args:
+            locator: 元素定位器
+            count: 期望数量
+            timeout: 超时时间（秒）
+            exact: 是否要求数量恰好相等
+
+        Returns:
+            是否在超时前达到
+        """
+        self._ensure_page()
+        return await self.waits.count_reached(locator, count, timeout=timeout * 1000, exact=exact)
+
+    async def wait_for_attribute(self, locator: str, attribute: str, value: Optional[str], timeout: int = 10) -> bool:
+        """
+        等待元素属性等于指定值
+
+        Args:
+            locator: 元素定位器
+            attribute: 属性名
+            value: 期望值，None 表示属性不存在
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否在超时前满足
+        """
+        self._ensure_page()
+        return await self.waits.attribute_equals(locator, attribute, value, timeout=timeout * 1000)
+
+    async def wait_for_element_stable(self, locator: Optional[str] = None, quiet: int = 100, timeout: int = 10) -> bool:
+        """
+        等待元素（默认整个页面）在 quiet 毫秒内无 DOM 变化且位置不变
+
+        Args:
+            locator: 元素定位器，None 表示整个页面
+            quiet: 安静期（毫秒）
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否在超时前稳定
+        """
+        self._ensure_page()
+        return await self.waits.element_stable(locator, quiet=quiet, timeout=timeout * 1000)
+
+    @property
+    def waits(self) -> AsyncWaitEngine:
+        """当前页面的事件驱动等待引擎"""
+        self._ensure_page()
+        return AsyncWaitEngine(self.page)
+
+    # ========== 辅助方法 ==========
+
+    def locator(self, locator: str):
+        """当前页面上缓存的 Playwright Locator（前缀已规范化）"""
+        self._ensure_page()
+        return get_locator(self.page, locator)
+
+    async def _timed(self, locator: str, timeout: Optional[int], action):
+        """
+        执行定位器操作并记录实际耗时
+
+        Args:
+            locator: 元素定位器
+            timeout: 显式超时（秒），为空时使用自适应超时
+            action: 接收超时毫秒数、返回协程的操作
+        """
+        url = self.page.url
+        seconds = timeout or self.timeouts.timeout_for(url, locator)
+        start = time.monotonic()
+        result = await action(int(seconds * 1000))
+        self.timeouts.record(url, locator, time.monotonic() - start)
+        return result
+
+    def _ensure_page(self):
+        """确保页面已初始化"""
+        if not self.page:
+            raise RuntimeError("浏览器未初始化，请先调用 start_browser()")
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口"""
+        await self.close_browser()
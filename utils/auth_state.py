@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+登录态缓存
+按用户类型通过 UI 登录一次，保存 BrowserContext 的 storage_state（Cookie + localStorage），
+后续测试直接以已登录状态打开新上下文并进入产品页，跳过重复的登录流程
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from pathlib import Path
+from typing import Optional, Tuple
+
+from playwright.sync_api import Browser, BrowserContext, Page
+
+import config.settings as settings
+from tests.ui_layer.locators.saucedemo_locators import SauceDemoLocators
+from utils.driver_cache import file_lock
+from utils.playwright_helper import build_context_options
+from utils.test_data_manager import TestDataManager
+
+logger = logging.getLogger(__name__)
+
+
+class AuthStateCache:
+    """SauceDemo 登录态缓存 - 按用户类型保存 storage_state 文件"""
+
+    def __init__(self, state_dir: Optional[Path] = None, max_age: Optional[int] = None):
+        """
+        初始化登录态缓存
+
+        Args:
+            state_dir: storage_state 文件目录，默认 settings.AUTH_STATE_DIR
+            max_age: 缓存文件最长复用时间（秒），默认 settings.AUTH_STATE_MAX_AGE
+        """
+        self.state_dir = Path(state_dir or settings.AUTH_STATE_DIR)
+        self.max_age = max_age if max_age is not None else settings.AUTH_STATE_MAX_AGE
+        self.locators = SauceDemoLocators()
+        self.data_manager = TestDataManager()
+        # 事件循环 -> {用户类型: asyncio.Lock}：同一进程内的协程不能在文件锁上阻塞事件循环
+        self._async_locks = weakref.WeakKeyDictionary()
+
+    @property
+    def inventory_url(self) -> str:
+        """登录后的产品列表页地址"""
+        return f"{settings.BASE_URL.rstrip('/')}/inventory.html"
+
+    def state_path(self, user_type: str) -> Path:
+        """指定用户类型的 storage_state 文件路径"""
+        return self.state_dir / f"{user_type}.json"
+
+    def get_state(self, browser: Browser, user_type: str = "standard") -> str:
+        """
+        获取可用的 storage_state 文件路径，缓存缺失或即将过期时通过 UI 重新登录
+
+        Args:
+            browser: 用于执行登录的浏览器
+            user_type: 用户类型 (standard/problem/performance_glitch 等，见 TestDataManager)
+        """
+        path = self.state_path(user_type)
+        if self._is_fresh(path):
+            return str(path)
+
+        # 多个 worker 同时需要同一用户的登录态时只登录一次
+        with file_lock(self.state_dir / f"{user_type}.lock"):
+            if not self._is_fresh(path):
+                self._login_and_save(browser, user_type, path)
+        return str(path)
+
+    async def async_get_state(self, browser, user_type: str = "standard") -> str:
+        """get_state 的异步版本（browser 为 playwright.async_api 的 Browser）"""
+        path = self.state_path(user_type)
+        if self._is_fresh(path):
+            return str(path)
+
+        # 先在事件循环内排队，同一时刻本进程只有一个协程持有该用户的文件锁
+        locks = self._async_locks.setdefault(asyncio.get_running_loop(), {})
+        async with locks.setdefault(user_type, asyncio.Lock()):
+            with file_lock(self.state_dir / f"{user_type}.lock"):
+                if not self._is_fresh(path):
+                    await self._async_login_and_save(browser, user_type, path)
+        return str(path)
+
+    def new_context(self, browser: Browser, user_type: str = "standard", **context_options) -> BrowserContext:
+        """创建已登录的 BrowserContext"""
+        state = self.get_state(browser, user_type)
+        return browser.new_context(**build_context_options(storage_state=state, **context_options))
+
+    def open_inventory(self, browser: Browser, user_type: str = "standard") -> Tuple[BrowserContext, Page]:
+        """创建已登录的上下文并直接打开产品列表页"""
+        context = self.new_context(browser, user_type)
+        page = context.new_page()
+        page.goto(self.inventory_url)
+        page.wait_for_selector(self.locators.PRODUCTS_CONTAINER, timeout=settings.TIMEOUT * 1000)
+        return context, page
+
+    def invalidate(self, user_type: Optional[str] = None):
+        """删除指定用户（默认全部）的缓存登录态"""
+        paths = [self.state_path(user_type)] if user_type else list(self.state_dir.glob("*.json"))
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _login_and_save(self, browser: Browser, user_type: str, path: Path):
+        """通过 UI 登录并保存 storage_state"""
+        user = self.data_manager.get_test_user(user_type)
+        logger.info(f"通过 UI 登录以生成缓存登录态: {user['username']}")
+        timeout_ms = settings.TIMEOUT * 1000
+
+        context = browser.new_context(**build_context_options())
+        try:
+            page = context.new_page()
+            page.goto(settings.BASE_URL)
+            page.fill(self.locators.LOGIN_USERNAME_INPUT, user["username"], timeout=timeout_ms)
+            page.fill(self.locators.LOGIN_PASSWORD_INPUT, user["password"], timeout=timeout_ms)
+            page.click(self.locators.LOGIN_BUTTON, timeout=timeout_ms)
+            # 登录成功（产品列表）或失败（错误提示）任一出现即可判断结果
+            page.locator(self.locators.PRODUCTS_CONTAINER).or_(
+                page.locator(self.locators.LOGIN_ERROR_CONTAINER)
+            ).first.wait_for(timeout=timeout_ms)
+            if page.query_selector(self.locators.LOGIN_ERROR_CONTAINER):
+                error = page.text_content(self.locators.LOGIN_ERROR_CONTAINER)
+                raise RuntimeError(f"用户 {user['username']} 无法登录，不能缓存登录态: {error}")
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            context.storage_state(path=str(path))
+            logger.info(f"登录态已缓存: {path}")
+        finally:
+            context.close()
+
+    async def _async_login_and_save(self, browser, user_type: str, path: Path):
+        """_login_and_save 的异步版本"""
+        user = self.data_manager.get_test_user(user_type)
+        logger.info(f"通过 UI 登录以生成缓存登录态: {user['username']}")
+        timeout_ms = settings.TIMEOUT * 1000
+
+        context = await browser.new_context(**build_context_options())
+        try:
+            page = await context.new_page()
+            await page.goto(settings.BASE_URL)
+            await page.fill(self.locators.LOGIN_USERNAME_INPUT, user["username"], timeout=timeout_ms)
+            await page.fill(self.locators.LOGIN_PASSWORD_INPUT, user["password"], timeout=timeout_ms)
+            await page.click(self.locators.LOGIN_BUTTON, timeout=timeout_ms)
+            await page.locator(self.locators.PRODUCTS_CONTAINER).or_(
+                page.locator(self.locators.LOGIN_ERROR_CONTAINER)
+            ).first.wait_for(timeout=timeout_ms)
+            if await page.query_selector(self.locators.LOGIN_ERROR_CONTAINER):
+                error = await page.text_content(self.locators.LOGIN_ERROR_CONTAINER)
+                raise RuntimeError(f"用户 {user['username']} 无法登录，不能缓存登录态: {error}")
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await context.storage_state(path=str(path))
+            logger.info(f"登录态已缓存: {path}")
+        finally:
+            await context.close()
+
+    def _is_fresh(self, path: Path) -> bool:
+        """缓存文件存在、未超过最长复用时间，且 Cookie 在最小剩余有效期内不会过期"""
+        if not path.exists():
+            return False
+        if time.time() - path.stat().st_mtime > self.max_age:
+            return False
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        # SauceDemo 的会话 Cookie 只有 10 分钟有效期，快过期时需要重新登录
+        deadline = time.time() + settings.AUTH_STATE_MIN_VALIDITY
+        return all(
+            cookie.get("expires", -1) <= 0 or cookie["expires"] > deadline
+            for cookie in state.get("cookies", [])
+        )
+
+
+_default_cache: Optional[AuthStateCache] = None
+
+
+def get_auth_state_cache() -> AuthStateCache:
+    """获取进程级默认登录态缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AuthStateCache()
+    return _default_cache
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+批量 DOM 提取
+一次 evaluate_all 调用读取选择器匹配的全部元素的文本、属性或结构化行数据，
+替代 query_selector_all + 逐个 text_content() 的 N+1 次浏览器往返
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from utils.locator_registry import get_locator
+from utils.wait_engine import dom_query
+
+TEXTS_JS = "els => els.map(el => el.textContent || '')"
+
+ATTRIBUTES_JS = "(els, name) => els.map(el => el.getAttribute(name))"
+
+ROWS_JS = """
+(els, fields) => els.map(row => {
+    const out = {};
+    for (const [key, field] of Object.entries(fields)) {
+        const node = field.css ? row.querySelector(field.css) : row;
+        out[key] = !node ? null : (field.attr ? node.getAttribute(field.attr) : (node.textContent || ''));
+    }
+    return out;
+})
+"""
+
+_ATTR_SUFFIX = re.compile(r"^(.*?)@([\w:-]+)$", re.S)
+
+
+def parse_field(spec: str) -> Dict[str, Optional[str]]:
+    """
+    解析行字段定义
+
+    - "css=.name"        子元素文本
+    - "css=a@href"       子元素属性
+    - "@data-id"         行元素自身属性
+    - ""                 行元素自身文本
+    子元素定位器需可换算为 CSS（css=、id= 或无前缀 CSS）
+    """
+    attr = None
+    match = _ATTR_SUFFIX.match(spec)
+    if match:
+        spec, attr = match.group(1), match.group(2)
+    css = None
+    if spec:
+        query = dom_query(spec)
+        if not query or query["type"] != "css":
+            raise ValueError(f"行字段只支持 CSS 定位器: {spec}")
+        css = query["value"]
+    return {"css": css, "attr": attr}
+
+
+def extract_texts(page, locator: str) -> List[str]:
+    """一次调用获取所有匹配元素的文本"""
+    return get_locator(page, locator).evaluate_all(TEXTS_JS)
+
+
+def extract_attributes(page, locator: str, attribute: str) -> List[Optional[str]]:
+    """一次调用获取所有匹配元素的属性值（属性不存在为 None）"""
+    return get_locator(page, locator).evaluate_all(ATTRIBUTES_JS, attribute)
+
+
+def extract_rows(page, row_locator: str, fields: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+    """
+    一次调用获取结构化行数据
+
+    Args:
+        page: Playwright Page
+        row_locator: 行元素定位器，例如产品卡片
+        fields: 字段名 -> 字段定义（见 parse_field）
+
+    Returns:
+        每行一个字典，子元素不存在时字段值为 None
+    """
+    parsed = {key: parse_field(spec) for key, spec in fields.items()}
+    return get_locator(page, row_locator).evaluate_all(ROWS_JS, parsed)
+
+
+def parse_price(text: Optional[str]) -> Optional[float]:
+    """将 "$29.99" 这样的价格文本转换为数值，无法解析时返回 None"""
+    try:
+        return float((text or "").replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
@@ -7,6 +7,9 @@
 import logging
 from typing import Optional, List, Dict
 from utils.ui_operations import UIOperations
+from utils.auth_state import AuthStateCache, get_auth_state_cache
+from utils.bulk_extract import parse_price
+from utils.page_snapshot import PageSnapshot, get_snapshot
 from tests.ui_layer.locators.saucedemo_locators import SauceDemoLocators
 from tests.ui_layer.locators.baidu_locators import BaiduLocators
 
@@ -33,13 +36,30 @@ class SauceDemoOperations:
             self.ui.fill(self.locators.LOGIN_USERNAME_INPUT, username)
             self.ui.fill(self.locators.LOGIN_PASSWORD_INPUT, password)
             self.ui.click(self.locators.LOGIN_BUTTON)
-            # 等待登录完成
-            self.ui.wait_for_element(self.locators.PRODUCTS_CONTAINER, timeout=10000)
-            logger.info("登录操作完成")
+            # 登录成功（产品列表）或失败（错误提示）任一出现即可确定结果
+            outcome = self.ui.wait_for_any(self.locators.PRODUCTS_CONTAINER,
+                                           self.locators.LOGIN_ERROR_CONTAINER, timeout=10)
+            logger.info(f"登录操作完成: {'成功' if outcome == self.locators.PRODUCTS_CONTAINER else '失败'}")
         except Exception as e:
             logger.error(f"登录失败: {e}")
             raise
     
+    def login_from_cache(self, user_type: str = "standard", cache: Optional[AuthStateCache] = None):
+        """
+        使用缓存的登录态直接进入产品列表页（跳过 UI 登录）
+        
+        登录功能本身的测试仍应使用 login()
+        
+        Args:
+            user_type: 用户类型 (standard/problem/performance_glitch 等)
+            cache: 登录态缓存，默认使用进程级缓存
+        """
+        cache = cache or get_auth_state_cache()
+        logger.info(f"使用缓存登录态进入产品页: 用户类型={user_type}")
+        state = cache.get_state(self.ui.browser, user_type)
+        self.ui.new_context(url=cache.inventory_url, storage_state=state)
+        self.ui.wait_for_element(self.locators.PRODUCTS_CONTAINER, timeout=10)
+    
     def verify_login_success(self):
         """验证登录成功"""
         logger.info("验证登录成功")
@@ -49,7 +69,8 @@ class SauceDemoOperations:
     def verify_login_failed(self, expected_error: Optional[str] = None):
         """验证登录失败"""
         logger.info("验证登录失败")
-        self.ui.assert_element_exists(self.locators.LOGIN_ERROR_CONTAINER)
+        # login() 已等到结果出现，这里直接按当前页面判断，成功登录时不再等满超时
+        self.ui.assert_element_exists(self.locators.LOGIN_ERROR_CONTAINER, mode="now")
         if expected_error:
             self.ui.assert_text_contains(self.locators.LOGIN_ERROR_CONTAINER, expected_error)
         logger.info("登录失败验证通过")
@@ -67,6 +88,7 @@ class SauceDemoOperations:
         add_btn = product.query_selector(self.locators.PRODUCT_ADD_BTN)
         if add_btn:
             add_btn.click()
+            self.ui.mark_page_changed()
             logger.info(f"产品已添加到购物车: 索引={product_index}")
         else:
             logger.warning(f"未找到添加按钮: 索引={product_index}")
@@ -76,10 +98,13 @@ class SauceDemoOperations:
         for index in indices:
             self.add_product_to_cart(index)
     
+    def snapshot(self, refresh: bool = False) -> PageSnapshot:
+        """当前页面的业务状态快照，页面未被修改时复用缓存"""
+        return get_snapshot(self.ui.page, refresh=refresh)
+    
     def verify_cart_count(self, expected_count: int):
         """验证购物车数量"""
-        count_text = self.ui.get_text(self.locators.SHOPPING_CART_BADGE)
-        actual_count = int(count_text) if count_text else 0
+        actual_count = self.snapshot().cart_badge
         if actual_count != expected_count:
             raise AssertionError(f"购物车数量不匹配。期望: {expected_count}，实际: {actual_count}")
     
@@ -95,9 +120,11 @@ class SauceDemoOperations:
     
     def fill_checkout_info(self, first_name: str, last_name: str, postal_code: str):
         """填写结账信息"""
-        self.ui.fill(self.locators.CHECKOUT_FIRST_NAME, first_name)
-        self.ui.fill(self.locators.CHECKOUT_LAST_NAME, last_name)
-        self.ui.fill(self.locators.CHECKOUT_POSTAL_CODE, postal_code)
+        self.ui.fill_form({
+            self.locators.CHECKOUT_FIRST_NAME: first_name,
+            self.locators.CHECKOUT_LAST_NAME: last_name,
+            self.locators.CHECKOUT_POSTAL_CODE: postal_code,
+        })
     
     def complete_checkout(self):
         """完成结账"""
@@ -139,8 +166,8 @@ class SauceDemoOperations:
         if not value:
             raise ValueError(f"不支持的排序选项: {sort_option}")
         self.ui.select_option(self.locators.SORT_DROPDOWN, value)
-        # 等待排序完成
-        self.ui.page.wait_for_timeout(500)
+        # 等待产品列表重新渲染完成
+        self.ui.wait_for_element_stable(self.locators.PRODUCTS_CONTAINER, quiet=50, timeout=5)
     
     def get_product_names(self) -> List[str]:
         """获取所有产品名称"""
@@ -150,6 +177,13 @@ class SauceDemoOperations:
         """获取所有产品价格"""
         return self.ui.get_all_texts(self.locators.PRODUCT_PRICE)
     
+    def get_products(self) -> List[Dict[str, Optional[str]]]:
+        """一次获取所有产品的名称和价格"""
+        return self.ui.get_rows(self.locators.PRODUCT_ITEM, {
+            "name": self.locators.PRODUCT_NAME,
+            "price": self.locators.PRODUCT_PRICE,
+        })
+    
     def logout(self):
         """退出登录"""
         self.ui.click(self.locators.HAMBURGER_MENU)
@@ -166,10 +200,11 @@ class SauceDemoOperations:
         remove_btn = product.query_selector(self.locators.PRODUCT_REMOVE_BTN)
         if remove_btn:
             remove_btn.click()
+            self.ui.mark_page_changed()
     
     def get_cart_item_count(self) -> int:
         """获取购物车中的产品数量"""
-        return self.ui.get_element_count(self.locators.CART_ITEM)
+        return self.snapshot().item_count
     
     def continue_shopping(self):
         """继续购物（从购物车返回产品列表）"""
@@ -178,7 +213,7 @@ class SauceDemoOperations:
     
     def verify_product_count(self, expected_count: int):
         """验证产品列表数量"""
-        actual_count = self.ui.get_element_count(self.locators.PRODUCT_ITEM)
+        actual_count = self.snapshot().item_count
         if actual_count != expected_count:
             raise AssertionError(f"产品数量不匹配。期望: {expected_count}，实际: {actual_count}")
     
@@ -188,20 +223,18 @@ class SauceDemoOperations:
     
     def filter_products_by_price_range(self, min_price: float = None, max_price: float = None):
         """根据价格范围筛选产品（示例方法）"""
-        prices = self.get_product_prices()
         filtered_products = []
         
-        for i, price_text in enumerate(prices):
+        for i, price_text in enumerate(self.get_product_prices()):
             # 提取价格数值（移除$符号）
-            try:
-                price_value = float(price_text.replace('$', '').strip())
-                if min_price and price_value < min_price:
-                    continue
-                if max_price and price_value > max_price:
-                    continue
-                filtered_products.append(i)
-            except ValueError:
+            price_value = parse_price(price_text)
+            if price_value is None:
+                continue
+            if min_price and price_value < min_price:
+                continue
+            if max_price and price_value > max_price:
                 continue
+            filtered_products.append(i)
         
         return filtered_products
 
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+即时 DOM 断言
+断言分两种模式：
+- eventually：条件最终成立，等待直到满足或超时（正向断言的默认方式）
+- now：条件此刻成立，页面达到声明的就绪状态后，等一个渲染帧直接读取当前 DOM 判断
+
+否定断言（不存在、不可见）和快照式检查使用 now 模式，答案已知时不再等满超时。
+就绪状态 = document.readyState 达到声明值，且声明的就绪元素（可选）已出现。
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import config.settings as settings
+from utils.wait_engine import dom_query
+
+ASSERT_MODES = ("eventually", "now")
+
+# 等待就绪状态 + 一个渲染帧后读取元素数量和可见性；超时后按当前 DOM 返回，不抛异常
+_PROBE_JS = """
+({ query, ready, readyState, frame, timeout }) => new Promise((resolve) => {
+    const ORDER = ['loading', 'interactive', 'complete'];
+    const findAll = (q) => {
+        if (q.type === 'xpath') {
+            const result = document.evaluate(q.value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            return Array.from({ length: result.snapshotLength }, (_, i) => result.snapshotItem(i));
+        }
+        return Array.from(document.querySelectorAll(q.value));
+    };
+    // 与 Playwright 的可见性判断一致：包围盒非空且 visibility 不为 hidden
+    const isVisible = (el) => {
+        if (!(el instanceof Element)) return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const measure = () => {
+        if (!query) { resolve({ ready: isReady(), count: null, visible: null }); return; }
+        const elements = findAll(query);
+        resolve({ ready: isReady(), count: elements.length, visible: elements.some(isVisible) });
+    };
+    const isReady = () => ORDER.indexOf(document.readyState) >= ORDER.indexOf(readyState)
+        && (!ready || findAll(ready).length > 0);
+    // 等一个渲染帧；后台页面可能暂停 requestAnimationFrame，用短定时器兜底
+    const afterFrame = () => {
+        if (!frame) { measure(); return; }
+        let done = false;
+        const once = () => { if (!done) { done = true; measure(); } };
+        requestAnimationFrame(once);
+        setTimeout(once, 50);
+    };
+    if (isReady()) { afterFrame(); return; }
+
+    let observer = null;
+    const finish = () => {
+        clearTimeout(timer);
+        document.removeEventListener('readystatechange', check);
+        if (observer) observer.disconnect();
+        afterFrame();
+    };
+    const check = () => { if (isReady()) finish(); };
+    const timer = setTimeout(finish, timeout);
+    document.addEventListener('readystatechange', check);
+    if (ready) {
+        observer = new MutationObserver(check);
+        observer.observe(document.documentElement, { subtree: true, childList: true });
+    }
+})
+"""
+
+
+@dataclass(frozen=True)
+class ElementState:
+    """元素当前状态"""
+
+    count: int
+    visible: bool
+
+    @property
+    def exists(self) -> bool:
+        """是否存在于 DOM 中"""
+        return self.count > 0
+
+
+def check_mode(mode: str) -> str:
+    """校验断言模式"""
+    if mode not in ASSERT_MODES:
+        raise ValueError(f"不支持的断言模式: {mode}，可选: {', '.join(ASSERT_MODES)}")
+    return mode
+
+
+class DomProbe:
+    """即时读取页面当前 DOM 状态"""
+
+    def __init__(self, page, ready_state: Optional[str] = None, ready_locator: Optional[str] = None,
+                 frame: bool = True, timeout: Optional[int] = None):
+        """
+        初始化 DOM 探针
+
+        Args:
+            page: Playwright Page
+            ready_state: 声明的就绪状态（loading/interactive/complete），默认 settings.ASSERT_READY_STATE
+            ready_locator: 声明的就绪元素，出现后页面才视为就绪
+            frame: 读取前是否等待一个渲染帧
+            timeout: 等待就绪的最长时间（毫秒），默认 settings.TIMEOUT
+        """
+        self.page = page
+        self.ready_state = ready_state or settings.ASSERT_READY_STATE
+        self.ready_query = None
+        if ready_locator:
+            self.ready_query = dom_query(ready_locator)
+            if self.ready_query is None:
+                raise ValueError(f"就绪元素需为 CSS / XPath 定位器: {ready_locator}")
+        self.frame = frame
+        self.timeout = timeout if timeout is not None else settings.TIMEOUT * 1000
+
+    def state(self, locator: str) -> ElementState:
+        """页面就绪后元素的当前状态（一次浏览器往返）"""
+        query = dom_query(locator)
+        result = self._probe(query)
+        if query is None:
+            # text=、role= 等 Playwright 专有选择器：就绪后用不等待的 Locator 方法读取
+            target = self.page.locator(locator)
+            return ElementState(count=target.count(), visible=target.first.is_visible())
+        return ElementState(count=result["count"], visible=result["visible"])
+
+    async def async_state(self, locator: str) -> ElementState:
+        """state 的异步版本（playwright.async_api 的页面）"""
+        query = dom_query(locator)
+        result = await self.page.evaluate(_PROBE_JS, self._probe_args(query))
+        if query is None:
+            target = self.page.locator(locator)
+            return ElementState(count=await target.count(), visible=await target.first.is_visible())
+        return ElementState(count=result["count"], visible=result["visible"])
+
+    def ready(self) -> bool:
+        """等待页面达到声明的就绪状态，返回是否在超时前就绪"""
+        return bool(self._probe(None)["ready"])
+
+    def _probe(self, query) -> dict:
+        """在页面内执行探测脚本"""
+        return self.page.evaluate(_PROBE_JS, self._probe_args(query))
+
+    def _probe_args(self, query) -> dict:
+        """探测脚本参数"""
+        return {
+            "query": query,
+            "ready": self.ready_query,
+            "readyState": self.ready_state,
+            "frame": self.frame,
+            "timeout": self.timeout,
+        }
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver 二进制路径缓存
+按（机器平台, 浏览器, 浏览器版本）解析一次驱动路径并持久化到磁盘，
+多进程 / pytest-xdist worker 之间共享；离线模式下完全不访问网络
+"""
+
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+import config.settings as settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# 各浏览器对应的驱动可执行文件名与显式路径环境变量
+DRIVER_BINARIES = {
+    "chrome": ("chromedriver", "CHROMEDRIVER_PATH"),
+    "firefox": ("geckodriver", "GECKODRIVER_PATH"),
+    "edge": ("msedgedriver", "EDGEDRIVER_PATH"),
+}
+
+# 获取浏览器版本的候选命令（按顺序尝试）
+BROWSER_VERSION_COMMANDS = {
+    "chrome": [
+        ["google-chrome", "--version"],
+        ["google-chrome-stable", "--version"],
+        ["chromium", "--version"],
+        ["chromium-browser", "--version"],
+        ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"],
+        ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+    ],
+    "firefox": [
+        ["firefox", "--version"],
+        ["/Applications/Firefox.app/Contents/MacOS/firefox", "--version"],
+    ],
+    "edge": [
+        ["microsoft-edge", "--version"],
+        ["microsoft-edge-stable", "--version"],
+        ["/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge", "--version"],
+        ["reg", "query", r"HKEY_CURRENT_USER\Software\Microsoft\Edge\BLBeacon", "/v", "version"],
+    ],
+}
+
+_VERSION_PATTERN = re.compile(r"(\d+(?:\.\d+)+)")
+
+
+def detect_browser_version(browser: str) -> str:
+    """检测本机浏览器版本，无法检测时返回 unknown"""
+    for cmd in BROWSER_VERSION_COMMANDS.get(browser, []):
+        try:
+            output = subprocess.run(cmd, capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = _VERSION_PATTERN.search(output or "")
+        if match:
+            return match.group(1)
+    return "unknown"
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """跨进程文件锁，保证多个进程 / worker 对同一缓存文件的解析与写入互斥"""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DriverBinaryCache:
+    """驱动路径缓存 - 每台机器、每个浏览器版本只解析一次"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, offline: Optional[bool] = None):
+        """
+        初始化驱动缓存
+
+        Args:
+            cache_dir: 缓存目录，默认 settings.DRIVER_CACHE_DIR
+            offline: 严格离线模式，默认 settings.DRIVER_OFFLINE
+        """
+        self.cache_dir = Path(cache_dir or settings.DRIVER_CACHE_DIR)
+        self.cache_file = self.cache_dir / "drivers.json"
+        self.lock_file = self.cache_dir / "drivers.lock"
+        self.offline = settings.DRIVER_OFFLINE if offline is None else offline
+        self._memo: Dict[str, str] = {}
+
+    def cache_key(self, browser: str) -> str:
+        """缓存键：平台 + 浏览器 + 浏览器版本"""
+        machine = f"{platform.system()}-{platform.machine()}".lower()
+        return f"{machine}|{browser}|{detect_browser_version(browser)}"
+
+    def resolve(self, browser: str) -> str:
+        """
+        解析驱动路径
+
+        顺序：显式环境变量 -> 进程内缓存 -> 磁盘缓存 -> （离线）PATH 查找 / （在线）webdriver-manager 下载
+        """
+        if browser not in DRIVER_BINARIES:
+            raise ValueError(f"不支持的浏览器类型: {browser}")
+        binary, env_var = DRIVER_BINARIES[browser]
+
+        explicit_path = os.getenv(env_var)
+        if explicit_path:
+            if not Path(explicit_path).exists():
+                raise FileNotFoundError(f"{env_var} 指向的驱动不存在: {explicit_path}")
+            return explicit_path
+
+        if browser in self._memo:
+            return self._memo[browser]
+
+        key = self.cache_key(browser)
+        path = self._lookup(key)
+        if path:
+            self._memo[browser] = path
+            return path
+
+        with file_lock(self.lock_file):
+            # 等待锁期间其它进程可能已经完成解析
+            path = self._lookup(key)
+            if not path:
+                path = self._resolve_uncached(browser, binary)
+                self._store(key, path)
+
+        logger.info(f"驱动路径已缓存: {key} -> {path}")
+        self._memo[browser] = path
+        return path
+
+    def _resolve_uncached(self, browser: str, binary: str) -> str:
+        """缓存未命中时解析驱动路径"""
+        if self.offline:
+            path = shutil.which(binary)
+            if not path:
+                raise RuntimeError(
+                    f"离线模式下未找到 {binary}：请预先放入 PATH、设置 "
+                    f"{DRIVER_BINARIES[browser][1]}，或在联网环境下预热缓存 {self.cache_file}"
+                )
+            return path
+
+        if browser == "chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        if browser == "firefox":
+            from webdriver_manager.firefox import GeckoDriverManager
+            return GeckoDriverManager().install()
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager().install()
+
+    def _read(self) -> Dict[str, str]:
+        """读取磁盘缓存"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            return json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"驱动缓存文件损坏，忽略: {e}")
+            return {}
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """查询磁盘缓存，记录的驱动文件已不存在时视为未命中"""
+        path = self._read().get(key)
+        if path and Path(path).exists():
+            return path
+        return None
+
+    def _store(self, key: str, path: str):
+        """写入磁盘缓存（先写临时文件再原子替换）"""
+        data = self._read()
+        data[key] = path
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_file, self.cache_file)
+
+
+_default_cache: Optional[DriverBinaryCache] = None
+
+
+def resolve_driver_path(browser: str) -> str:
+    """使用进程级默认缓存解析驱动路径"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DriverBinaryCache()
+    return _default_cache.resolve(browser)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Selenium WebDriver 池
+按（浏览器类型, 是否无头）缓存存活的驱动，在测试之间复用，避免每个测试重新启动浏览器
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import config.settings as settings
+from utils.selenium_helper import SeleniumHelper
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, bool]
+
+
+class SeleniumDriverPool:
+    """Selenium 驱动池 - 借出/归还 SeleniumHelper，归还时重置浏览器状态"""
+
+    def __init__(self, max_idle: int = None, max_uses: int = None):
+        """
+        初始化驱动池
+
+        Args:
+            max_idle: 每个 key 最多保留的空闲驱动数量，超出部分直接关闭
+            max_uses: 单个驱动最多复用的次数，达到后回收并重建（0 表示不限制）
+        """
+        self.max_idle = max_idle if max_idle is not None else settings.SELENIUM_POOL_MAX_IDLE
+        self.max_uses = max_uses if max_uses is not None else settings.SELENIUM_POOL_MAX_USES
+        self._idle: Dict[PoolKey, List[SeleniumHelper]] = defaultdict(list)
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, browser: str = None, headless: bool = None,
+                screenshot_on_failure: bool = True) -> SeleniumHelper:
+        """
+        借出一个可用的驱动；没有空闲驱动或空闲驱动不健康时新建
+
+        Args:
+            browser: 浏览器类型 (chrome/firefox/edge)
+            headless: 是否无头模式
+            screenshot_on_failure: 失败时是否自动截图
+        """
+        browser = browser or settings.BROWSER
+        headless = headless if headless is not None else settings.HEADLESS
+        key = (browser, headless)
+
+        while True:
+            with self._lock:
+                helper = self._idle[key].pop() if self._idle[key] else None
+            if helper is None:
+                break
+            if self.is_healthy(helper):
+                helper.screenshot_on_failure = screenshot_on_failure
+                logger.debug(f"复用驱动: {key}")
+                return helper
+            logger.warning(f"驱动健康检查失败，回收: {key}")
+            self._discard(helper)
+
+        helper = SeleniumHelper(browser=browser, headless=headless,
+                                screenshot_on_failure=screenshot_on_failure)
+        helper.start_browser()
+        self._uses[id(helper)] = 0
+        logger.info(f"新建驱动: {key}")
+        return helper
+
+    def release(self, helper: SeleniumHelper):
+        """归还驱动：重置状态后放回池中；重置失败或超过复用次数则关闭"""
+        if helper.driver is None:
+            self._uses.pop(id(helper), None)
+            return
+
+        self._uses[id(helper)] = self._uses.get(id(helper), 0) + 1
+        if self.max_uses and self._uses[id(helper)] >= self.max_uses:
+            logger.info(f"驱动已复用 {self._uses[id(helper)]} 次，回收")
+            self._discard(helper)
+            return
+
+        try:
+            self.reset(helper)
+        except Exception as e:
+            logger.warning(f"重置驱动状态失败，回收: {e}")
+            self._discard(helper)
+            return
+
+        key = (helper.browser, helper.headless)
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle:
+                self._idle[key].append(helper)
+                return
+        self._discard(helper)
+
+    @staticmethod
+    def reset(helper: SeleniumHelper):
+        """重置浏览器状态：清除 Cookie、localStorage/sessionStorage，并回到 about:blank"""
+        driver = helper.driver
+        # 只保留一个窗口，关闭测试中打开的其它标签页
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Storage 属于当前源，必须在离开页面之前清理
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            # about:blank 等页面无法访问 Storage
+            pass
+
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chromium 系浏览器可以一次清除所有域的 Cookie
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        else:
+            driver.delete_all_cookies()
+
+        driver.get("about:blank")
+
+    @staticmethod
+    def is_healthy(helper: SeleniumHelper) -> bool:
+        """健康检查：会话可响应脚本执行即视为健康"""
+        if helper.driver is None:
+            return False
+        try:
+            return helper.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def close_all(self):
+        """关闭池中所有空闲驱动"""
+        with self._lock:
+            helpers = [helper for idle in self._idle.values() for helper in idle]
+            self._idle.clear()
+        for helper in helpers:
+            self._discard(helper)
+        logger.info(f"驱动池已关闭，共关闭 {len(helpers)} 个驱动")
+
+    def _discard(self, helper: SeleniumHelper):
+        """关闭驱动并清理记录"""
+        self._uses.pop(id(helper), None)
+        try:
+            helper.quit()
+        except Exception as e:
+            logger.debug(f"关闭驱动时出错: {e}")
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+测试耗时历史
+按测试 nodeid 记录每次运行的总耗时（setup + call + teardown），用指数移动平均平滑后持久化，
+供 pytest-xdist 的最长处理时间优先（LPT）调度估算每个测试的成本。
+
+没有历史的新测试按已知测试耗时的中位数估算，避免被当作 0 秒排到最后或被高估排到最前。
+"""
+
+import heapq
+import logging
+import statistics
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config.settings as settings
+from utils.json_store import LockedJSONStore
+
+logger = logging.getLogger(__name__)
+
+
+class DurationStore(LockedJSONStore):
+    """测试耗时历史 - 按 nodeid 保存耗时的指数移动平均和运行次数"""
+
+    DESCRIPTION = "测试耗时历史"
+
+    def __init__(self, path: Optional[Path] = None, alpha: Optional[float] = None,
+                 default: Optional[float] = None):
+        """
+        初始化耗时历史
+
+        Args:
+            path: 历史文件，默认 settings.DURATION_STORE
+            alpha: 指数移动平均系数（新样本权重），默认 settings.DURATION_EMA_ALPHA
+            default: 没有任何历史时的估算耗时（秒），默认 settings.DURATION_DEFAULT
+        """
+        super().__init__(path or settings.DURATION_STORE, indent=1)
+        self.alpha = alpha if alpha is not None else settings.DURATION_EMA_ALPHA
+        self.default = default if default is not None else settings.DURATION_DEFAULT
+        self._median: Optional[float] = None
+
+    def estimate(self, nodeid: str) -> float:
+        """测试的估算耗时（秒）"""
+        with self._lock:
+            entry = self._load().get(nodeid)
+            if entry:
+                return entry["ema"]
+            return self._unknown_estimate()
+
+    def record(self, nodeid: str, seconds: float):
+        """记录一次测试耗时"""
+        with self._lock:
+            history = self._load()
+            history[nodeid] = self._smooth(history.get(nodeid), seconds)
+            self._pending.setdefault(nodeid, []).append(seconds)
+            self._median = None
+
+    def _merge(self, data: Dict[str, Dict[str, float]], pending: Dict[str, List[float]]):
+        """以磁盘上的最新值为基础重新平滑本次运行的样本"""
+        for nodeid, samples in pending.items():
+            for seconds in samples:
+                data[nodeid] = self._smooth(data.get(nodeid), seconds)
+
+    def _smooth(self, entry: Optional[Dict[str, float]], seconds: float) -> Dict[str, float]:
+        """指数移动平均"""
+        if not entry:
+            return {"ema": round(seconds, 3), "runs": 1}
+        ema = self.alpha * seconds + (1 - self.alpha) * entry["ema"]
+        return {"ema": round(ema, 3), "runs": int(entry.get("runs", 0)) + 1}
+
+    def _unknown_estimate(self) -> float:
+        """新测试的估算耗时：已知测试耗时中位数"""
+        if self._median is None:
+            known = [entry["ema"] for entry in self._load().values()]
+            self._median = statistics.median(known) if known else self.default
+        return self._median
+
+
+def lpt_plan(costs: Dict[str, float], workers: int) -> Tuple[List[List[str]], float]:
+    """
+    最长处理时间优先分配：按耗时从长到短，每个测试分给当前总耗时最小的 worker
+
+    Args:
+        costs: nodeid -> 估算耗时（秒）
+        workers: worker 数量
+
+    Returns:
+        (每个 worker 分到的 nodeid 列表, 预计总耗时 makespan)
+    """
+    workers = max(1, workers)
+    assignments: List[List[str]] = [[] for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    heapq.heapify(loads)
+    for nodeid in lpt_order(costs):
+        load, index = heapq.heappop(loads)
+        assignments[index].append(nodeid)
+        heapq.heappush(loads, (load + costs[nodeid], index))
+    return assignments, max(load for load, _ in loads)
+
+
+def lpt_order(costs: Dict[str, float]) -> List[str]:
+    """按估算耗时从长到短排序（耗时相同保持原顺序）"""
+    return sorted(costs, key=lambda nodeid: -costs[nodeid])
+
+
+def estimate_all(store: DurationStore, nodeids: Iterable[str]) -> Dict[str, float]:
+    """批量估算耗时"""
+    return {nodeid: store.estimate(nodeid) for nodeid in nodeids}
+
+
+_store: Optional[DurationStore] = None
+
+
+def get_duration_store() -> DurationStore:
+    """进程级耗时历史"""
+    global _store
+    if _store is None:
+        _store = DurationStore()
+    return _store
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+批量表单填写
+一次页面脚本调用设置多个字段的值，并按浏览器真实输入的顺序派发 input / change 事件，
+替代逐字段 fill() 的多次往返和可操作性检查。
+
+使用原生 value setter 赋值，React 等受控组件也能收到变更；
+以下字段不在脚本内填写，由调用方回退为逐字段 fill / send_keys：
+- 定位器无法换算为 DOM 查询（text=、role= 等）
+- 元素不存在、不可编辑（disabled/readonly）或不是 input/textarea/select
+- 复选框、单选框、文件等非文本输入
+- 派发事件后值被页面脚本改写（自定义输入处理，如掩码、自动格式化）
+- 调用方显式指定需要逐字段输入的字段
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.wait_engine import dom_query
+
+# 返回每个字段是否已在脚本内完成填写
+FILL_FORM_JS = """
+(fields) => {
+    const TEXT_TYPES = ['text', 'password', 'email', 'search', 'tel', 'url', 'number',
+                        'date', 'datetime-local', 'month', 'time', 'week', 'color', 'range'];
+    const find = (query) => {
+        if (query.type === 'xpath') {
+            return document.evaluate(query.value, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        return document.querySelector(query.value);
+    };
+    const setterOf = (el) => {
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+            : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+            : HTMLInputElement.prototype;
+        return Object.getOwnPropertyDescriptor(proto, 'value').set;
+    };
+    return fields.map(({ query, value }) => {
+        const el = find(query);
+        if (!el || el.disabled || el.readOnly) return false;
+        const isInput = el instanceof HTMLInputElement && TEXT_TYPES.includes(el.type || 'text');
+        if (!isInput && !(el instanceof HTMLTextAreaElement) && !(el instanceof HTMLSelectElement)) return false;
+        el.focus();
+        setterOf(el).call(el, value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.blur();
+        return el.value === value;
+    });
+}
+"""
+
+def selenium_query(locator_type: str, locator_value: str) -> Optional[Dict[str, str]]:
+    """将 Selenium 定位（类型 + 值）换算为 DOM 查询，link_text 等无法换算时返回 None"""
+    return dom_query(f"{locator_type.lower()}={locator_value}")
+
+
+def plan_fields(form_data: Dict, to_query, per_field: Iterable = ()) -> Tuple[List[dict], List]:
+    """
+    拆分表单字段
+
+    Args:
+        form_data: 字段键 -> 值
+        to_query: 字段键 -> DOM 查询的换算函数，无法换算返回 None
+        per_field: 需要逐字段输入的字段键
+
+    Returns:
+        (脚本批量填写的字段, 需要逐字段输入的字段键)
+    """
+    skip = set(per_field)
+    batch, fallback = [], []
+    for key, value in form_data.items():
+        query = None if key in skip else to_query(key)
+        if query is None:
+            fallback.append(key)
+        else:
+            batch.append({"key": key, "query": query, "value": str(value)})
+    return batch, fallback
+
+
+def _pending(batch: List[dict], results: List[bool], fallback: List) -> List:
+    """脚本未能填写的字段追加到逐字段输入列表"""
+    return fallback + [field["key"] for field, done in zip(batch, results) if not done]
+
+
+def _payload(batch: List[dict]) -> List[dict]:
+    """页面脚本参数（不含字段键）"""
+    return [{"query": field["query"], "value": field["value"]} for field in batch]
+
+
+def batch_fill(page, form_data: Dict[str, str], per_field: Iterable[str] = ()) -> List[str]:
+    """
+    一次调用填写 Playwright 页面表单
+
+    Args:
+        page: Playwright Page
+        form_data: 定位器 -> 值
+        per_field: 需要逐字段 fill 的定位器（有自定义输入处理的字段）
+
+    Returns:
+        未在脚本内完成、需要调用方逐字段 fill 的定位器列表
+    """
+    batch, fallback = plan_fields(form_data, dom_query, per_field)
+    if not batch:
+        return fallback
+    return _pending(batch, page.evaluate(FILL_FORM_JS, _payload(batch)), fallback)
+
+
+async def async_batch_fill(page, form_data: Dict[str, str], per_field: Iterable[str] = ()) -> List[str]:
+    """batch_fill 的异步版本"""
+    batch, fallback = plan_fields(form_data, dom_query, per_field)
+    if not batch:
+        return fallback
+    return _pending(batch, await page.evaluate(FILL_FORM_JS, _payload(batch)), fallback)
+
+
+def selenium_batch_fill(driver, form_data: Dict[tuple, str], per_field: Iterable[tuple] = ()) -> List[tuple]:
+    """
+    一次 execute_script 填写 Selenium 页面表单
+
+    Args:
+        driver: WebDriver
+        form_data: (定位类型, 定位值) -> 值
+        per_field: 需要逐字段 send_keys 的 (定位类型, 定位值)
+
+    Returns:
+        需要调用方逐字段输入的 (定位类型, 定位值) 列表
+    """
+    batch, fallback = plan_fields(form_data, lambda key: selenium_query(*key), per_field)
+    if not batch:
+        return fallback
+    results = driver.execute_script(f"return ({FILL_FORM_JS})(arguments[0]);", _payload(batch))
+    return _pending(batch, results, fallback)
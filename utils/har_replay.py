@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+HAR 录制与回放
+按（目标站点, 页面流程）保存 HAR 文件，后续运行通过 BrowserContext.route_from_har 在本地回放响应，
+测试不再依赖线上站点的网络与延迟。
+
+- 响应体以 update_content="attach" 方式保存为以内容 SHA1 命名的独立文件，
+  同一站点的所有流程共用一个目录，相同的静态资源只保存一份
+- 回放时未命中 HAR 的请求照常发往网络；开启 HAR_UPDATE_ON_MISS 时，
+  出现未命中的流程在上下文关闭后作废，下次运行自动重新录制
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import config.settings as settings
+
+logger = logging.getLogger(__name__)
+
+HAR_MODES = ("off", "record", "replay")
+
+
+def har_path(flow: Optional[str] = None, base_url: Optional[str] = None) -> Path:
+    """流程对应的 HAR 文件路径：HAR_DIR/<站点>/<流程>.har"""
+    host = urlparse(base_url or settings.BASE_URL).netloc or "default"
+    name = re.sub(r"[^\w.-]+", "_", flow or "default").strip("_") or "default"
+    return Path(settings.HAR_DIR) / host / f"{name}.har"
+
+
+class HarSession:
+    """单个 BrowserContext 的 HAR 录制/回放会话"""
+
+    def __init__(self, flow: Optional[str] = None, mode: Optional[str] = None,
+                 update_on_miss: Optional[bool] = None, base_url: Optional[str] = None):
+        """
+        初始化 HAR 会话
+
+        Args:
+            flow: 页面流程名称，同一流程共用一个 HAR 文件
+            mode: off/record/replay，默认 settings.HAR_MODE
+            update_on_miss: 回放未命中时是否作废 HAR 以便重新录制，默认 settings.HAR_UPDATE_ON_MISS
+            base_url: 目标站点，默认 settings.BASE_URL
+        """
+        self.mode = (mode or settings.HAR_MODE).lower()
+        if self.mode not in HAR_MODES:
+            raise ValueError(f"不支持的 HAR 模式: {self.mode}，可选: {', '.join(HAR_MODES)}")
+        self.update_on_miss = settings.HAR_UPDATE_ON_MISS if update_on_miss is None else update_on_miss
+        self.path = har_path(flow, base_url)
+        self.active_mode = "off"
+        self.misses: List[str] = []
+
+    def attach(self, context):
+        """
+        在上下文上启用录制或回放（需在创建页面、注册其它路由之前调用）
+
+        回放模式下 HAR 文件不存在时：开启 update_on_miss 则改为录制，否则直接访问网络
+        """
+        mode = self._resolve_mode()
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 上下文关闭时写入 HAR，响应体按内容哈希保存在同一目录
+            context.route_from_har(str(self.path), update=True,
+                                   update_content="attach", update_mode="minimal")
+        elif mode == "replay":
+            # 先注册的路由优先级最低：只有 HAR 未命中并回落的请求才会到达这里
+            context.route("**/*", self._record_miss)
+            context.route_from_har(str(self.path), not_found="fallback")
+            context.on("close", self._on_close)
+
+        self.active_mode = mode
+        return self
+
+    async def async_attach(self, context):
+        """attach 的异步版本（playwright.async_api 的上下文）"""
+        mode = self._resolve_mode()
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            await context.route_from_har(str(self.path), update=True,
+                                         update_content="attach", update_mode="minimal")
+        elif mode == "replay":
+            await context.route("**/*", self._async_record_miss)
+            await context.route_from_har(str(self.path), not_found="fallback")
+            context.on("close", self._on_close)
+
+        self.active_mode = mode
+        return self
+
+    def _resolve_mode(self) -> str:
+        """本次实际使用的模式：回放文件缺失时改为录制或 off"""
+        if self.mode == "replay" and not self.path.exists():
+            if not self.update_on_miss:
+                logger.warning(f"HAR 文件不存在，直接访问网络: {self.path}")
+                return "off"
+            logger.info(f"HAR 文件不存在，本次录制: {self.path}")
+            return "record"
+        return self.mode
+
+    def _record_miss(self, route):
+        """记录未命中 HAR 的请求并照常发往网络"""
+        self.misses.append(route.request.url)
+        route.fallback()
+
+    async def _async_record_miss(self, route):
+        """_record_miss 的异步版本"""
+        self.misses.append(route.request.url)
+        await route.fallback()
+
+    def _on_close(self, context):
+        """上下文关闭：存在未命中时作废 HAR，下次运行重新录制"""
+        if not self.misses:
+            return
+        logger.info(f"HAR 回放未命中 {len(self.misses)} 个请求: {self.path}")
+        if self.update_on_miss:
+            self.path.unlink(missing_ok=True)
+            logger.info(f"HAR 已作废，下次运行重新录制: {self.path}")
+
+
+def apply_har(context, flow: Optional[str] = None) -> Optional[HarSession]:
+    """按 settings.HAR_MODE 为上下文启用 HAR 录制/回放；关闭时返回 None"""
+    if settings.HAR_MODE == "off":
+        return None
+    return HarSession(flow).attach(context)
+
+
+async def async_apply_har(context, flow: Optional[str] = None) -> Optional[HarSession]:
+    """apply_har 的异步版本"""
+    if settings.HAR_MODE == "off":
+        return None
+    return await HarSession(flow).async_attach(context)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+连接池化的 HTTP 会话
+- 每个会话挂载按主机复用连接的 HTTPAdapter（keep-alive），避免每个请求重新建立 TCP/TLS 连接
+- 支持 base_url：请求相对路径时自动拼接
+- 未显式传入 timeout 的请求使用默认超时
+- 幂等方法（GET / HEAD / PUT / DELETE / OPTIONS / TRACE）在连接失败或 502/503/504 时按指数退避重试；
+  读超时不重试，避免把慢接口的超时放大为多次等待
+"""
+
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config.settings as settings
+
+
+class PooledSession(requests.Session):
+    """带 base_url 和默认超时的连接池会话"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None):
+        super().__init__()
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout if timeout is not None else settings.API_TIMEOUT
+
+    def request(self, method, url, *args, **kwargs):
+        if self.base_url and not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+def retry_policy(retries: int) -> Retry:
+    """幂等方法的重试策略：连接失败和 502/503/504 重试，读超时直接抛出，重试用尽时返回最后一次响应"""
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        backoff_factor=settings.API_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+
+
+def create_session(base_url: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                   pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                   timeout: Optional[float] = None, retries: Optional[int] = None) -> PooledSession:
+    """
+    创建连接池会话
+
+    Args:
+        base_url: 相对路径请求拼接的基础地址
+        headers: 公共请求头
+        pool_connections: 缓存连接池的主机数，默认 settings.API_POOL_CONNECTIONS
+        pool_maxsize: 每个主机保持的最大连接数（应不小于并发请求数），默认 settings.API_POOL_MAXSIZE
+        timeout: 默认超时（秒），默认 settings.API_TIMEOUT
+        retries: 幂等请求的最大重试次数，默认 settings.API_RETRIES，0 表示不重试
+    """
+    session = PooledSession(base_url, timeout)
+    retries = settings.API_RETRIES if retries is None else retries
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or settings.API_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or settings.API_POOL_MAXSIZE,
+        max_retries=retry_policy(retries) if retries else 0,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
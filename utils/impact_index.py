@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+测试影响索引
+插桩运行（pytest --record-impact / Robot 影响监听器）时记录每个测试触及的：
+- 框架模块：测试期间执行过函数的项目内 .py 文件（sys.setprofile 只记录函数调用，不跟踪逐行执行）
+- 定位器常量：执行过的函数引用的定位器属性名（代码对象的 co_names），换算为 类名.常量名
+- Robot 资源文件：测试执行过的关键字所在的 .robot / .resource 文件，以及 suite 导入（含间接导入）的资源文件和变量文件
+
+选择时对比 git 改动：改动的模块、定位器常量（按 AST 比较定位器文件，只改一个常量时只选引用它的测试）
+或资源文件命中的测试被选中；改动的测试文件和 Robot suite 文件整体执行；
+全局文件（conftest.py、config/ 等）改动或索引为空时执行全部测试。
+
+会话 / 模块级 fixture 和 Suite Setup 只执行一次，其代码计入所有使用它们的测试。
+"""
+
+import ast
+import logging
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import config.settings as settings
+from utils.json_store import LockedJSONStore
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("pytest", "robot")
+ROBOT_TEST_SECTION = "*** Test Cases ***"
+
+_ROOT = settings.BASE_DIR.resolve()
+
+
+def project_path(path) -> Optional[str]:
+    """项目内文件的相对路径（posix），项目外或虚拟环境中的文件返回 None"""
+    if not path:
+        return None
+    try:
+        relative = Path(path).resolve().relative_to(_ROOT)
+    except (ValueError, OSError):
+        return None
+    if not relative.parts or "site-packages" in relative.parts or relative.parts[0] in (".venv", "venv"):
+        return None
+    return relative.as_posix()
+
+
+def is_locator_module(path: str) -> bool:
+    """定位器模块：文件名以 locators.py 结尾"""
+    return path.endswith("locators.py")
+
+
+def is_global_file(path: str) -> bool:
+    """改动后需要执行全部测试的文件（settings.IMPACT_GLOBAL_FILES，以 / 结尾表示目录）"""
+    for pattern in settings.IMPACT_GLOBAL_FILES:
+        if path == pattern or (pattern.endswith("/") and path.startswith(pattern)):
+            return True
+    return False
+
+
+def is_pytest_file(path: str) -> bool:
+    """pytest 测试文件"""
+    name = Path(path).name
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def locator_constants() -> Dict[str, Set[str]]:
+    """已加载定位器类的常量：常量名 -> {类名.常量名}"""
+    constants: Dict[str, Set[str]] = {}
+    for module in list(sys.modules.values()):
+        path = project_path(getattr(module, "__file__", None))
+        if not path or not is_locator_module(path):
+            continue
+        for cls in vars(module).values():
+            if not isinstance(cls, type) or cls.__module__ != module.__name__:
+                continue
+            for name, value in vars(cls).items():
+                if name.isupper() and isinstance(value, str):
+                    constants.setdefault(name, set()).add(f"{cls.__name__}.{name}")
+    return constants
+
+
+class CodeRecorder:
+    """通过 profile 钩子记录执行过的代码对象，按嵌套的采集栈归属（测试 / fixture / suite）"""
+
+    def __init__(self):
+        self._stack: List[Set] = []
+        self._paths: Dict[str, Optional[str]] = {}
+        self._constants: Optional[Dict[str, Set[str]]] = None
+
+    def start(self):
+        sys.setprofile(self._profile)
+        threading.setprofile(self._profile)
+
+    def stop(self):
+        sys.setprofile(None)
+        threading.setprofile(None)
+
+    def push(self):
+        """开始一个新的采集范围"""
+        self._stack.append(set())
+
+    def pop(self) -> Set:
+        """结束当前采集范围，返回其中执行过的代码对象"""
+        return self._stack.pop()
+
+    def _profile(self, frame, event, arg):
+        if event == "call" and self._stack:
+            self._stack[-1].add(frame.f_code)
+
+    def summarize(self, codes: Iterable) -> Tuple[Set[str], Set[str]]:
+        """代码对象 -> (项目模块路径, 引用的定位器常量)"""
+        if self._constants is None:
+            self._constants = locator_constants()
+        modules, locators = set(), set()
+        for code in codes:
+            filename = code.co_filename
+            if filename not in self._paths:
+                self._paths[filename] = project_path(filename) if filename.endswith(".py") else None
+            path = self._paths[filename]
+            if path is None:
+                continue
+            modules.add(path)
+            for name in code.co_names:
+                locators.update(self._constants.get(name, ()))
+        return modules, locators
+
+
+class ImpactIndex(LockedJSONStore):
+    """测试影响索引 - 按测试类型（pytest / robot）保存每个测试的记录"""
+
+    DESCRIPTION = "测试影响索引"
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        初始化影响索引
+
+        Args:
+            path: 索引文件，默认 settings.IMPACT_INDEX
+        """
+        super().__init__(path or settings.IMPACT_INDEX, indent=1)
+
+    def record(self, kind: str, test_id: str, modules: Iterable[str] = (), locators: Iterable[str] = (),
+               resources: Iterable[str] = ()):
+        """记录一个测试触及的模块、定位器常量和资源文件（覆盖该测试之前的记录）"""
+        entry = {"modules": sorted(modules), "locators": sorted(locators), "resources": sorted(resources)}
+        with self._lock:
+            self._load()[kind][test_id] = entry
+            self._pending[(kind, test_id)] = entry
+
+    def entries(self, kind: str) -> Dict[str, dict]:
+        """某类测试的全部记录"""
+        with self._lock:
+            return dict(self._load()[kind])
+
+    def select(self, changes: "ChangeSet") -> "ImpactSelection":
+        """按改动选择受影响的测试"""
+        selection = ImpactSelection(changed=sorted(changes.files))
+        if not any(self.entries(kind) for kind in KINDS):
+            return selection.everything("影响索引为空，请先以 --record-impact 完整运行一次")
+        global_files = [path for path in changes.files if is_global_file(path)]
+        if global_files:
+            return selection.everything(f"全局文件改动: {', '.join(sorted(global_files))}")
+        if changes.unparsable:
+            return selection.everything(f"无法解析的定位器文件: {', '.join(sorted(changes.unparsable))}")
+
+        for path in sorted(changes.files):
+            if not (_ROOT / path).is_file():
+                continue
+            if is_pytest_file(path):
+                selection.pytest_targets.append(path)
+            elif path.endswith(".robot") and ROBOT_TEST_SECTION in (_ROOT / path).read_text(encoding="utf-8"):
+                selection.robot_tests[path] = None
+
+        for nodeid, entry in sorted(self.entries("pytest").items()):
+            path = nodeid.split("::", 1)[0]
+            if path not in selection.pytest_targets and (_ROOT / path).is_file() and changes.hits(entry):
+                selection.pytest_targets.append(nodeid)
+        for key, entry in sorted(self.entries("robot").items()):
+            source, _, name = key.partition("::")
+            if selection.robot_tests.get(source, ()) is None or not (_ROOT / source).is_file():
+                continue
+            if changes.hits(entry):
+                selection.robot_tests.setdefault(source, []).append(name)
+        return selection
+
+    def _merge(self, data: Dict[str, Dict[str, dict]], pending: Dict[Tuple[str, str], dict]):
+        """本进程的记录覆盖同一测试在磁盘上的记录"""
+        for (kind, test_id), entry in pending.items():
+            data[kind][test_id] = entry
+
+    def _parse(self, data: dict) -> Dict[str, Dict[str, dict]]:
+        """补齐缺少的测试类型"""
+        return {kind: data.get(kind, {}) for kind in KINDS}
+
+
+@dataclass
+class ChangeSet:
+    """相对某个 git 版本的改动"""
+
+    files: Set[str] = field(default_factory=set)
+    locators: Set[str] = field(default_factory=set)
+    unparsable: Set[str] = field(default_factory=set)
+
+    def hits(self, entry: dict) -> bool:
+        """测试记录是否受改动影响"""
+        return bool(self.files.intersection(entry.get("modules", ()))
+                    or self.locators.intersection(entry.get("locators", ()))
+                    or self.files.intersection(entry.get("resources", ())))
+
+
+@dataclass
+class ImpactSelection:
+    """受影响的测试"""
+
+    run_all: bool = False
+    reason: str = ""
+    changed: List[str] = field(default_factory=list)
+    # pytest 测试文件（整体执行）或 nodeid
+    pytest_targets: List[str] = field(default_factory=list)
+    # Robot suite 文件 -> 用例名列表，None 表示整个 suite
+    robot_tests: Dict[str, Optional[List[str]]] = field(default_factory=dict)
+
+    def everything(self, reason: str) -> "ImpactSelection":
+        self.run_all = True
+        self.reason = reason
+        return self
+
+
+def _source_constants(source: str) -> Tuple[Dict[str, str], str]:
+    """定位器文件中类级字符串常量（类名.常量名 -> 值），以及去掉这些常量后的结构"""
+    tree = ast.parse(source)
+    constants = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        body = []
+        for stmt in node.body:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)
+                    and stmt.targets[0].id.isupper() and isinstance(stmt.value, ast.Constant)
+                    and isinstance(stmt.value.value, str)):
+                constants[f"{node.name}.{stmt.targets[0].id}"] = stmt.value.value
+            else:
+                body.append(stmt)
+        node.body = body
+    return constants, ast.dump(tree)
+
+
+def locator_changes(old_source: str, new_source: str) -> Set[str]:
+    """
+    定位器文件改动涉及的常量（类名.常量名）；常量以外的代码也有改动时返回文件中的全部常量
+
+    Raises:
+        SyntaxError: 任一版本无法解析
+    """
+    old_constants, old_structure = _source_constants(old_source)
+    new_constants, new_structure = _source_constants(new_source)
+    names = set(old_constants) | set(new_constants)
+    if old_structure != new_structure:
+        return names
+    return {name for name in names if old_constants.get(name) != new_constants.get(name)}
+
+
+def _git(*args: str) -> str:
+    """在项目根目录执行 git 命令"""
+    completed = subprocess.run(["git", *args], cwd=_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} 执行失败: {completed.stderr.strip()}")
+    return completed.stdout
+
+
+def collect_changes(since: str) -> ChangeSet:
+    """相对 git 版本 since 的改动（含工作区未提交和未跟踪的文件）"""
+    files = set(_git("diff", "--name-only", since, "--").split())
+    files |= set(_git("ls-files", "--others", "--exclude-standard").split())
+    changes = ChangeSet(files=files)
+    for path in sorted(files):
+        if not (path.endswith(".py") and is_locator_module(path)):
+            continue
+        try:
+            old_source = _git("show", f"{since}:{path}")
+        except RuntimeError:
+            old_source = ""
+        current = _ROOT / path
+        new_source = current.read_text(encoding="utf-8") if current.is_file() else ""
+        try:
+            changes.locators |= locator_changes(old_source, new_source)
+        except SyntaxError:
+            changes.unparsable.add(path)
+    return changes
+
+
+def select_affected(since: str, index: Optional[ImpactIndex] = None) -> ImpactSelection:
+    """选择相对 git 版本 since 受影响的 pytest 测试和 Robot 用例"""
+    return (index or get_impact_index()).select(collect_changes(since))
+
+
+_index: Optional[ImpactIndex] = None
+
+
+def get_impact_index() -> ImpactIndex:
+    """进程级影响索引"""
+    global _index
+    if _index is None:
+        _index = ImpactIndex()
+    return _index
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+pytest 测试影响记录插件
+使用 --record-impact 运行时记录每个测试触及的框架模块和定位器常量到影响索引，
+供 run.py --affected-since 选择受影响的测试。
+
+会话 / 模块级 fixture 单独采集，其代码计入所有使用该 fixture 的测试。
+使用 pytest-xdist 时各 worker 分别记录并合并写回。
+"""
+
+import pytest
+
+from utils.impact_index import CodeRecorder, get_impact_index
+
+_recorder = None
+# fixture 名 -> 非函数级 fixture 建立期间执行过的代码对象
+_fixture_codes = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--record-impact",
+        action="store_true",
+        default=False,
+        help="记录每个测试触及的框架模块和定位器常量到测试影响索引",
+    )
+
+
+def pytest_configure(config):
+    """xdist 主进程不执行测试，只在执行测试的进程中采集"""
+    global _recorder
+    workers = getattr(config.option, "numprocesses", None)
+    if config.getoption("record_impact") and (hasattr(config, "workerinput") or not workers):
+        _recorder = CodeRecorder()
+        _recorder.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if _recorder is None or fixturedef.scope == "function":
+        yield
+        return
+    _recorder.push()
+    yield
+    _fixture_codes.setdefault(fixturedef.argname, set()).update(_recorder.pop())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """setup + call + teardown 期间执行的代码，加上所用非函数级 fixture 的代码"""
+    if _recorder is None:
+        yield
+        return
+    _recorder.push()
+    yield
+    codes = _recorder.pop()
+    for name in getattr(item, "fixturenames", ()):
+        codes |= _fixture_codes.get(name, set())
+    modules, locators = _recorder.summarize(codes)
+    get_impact_index().record("pytest", item.nodeid, modules, locators)
+
+
+def pytest_sessionfinish(session):
+    if _recorder is not None:
+        _recorder.stop()
+        get_impact_index().flush()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程共享的 JSON 历史文件
+进程内首次使用时读取一次，记录只写入内存副本和待写队列；
+flush 时在文件锁内读取磁盘上的最新内容，合并本进程的待写记录后原子替换，
+多个进程 / pytest-xdist worker 同时写回也不会互相覆盖。
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.driver_cache import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class LockedJSONStore:
+    """
+    JSON 字典文件的进程内副本 - 退出前与磁盘文件合并写回（跨进程文件锁）
+
+    子类在持有 self._lock 时更新 self._load() 和 self._pending，并实现 _merge 合并待写记录
+    """
+
+    # 写回失败时日志中的名称
+    DESCRIPTION = "历史文件"
+
+    def __init__(self, path: Path, indent: Optional[int] = None):
+        """
+        Args:
+            path: JSON 文件
+            indent: 写回时的缩进，None 表示紧凑格式
+        """
+        self.path = Path(path)
+        self.lock_file = self.path.with_suffix(".lock")
+        self.indent = indent
+        self._data: Optional[Dict[str, Any]] = None
+        self._pending: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def flush(self):
+        """把本进程新增的记录合并写回磁盘"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        try:
+            with file_lock(self.lock_file):
+                data = self._read()
+                self._merge(data, pending)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.path.with_suffix(".tmp")
+                tmp_file.write_text(json.dumps(data, ensure_ascii=False, indent=self.indent), encoding="utf-8")
+                tmp_file.replace(self.path)
+        except OSError as e:
+            logger.warning(f"{self.DESCRIPTION}写入失败: {e}")
+
+    def _merge(self, data: Dict[str, Any], pending: Dict[Any, Any]):
+        """把待写记录合并进磁盘上的最新内容（原地修改 data）"""
+        raise NotImplementedError
+
+    def _parse(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """规范化读取到的内容"""
+        return data
+
+    def _load(self) -> Dict[str, Any]:
+        """首次使用时读取磁盘内容"""
+        if self._data is None:
+            self._data = self._read()
+        return self._data
+
+    def _read(self) -> Dict[str, Any]:
+        """读取磁盘内容，文件不存在或损坏时返回空"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        return self._parse(data if isinstance(data, dict) else {})
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+定位器注册表
+定位器字符串混用 css=、id=、tag=、xpath= 等前缀，这里统一在加载时解析一次：
+- 换算为 Playwright 可直接使用的选择器（tag=/name=/class= 转为 CSS）
+- 换算为 Selenium (By, value) 元组
+- 换算为页面脚本可执行的 DOM 查询（css/xpath）
+解析结果按原始字符串缓存并驻留，无效前缀在定位器类定义时即报错；
+Playwright Locator 对象按页面缓存，避免每次操作重新构造。
+"""
+
+import re
+import sys
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+_ENGINE_PREFIX = re.compile(r"^([a-zA-Z][\w:-]*)=(.*)$", re.S)
+
+# Selenium By 常量的取值（与 selenium.webdriver.common.by.By 一致，注册表不依赖 selenium）
+BY_ID = "id"
+BY_NAME = "name"
+BY_CLASS_NAME = "class name"
+BY_TAG_NAME = "tag name"
+BY_CSS_SELECTOR = "css selector"
+BY_XPATH = "xpath"
+
+# 只有 Playwright 支持的选择器引擎，原样传递，无法换算为 Selenium 定位
+PLAYWRIGHT_ONLY_ENGINES = frozenset({"text", "role", "data-testid", "data-test-id", "data-test"})
+
+
+@dataclass(frozen=True)
+class CompiledLocator:
+    """解析后的定位器"""
+
+    raw: str
+    playwright: str
+    selenium: Optional[Tuple[str, str]]
+    query: Optional[Dict[str, str]]
+
+
+def _quote(value: str) -> str:
+    """转义 CSS 属性选择器中的引号和反斜杠"""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _css(raw: str, css: str, selenium: Tuple[str, str]) -> CompiledLocator:
+    """CSS 定位器"""
+    return CompiledLocator(raw, sys.intern(f"css={css}"), selenium, {"type": "css", "value": css})
+
+
+@lru_cache(maxsize=None)
+def compile_locator(raw: str) -> CompiledLocator:
+    """
+    解析定位器字符串（结果缓存）
+
+    Raises:
+        ValueError: 定位器为空或前缀无效
+    """
+    if not raw or not raw.strip():
+        raise ValueError("定位器不能为空")
+    if ">>" in raw:
+        # 链式选择器只有 Playwright 支持
+        return CompiledLocator(raw, sys.intern(raw), None, None)
+    match = _ENGINE_PREFIX.match(raw)
+    if not match:
+        if raw.startswith("//") or raw.startswith("(//"):
+            return CompiledLocator(raw, sys.intern(f"xpath={raw}"), (BY_XPATH, raw), {"type": "xpath", "value": raw})
+        return _css(raw, raw, (BY_CSS_SELECTOR, raw))
+    engine, value = match.group(1).lower(), match.group(2)
+    if not value:
+        raise ValueError(f"定位器缺少选择器内容: {raw}")
+    if engine == "css":
+        return _css(raw, value, (BY_CSS_SELECTOR, value))
+    if engine == "id":
+        return CompiledLocator(raw, sys.intern(f"id={value}"), (BY_ID, value),
+                               {"type": "css", "value": f'[id="{_quote(value)}"]'})
+    if engine == "xpath":
+        return CompiledLocator(raw, sys.intern(f"xpath={value}"), (BY_XPATH, value), {"type": "xpath", "value": value})
+    if engine == "tag":
+        return _css(raw, value, (BY_TAG_NAME, value))
+    if engine == "name":
+        return _css(raw, f'[name="{_quote(value)}"]', (BY_NAME, value))
+    if engine == "class":
+        return _css(raw, f'[class~="{_quote(value)}"]', (BY_CLASS_NAME, value))
+    if engine in PLAYWRIGHT_ONLY_ENGINES or engine.startswith("internal:"):
+        return CompiledLocator(raw, sys.intern(raw), None, None)
+    raise ValueError(f"无效的定位器前缀 '{engine}=': {raw}")
+
+
+def playwright_selector(raw: str) -> str:
+    """Playwright 选择器"""
+    return compile_locator(raw).playwright
+
+
+def selenium_by(raw: str) -> Tuple[str, str]:
+    """Selenium (By, value) 元组"""
+    by = compile_locator(raw).selenium
+    if by is None:
+        raise ValueError(f"定位器无法用于 Selenium: {raw}")
+    return by
+
+
+def compile_locators(cls) -> Dict[str, CompiledLocator]:
+    """
+    解析定位器类中全部大写字符串属性，并把属性值替换为 Playwright 选择器
+
+    Raises:
+        ValueError: 存在无效定位器，错误信息包含类名和属性名
+    """
+    compiled = {}
+    for name in dir(cls):
+        value = getattr(cls, name)
+        if not name.isupper() or not isinstance(value, str):
+            continue
+        try:
+            compiled[name] = compile_locator(value)
+        except ValueError as e:
+            raise ValueError(f"{cls.__name__}.{name}: {e}") from None
+        setattr(cls, name, compiled[name].playwright)
+    return compiled
+
+
+class LocatorCache:
+    """按页面缓存 Playwright Locator 对象"""
+
+    def __init__(self):
+        self._pages = weakref.WeakKeyDictionary()
+
+    def get(self, page, raw: str):
+        """获取页面上的 Locator，同一选择器复用同一对象"""
+        locators = self._pages.get(page)
+        if locators is None:
+            locators = self._pages[page] = {}
+        selector = playwright_selector(raw)
+        locator = locators.get(selector)
+        if locator is None:
+            locator = locators[selector] = page.locator(selector)
+        return locator
+
+    def clear(self, page=None):
+        """清除指定页面（或全部页面）的缓存"""
+        if page is None:
+            self._pages.clear()
+        else:
+            self._pages.pop(page, None)
+
+
+_locator_cache = LocatorCache()
+
+
+def get_locator(page, raw: str):
+    """获取页面上缓存的 Playwright Locator"""
+    return _locator_cache.get(page, raw)
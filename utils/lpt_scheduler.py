@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+pytest-xdist 按耗时调度插件
+- 每次运行记录各测试耗时到 DurationStore（只在主进程记录，worker 的报告会回传主进程）
+- 使用 -n 并行时按历史耗时从长到短派发：每个 worker 只保留 2 个待执行测试，
+  完成一个补一个，长测试先开跑，短测试最后填平各 worker 的空隙，
+  总耗时接近 总耗时之和 / worker 数
+
+DURATION_SCHEDULING=false 或 --dist 不是 load 时使用 xdist 默认调度
+"""
+
+import logging
+
+import pytest
+
+import config.settings as settings
+from utils.duration_store import estimate_all, get_duration_store, lpt_plan
+
+try:
+    from xdist.scheduler import LoadScheduling
+except ImportError:  # 未安装 pytest-xdist 时只记录耗时
+    LoadScheduling = object
+
+logger = logging.getLogger(__name__)
+
+# 每个 worker 同时持有的测试数：一个执行中，一个待执行（worker 需要知道下一个测试才能开始执行当前测试）
+WORKER_QUEUE_DEPTH = 2
+
+# nodeid -> {阶段: 耗时}
+_durations = {}
+# 当前进程是否为 xdist worker（worker 不记录耗时，由主进程统一记录）
+_is_worker = False
+
+
+class LPTScheduling(LoadScheduling):
+    """最长处理时间优先调度"""
+
+    def __init__(self, config, log=None, store=None):
+        super().__init__(config, log)
+        self.store = store or get_duration_store()
+
+    def schedule(self):
+        """收集完成后按估算耗时从长到短排列待执行测试，并给每个 worker 发放初始测试"""
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(self.node2collection.values())[0]
+        costs = [self.store.estimate(nodeid) for nodeid in self.collection]
+        self.pending[:] = sorted(range(len(self.collection)), key=lambda index: -costs[index])
+        if not self.collection:
+            return
+
+        # 轮流发放，保证最长的测试分散到不同 worker
+        for _ in range(WORKER_QUEUE_DEPTH):
+            for node in self.nodes:
+                if self.pending:
+                    self._send_tests(node, 1)
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        """worker 完成一个测试后补足到 WORKER_QUEUE_DEPTH 个，不预先积压"""
+        if node.shutting_down:
+            return
+        if self.pending:
+            missing = WORKER_QUEUE_DEPTH - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+        self.log("num items waiting for node:", len(self.pending))
+
+
+def pytest_configure(config):
+    """识别 xdist worker 进程"""
+    global _is_worker
+    _is_worker = hasattr(config, "workerinput")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """-n 并行且 --dist load 时使用 LPT 调度"""
+    if not settings.DURATION_SCHEDULING or config.getoption("dist", "load") != "load":
+        return None
+    logger.info("按历史耗时调度测试（最长处理时间优先）")
+    return LPTScheduling(config, log)
+
+
+def pytest_runtest_logreport(report):
+    """累计每个测试各阶段耗时，teardown 结束时记录（跳过的测试不记录）"""
+    if _is_worker:
+        return
+    phases = _durations.setdefault(report.nodeid, {})
+    phases[report.when] = report.duration
+    if report.when == "call" and report.skipped:
+        phases["skipped"] = True
+    if report.when == "teardown":
+        phases = _durations.pop(report.nodeid)
+        if "call" in phases and not phases.get("skipped"):
+            get_duration_store().record(report.nodeid, sum(
+                phases.get(when, 0.0) for when in ("setup", "call", "teardown")))
+
+
+def pytest_sessionfinish(session):
+    """主进程写回耗时历史"""
+    if not _is_worker:
+        get_duration_store().flush()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """并行运行时输出 LPT 预计耗时与串行总耗时"""
+    workers = getattr(config.option, "numprocesses", None)
+    if not isinstance(workers, int) or workers < 1 or _is_worker or not settings.DURATION_SCHEDULING:
+        return
+    nodeids = [report.nodeid for reports in terminalreporter.stats.values() for report in reports
+               if getattr(report, "when", None) == "call"]
+    if not nodeids:
+        return
+    costs = estimate_all(get_duration_store(), nodeids)
+    _, makespan = lpt_plan(costs, workers)
+    terminalreporter.write_line(
+        f"按耗时调度: {len(costs)} 个测试，串行总耗时约 {sum(costs.values()):.1f}s，"
+        f"{workers} 个 worker 预计 {makespan:.1f}s"
+    )
+
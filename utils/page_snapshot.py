@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+SauceDemo 页面快照
+一次浏览器调用读取整页业务状态（商品名称/价格/按钮状态、购物车徽章、错误提示、完成消息、表单值），
+返回不可变的类型化对象；查询和断言直接读快照，不再逐个元素查询。
+
+快照按 Page 缓存，点击/输入/选择/导航等修改页面的操作会调用 invalidate_snapshot() 使其失效
+"""
+
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from tests.ui_layer.locators.saucedemo_locators import SauceDemoLocators
+from utils.bulk_extract import parse_price
+from utils.wait_engine import dom_query
+
+_SNAPSHOT_JS = """
+(sel) => {
+    const text = (root, css) => {
+        const node = css ? root.querySelector(css) : null;
+        return node ? (node.textContent || '').trim() : null;
+    };
+    const items = Array.from(document.querySelectorAll(sel.item)).map(row => {
+        const button = row.querySelector('button');
+        return {
+            name: text(row, sel.name),
+            price: text(row, sel.price),
+            quantity: text(row, sel.quantity),
+            button: button ? (button.textContent || '').trim() : null,
+            button_enabled: button ? !button.disabled : null,
+        };
+    });
+    const inputs = {};
+    for (const input of document.querySelectorAll('input[id]')) {
+        if (input.type !== 'submit' && input.type !== 'hidden') inputs[input.id] = input.value;
+    }
+    const badge = text(document, sel.badge);
+    return {
+        url: location.href,
+        title: text(document, sel.title),
+        items,
+        cart_badge: badge ? (parseInt(badge, 10) || 0) : 0,
+        error: text(document, sel.error),
+        complete_message: text(document, sel.complete),
+        inputs,
+    };
+}
+"""
+
+
+@dataclass(frozen=True)
+class ItemState:
+    """商品（产品列表或购物车中的一行）状态"""
+
+    name: Optional[str]
+    price: Optional[str]
+    quantity: Optional[str] = None
+    button: Optional[str] = None
+    button_enabled: Optional[bool] = None
+
+    @property
+    def price_value(self) -> Optional[float]:
+        """价格数值"""
+        return parse_price(self.price)
+
+    @property
+    def in_cart(self) -> bool:
+        """产品列表中按钮显示 Remove 即已加入购物车"""
+        return (self.button or "").lower() == "remove"
+
+
+@dataclass(frozen=True)
+class PageSnapshot:
+    """SauceDemo 页面业务状态快照"""
+
+    url: str
+    title: Optional[str]
+    items: Tuple[ItemState, ...]
+    cart_badge: int
+    error: Optional[str]
+    complete_message: Optional[str]
+    inputs: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def item_count(self) -> int:
+        """商品数量"""
+        return len(self.items)
+
+    @property
+    def item_names(self) -> List[str]:
+        """商品名称列表"""
+        return [item.name or "" for item in self.items]
+
+    @property
+    def item_prices(self) -> List[str]:
+        """商品价格文本列表"""
+        return [item.price or "" for item in self.items]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageSnapshot":
+        """由页面脚本返回的数据构造快照"""
+        return cls(
+            url=data["url"],
+            title=data.get("title"),
+            items=tuple(ItemState(**item) for item in data.get("items", [])),
+            cart_badge=int(data.get("cart_badge") or 0),
+            error=data.get("error"),
+            complete_message=data.get("complete_message"),
+            inputs=dict(data.get("inputs") or {}),
+        )
+
+
+def _css(locator: str) -> str:
+    """定位器转换为页面脚本使用的 CSS"""
+    query = dom_query(locator)
+    if not query or query["type"] != "css":
+        raise ValueError(f"快照只支持 CSS 定位器: {locator}")
+    return query["value"]
+
+
+def _selectors(locators: SauceDemoLocators) -> Dict[str, str]:
+    """快照脚本使用的选择器"""
+    return {
+        "item": f"{_css(locators.PRODUCT_ITEM)}, {_css(locators.CART_ITEM)}",
+        "name": _css(locators.PRODUCT_NAME),
+        "price": _css(locators.PRODUCT_PRICE),
+        "quantity": _css(locators.CART_ITEM_QUANTITY),
+        "badge": _css(locators.SHOPPING_CART_BADGE),
+        "title": _css(locators.HEADER_TITLE),
+        "error": _css(locators.LOGIN_ERROR_CONTAINER),
+        "complete": _css(locators.ORDER_COMPLETE_MSG),
+    }
+
+
+class SnapshotCache:
+    """按 Page 缓存快照，页面发生修改或导航后失效"""
+
+    def __init__(self):
+        self._snapshots = weakref.WeakKeyDictionary()
+        self._watched = weakref.WeakSet()
+        self._selectors = _selectors(SauceDemoLocators())
+        self.stats = {"hits": 0, "captures": 0}
+
+    def get(self, page, refresh: bool = False) -> PageSnapshot:
+        """获取页面快照，缓存有效时不访问浏览器"""
+        if not refresh and page in self._snapshots:
+            self.stats["hits"] += 1
+            return self._snapshots[page]
+        if page not in self._watched:
+            # 页面导航（包括表单提交、链接跳转）后自动失效
+            page.on("framenavigated", lambda frame: self.invalidate(page))
+            self._watched.add(page)
+        snapshot = PageSnapshot.from_dict(page.evaluate(_SNAPSHOT_JS, self._selectors))
+        self._snapshots[page] = snapshot
+        self.stats["captures"] += 1
+        return snapshot
+
+    def invalidate(self, page):
+        """使页面快照失效"""
+        if page is not None:
+            self._snapshots.pop(page, None)
+
+
+_cache = SnapshotCache()
+
+
+def get_snapshot(page, refresh: bool = False) -> PageSnapshot:
+    """获取页面快照（进程级缓存）"""
+    return _cache.get(page, refresh)
+
+
+def invalidate_snapshot(page):
+    """页面被修改后调用，使缓存的快照失效"""
+    _cache.invalidate(page)
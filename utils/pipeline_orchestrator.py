@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+测试流水线并发编排
+把 pytest Selenium / Playwright / API、Robot 等阶段作为独立进程并发执行：
+- 每个阶段声明所需的 CPU 核数、内存和浏览器槽位，总量不超过限制时立即启动，否则等待其他阶段释放
+- 按声明顺序依次尝试启动，排在前面的阶段资源不足时，后面资源够用的阶段（如 I/O 密集的 API 测试）先行启动
+- 各阶段输出逐行加 [阶段名] 前缀实时输出，结束后汇总通过/失败
+
+需求超过总量的阶段按总量计算（等其他阶段全部结束后单独执行）。
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, TextIO
+
+import config.settings as settings
+
+
+@dataclass
+class Stage:
+    """流水线阶段"""
+
+    name: str
+    cmd: List[str]
+    cpu: float = 1.0
+    memory_mb: int = 512
+    browsers: int = 0
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StageResult:
+    """阶段执行结果"""
+
+    name: str
+    returncode: int
+    started: float
+    finished: float
+
+    @property
+    def passed(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+def _physical_memory_mb() -> int:
+    """物理内存（MB），无法获取时返回 4096"""
+    try:
+        return int(os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+@dataclass
+class ResourceLimits:
+    """并发资源上限"""
+
+    cpu: float
+    memory_mb: int
+    browsers: int
+    max_stages: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "ResourceLimits":
+        """按配置生成上限，未配置的 CPU / 内存取本机核数和 80% 物理内存"""
+        return cls(
+            cpu=settings.PIPELINE_CPU or float(os.cpu_count() or 1),
+            memory_mb=settings.PIPELINE_MEMORY_MB or int(_physical_memory_mb() * 0.8),
+            browsers=settings.PIPELINE_BROWSER_SLOTS,
+            max_stages=settings.PIPELINE_MAX_STAGES,
+        )
+
+
+class PipelineOrchestrator:
+    """在资源限制下并发执行流水线阶段"""
+
+    def __init__(self, stages: Sequence[Stage], limits: Optional[ResourceLimits] = None,
+                 stream: Optional[TextIO] = None):
+        """
+        初始化编排器
+
+        Args:
+            stages: 阶段列表（顺序即启动优先级）
+            limits: 资源上限，默认 ResourceLimits.from_settings()
+            stream: 输出流，默认 sys.stdout
+        """
+        self.stages = list(stages)
+        self.limits = limits or ResourceLimits.from_settings()
+        self.stream = stream or sys.stdout
+        self._cond = threading.Condition()
+        self._output_lock = threading.Lock()
+        self._used = {"cpu": 0.0, "memory_mb": 0, "browsers": 0, "stages": 0}
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._width = max((len(stage.name) for stage in self.stages), default=0)
+
+    def run(self) -> List[StageResult]:
+        """执行全部阶段，返回按声明顺序排列的结果"""
+        pending = list(self.stages)
+        results: Dict[str, StageResult] = {}
+        threads = []
+        try:
+            with self._cond:
+                while pending:
+                    stage = next((stage for stage in pending if self._fits(stage)), None)
+                    if stage is None:
+                        self._cond.wait()
+                        continue
+                    pending.remove(stage)
+                    self._acquire(stage, 1)
+                    thread = threading.Thread(target=self._run_stage, args=(stage, results), daemon=True)
+                    thread.start()
+                    threads.append(thread)
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            for process in list(self._processes.values()):
+                process.terminate()
+            raise
+        return [results[stage.name] for stage in self.stages]
+
+    def _needs(self, stage: Stage) -> Dict[str, float]:
+        """阶段所需资源（不超过总量）"""
+        return {
+            "cpu": min(stage.cpu, self.limits.cpu),
+            "memory_mb": min(stage.memory_mb, self.limits.memory_mb),
+            "browsers": min(stage.browsers, self.limits.browsers),
+        }
+
+    def _fits(self, stage: Stage) -> bool:
+        """剩余资源是否足够启动阶段"""
+        if self.limits.max_stages and self._used["stages"] >= self.limits.max_stages:
+            return False
+        needs = self._needs(stage)
+        return (self._used["cpu"] + needs["cpu"] <= self.limits.cpu
+                and self._used["memory_mb"] + needs["memory_mb"] <= self.limits.memory_mb
+                and self._used["browsers"] + needs["browsers"] <= self.limits.browsers)
+
+    def _acquire(self, stage: Stage, sign: int):
+        """占用（sign=1）或释放（sign=-1）阶段资源，调用方持有 self._cond"""
+        for key, value in self._needs(stage).items():
+            self._used[key] += sign * value
+        self._used["stages"] += sign
+
+    def _emit(self, name: str, line: str):
+        """输出一行带阶段前缀的日志"""
+        with self._output_lock:
+            self.stream.write(f"[{name.ljust(self._width)}] {line.rstrip()}\n")
+            self.stream.flush()
+
+    def _run_stage(self, stage: Stage, results: Dict[str, StageResult]):
+        """在子进程中执行阶段，逐行转发输出，结束后释放资源"""
+        started = time.monotonic()
+        self._emit(stage.name, "▶ 开始: " + " ".join(stage.cmd))
+        try:
+            process = subprocess.Popen(stage.cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       text=True, errors="replace", bufsize=1,
+                                       env={**os.environ, "PIPELINE_STAGE": stage.name, **stage.env})
+        except OSError as e:
+            self._emit(stage.name, f"✗ 启动失败: {e}")
+            returncode = 127
+        else:
+            self._processes[stage.name] = process
+            for line in process.stdout:
+                self._emit(stage.name, line)
+            returncode = process.wait()
+            self._processes.pop(stage.name, None)
+        result = StageResult(stage.name, returncode, started, time.monotonic())
+        self._emit(stage.name, f"{'✓ 通过' if result.passed else '✗ 失败'}（{result.seconds:.1f}s，退出码 {returncode}）")
+        with self._cond:
+            results[stage.name] = result
+            self._acquire(stage, -1)
+            self._cond.notify_all()
+
+
+def format_summary(results: Sequence[StageResult]) -> str:
+    """汇总各阶段结果、总耗时与串行耗时"""
+    lines = ["========================================", "测试执行总结", "========================================"]
+    for result in results:
+        status = "✓ 通过" if result.passed else "✗ 失败"
+        lines.append(f"{result.name}: {status}（{result.seconds:.1f}s）")
+    if results:
+        wall = max(result.finished for result in results) - min(result.started for result in results)
+        serial = sum(result.seconds for result in results)
+        lines.append(f"总耗时 {wall:.1f}s（串行约 {serial:.1f}s）")
+    return "\n".join(lines)
+
+
+def run_pipeline(stages: Sequence[Stage], limits: Optional[ResourceLimits] = None) -> bool:
+    """并发执行流水线并输出汇总，全部通过时返回 True"""
+    results = PipelineOrchestrator(stages, limits).run()
+    print("\n" + format_summary(results))
+    return all(result.passed for result in results)
@@ -2,8 +2,52 @@
 Playwright 工具类
 提供常用的 Playwright 操作封装
 """
+import logging
+import time
+from collections import deque
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
 import config.settings as settings
+from utils.har_replay import apply_har
+from utils.resource_blocking import apply_resource_blocking
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+)
+
+
+def build_context_options(**overrides):
+    """
+    构造 BrowserContext 的默认参数（视窗大小、User-Agent）
+    
+    Args:
+        **overrides: 需要覆盖或追加的 new_context 参数
+    """
+    viewport = settings.BROWSER_OPTIONS.get("chrome", {}).get("window_size", (1920, 1080))
+    options = {
+        "viewport": {"width": viewport[0], "height": viewport[1]},
+        "user_agent": DEFAULT_USER_AGENT,
+    }
+    options.update(overrides)
+    return options
+
+
+def launch_browser(playwright, browser_type, headless, **launch_options):
+    """根据浏览器类型启动浏览器"""
+    browser_map = {
+        "chromium": playwright.chromium,
+        "firefox": playwright.firefox,
+        "webkit": playwright.webkit
+    }
+    
+    browser_launcher = browser_map.get(browser_type)
+    if not browser_launcher:
+        raise ValueError(f"不支持的浏览器类型: {browser_type}")
+    
+    return browser_launcher.launch(headless=headless, **launch_options)
 
 
 class PlaywrightHelper:
@@ -23,47 +67,81 @@ class PlaywrightHelper:
         self.browser = None
         self.context = None
         self.page = None
+        # 浏览器由自身启动时才在 quit() 中关闭；共享浏览器只关闭上下文
+        self._owns_browser = False
+        # 预热页面已经打开的URL，首次导航到该URL时无需重新加载
+        self._prewarmed_url = None
         
     def start_browser(self):
         """启动浏览器"""
         self.playwright = sync_playwright().start()
+        self.browser = launch_browser(self.playwright, self.browser_type, self.headless)
+        self._owns_browser = True
+        return self.new_page()
+    
+    def attach_to_browser(self, browser, har_flow=None, **context_options):
+        """
+        复用已启动的浏览器，仅为当前测试创建新的上下文和页面
         
-        browser_map = {
-            "chromium": self.playwright.chromium,
-            "firefox": self.playwright.firefox,
-            "webkit": self.playwright.webkit
-        }
-        
-        browser_launcher = browser_map.get(self.browser_type)
-        if not browser_launcher:
-            raise ValueError(f"不支持的浏览器类型: {self.browser_type}")
-        
-        self.browser = browser_launcher.launch(headless=self.headless)
+        Args:
+            browser: 已启动的 Playwright Browser（通常由 session 级 fixture 提供）
+            har_flow: HAR 录制/回放使用的页面流程名称（见 utils.har_replay）
+            **context_options: 额外的 new_context 参数（如 storage_state）
+        """
+        self.browser = browser
+        self._owns_browser = False
+        return self.new_page(har_flow=har_flow, **context_options)
+    
+    def attach_to_context(self, context, page, prewarmed_url=None):
+        """
+        接管已创建好的上下文和页面（通常来自 ContextPrewarmer）
         
-        # 创建上下文
-        viewport = settings.BROWSER_OPTIONS.get("chrome", {}).get("window_size", (1920, 1080))
-        self.context = self.browser.new_context(
-            viewport={"width": viewport[0], "height": viewport[1]},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-        )
+        Args:
+            context: 已创建的 BrowserContext
+            page: 该上下文中的 Page
+            prewarmed_url: 页面已预先打开的URL
+        """
+        self.browser = context.browser
+        self._owns_browser = False
+        self.context = context
+        self.page = page
+        self._prewarmed_url = prewarmed_url
+        return self.page
+    
+    def new_page(self, har_flow=None, **context_options):
+        """在当前浏览器上创建全新的 BrowserContext 和 Page（上下文之间互相隔离）"""
+        if not self.browser:
+            raise RuntimeError("浏览器未启动，请先调用 start_browser() 或 attach_to_browser()")
         
-        # 创建页面
+        self.context = self.browser.new_context(**build_context_options(**context_options))
+        # HAR 路由先注册，资源屏蔽路由后注册、优先匹配
+        apply_har(self.context, har_flow)
+        apply_resource_blocking(self.context)
         self.page = self.context.new_page()
         
         return self.page
     
     def quit(self):
-        """关闭浏览器"""
+        """关闭上下文；若浏览器由本实例启动，则一并关闭浏览器"""
         if self.context:
             self.context.close()
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
+            self.context = None
+            self.page = None
+        if self._owns_browser:
+            if self.browser:
+                self.browser.close()
+            if self.playwright:
+                self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+        self._owns_browser = False
     
     def navigate_to(self, url):
         """导航到指定 URL"""
+        prewarmed_url, self._prewarmed_url = self._prewarmed_url, None
+        if prewarmed_url and prewarmed_url == url:
+            # 预热时已加载该页面，直接复用
+            return
         self.page.goto(url)
     
     def click(self, selector, timeout=None):
@@ -108,3 +186,94 @@ class PlaywrightHelper:
         """执行 JavaScript"""
         return self.page.evaluate(script)
 
+
+
+class ContextPrewarmer:
+    """
+    BrowserContext/Page 预热池
+    
+    在共享浏览器上预先创建 depth 个上下文和页面，交出一个后立即补充下一个。
+    Playwright 同步 API 绑定在单个线程上，因此预热不使用后台线程：
+    补充时只创建上下文并触发首次导航、不等待加载完成，页面加载在浏览器进程中与当前测试并行进行。
+    """
+    
+    def __init__(self, browser, depth=None, url=None, max_age=None, **context_options):
+        """
+        初始化预热池
+        
+        Args:
+            browser: 共享的 Playwright Browser
+            depth: 预热数量，0 表示不预热（每次按需创建），默认 settings.PREWARM_DEPTH
+            url: 预热时打开的URL，默认在 settings.PREWARM_NAVIGATE 开启时使用 settings.BASE_URL
+            max_age: 预热页面最长保留时间（秒），超时未使用则丢弃，默认 settings.PREWARM_MAX_AGE
+            **context_options: 额外的 new_context 参数
+        """
+        self.browser = browser
+        self.depth = settings.PREWARM_DEPTH if depth is None else depth
+        if url is None and settings.PREWARM_NAVIGATE:
+            url = settings.BASE_URL
+        self.url = url
+        self.max_age = settings.PREWARM_MAX_AGE if max_age is None else max_age
+        self.context_options = context_options
+        self._ready = deque()
+        self.stats = {"hits": 0, "misses": 0, "discarded": 0}
+    
+    def acquire(self):
+        """
+        取出一个就绪的上下文和页面，并补充预热池
+        
+        Returns:
+            (context, page, prewarmed_url)
+        """
+        entry = None
+        while self._ready:
+            created_at, context, page = self._ready.popleft()
+            if time.monotonic() - created_at > self.max_age or page.is_closed():
+                self._discard(context)
+                continue
+            entry = (context, page)
+            break
+        
+        if entry:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            _, context, page = self._warm()
+            entry = (context, page)
+        
+        self.fill()
+        
+        context, page = entry
+        if self.url:
+            # 等待预热导航加载完成（已完成时立即返回）
+            page.wait_for_url(lambda current: current != "about:blank", timeout=settings.TIMEOUT * 1000)
+        return context, page, self.url
+    
+    def fill(self):
+        """补充预热池至 depth 个"""
+        while len(self._ready) < self.depth:
+            self._ready.append(self._warm())
+    
+    def close(self):
+        """丢弃所有预热但未使用的上下文"""
+        while self._ready:
+            _, context, _ = self._ready.popleft()
+            self._discard(context)
+        logger.info(f"预热池已关闭: {self.stats}")
+    
+    def _warm(self):
+        """创建上下文和页面，并在不等待的情况下触发首次导航"""
+        context = self.browser.new_context(**build_context_options(**self.context_options))
+        apply_resource_blocking(context)
+        page = context.new_page()
+        if self.url:
+            page.evaluate("url => { window.location.href = url; }", self.url)
+        return time.monotonic(), context, page
+    
+    def _discard(self, context):
+        """关闭未使用的上下文"""
+        self.stats["discarded"] += 1
+        try:
+            context.close()
+        except Exception as e:
+            logger.debug(f"关闭预热上下文时出错: {e}")
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+网络资源屏蔽
+按 settings.RESOURCE_BLOCK_PROFILES 中的配置拦截图片、字体、第三方统计等与功能断言无关的请求：
+Playwright 通过 BrowserContext.route 按资源类型和 URL 模式拦截，
+Selenium（Chromium 系）通过 CDP Network.setBlockedURLs 按 URL 模式拦截
+"""
+
+import logging
+import weakref
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+
+import config.settings as settings
+
+logger = logging.getLogger(__name__)
+
+# CDP 只支持 URL 模式，资源类型按常见扩展名换算
+RESOURCE_TYPE_URL_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*"],
+}
+
+# 已应用屏蔽的上下文 -> ResourceBlocker，上下文被回收时自动移除
+_blockers = weakref.WeakKeyDictionary()
+
+
+def get_profile(name: Optional[str] = None) -> Dict[str, List[str]]:
+    """获取屏蔽配置，默认 settings.RESOURCE_BLOCK_PROFILE"""
+    name = (name or settings.RESOURCE_BLOCK_PROFILE).lower()
+    if name not in settings.RESOURCE_BLOCK_PROFILES:
+        raise ValueError(
+            f"不支持的资源屏蔽配置: {name}，可选: {', '.join(settings.RESOURCE_BLOCK_PROFILES)}"
+        )
+    return settings.RESOURCE_BLOCK_PROFILES[name]
+
+
+class ResourceBlocker:
+    """单个 BrowserContext 的资源屏蔽器 - 拦截匹配的请求并统计屏蔽数量和估算节省的流量"""
+
+    def __init__(self, profile: Optional[str] = None):
+        """
+        初始化资源屏蔽器
+
+        Args:
+            profile: 屏蔽配置名称，默认 settings.RESOURCE_BLOCK_PROFILE
+        """
+        self.profile = (profile or settings.RESOURCE_BLOCK_PROFILE).lower()
+        config = get_profile(self.profile)
+        self.resource_types = set(config.get("resource_types", []))
+        self.url_patterns = list(config.get("url_patterns", []))
+        self.stats = {"blocked": 0, "allowed": 0, "estimated_saved_bytes": 0, "by_type": {}}
+
+    @property
+    def enabled(self) -> bool:
+        """配置中是否有需要屏蔽的内容"""
+        return bool(self.resource_types or self.url_patterns)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """判断请求是否需要屏蔽"""
+        if resource_type in self.resource_types:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.url_patterns)
+
+    def attach(self, context):
+        """在上下文上注册路由（需在页面导航之前调用）"""
+        if self.enabled:
+            context.route("**/*", self._handle_route)
+        _blockers[context] = self
+        return self
+
+    async def async_attach(self, context):
+        """attach 的异步版本（playwright.async_api 的上下文）"""
+        if self.enabled:
+            await context.route("**/*", self._async_handle_route)
+        _blockers[context] = self
+        return self
+
+    def reset_stats(self):
+        """清空统计"""
+        self.stats = {"blocked": 0, "allowed": 0, "estimated_saved_bytes": 0, "by_type": {}}
+
+    def _handle_route(self, route):
+        """路由回调：匹配则中止请求，否则交给后续路由 / 正常发出"""
+        if self._check(route.request):
+            route.abort("blockedbyclient")
+        else:
+            route.fallback()
+
+    async def _async_handle_route(self, route):
+        """_handle_route 的异步版本"""
+        if self._check(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    def _check(self, request) -> bool:
+        """判断请求是否需要屏蔽并计入统计"""
+        if self.should_block(request.url, request.resource_type):
+            self._record_blocked(request.resource_type)
+            return True
+        self.stats["allowed"] += 1
+        return False
+
+    def _record_blocked(self, resource_type: str):
+        """记录一次屏蔽"""
+        estimated = settings.RESOURCE_BLOCK_ESTIMATED_BYTES
+        self.stats["blocked"] += 1
+        self.stats["estimated_saved_bytes"] += estimated.get(resource_type, estimated.get("other", 0))
+        self.stats["by_type"][resource_type] = self.stats["by_type"].get(resource_type, 0) + 1
+
+
+def apply_resource_blocking(context, profile: Optional[str] = None) -> ResourceBlocker:
+    """为 BrowserContext 应用资源屏蔽配置"""
+    return ResourceBlocker(profile).attach(context)
+
+
+async def async_apply_resource_blocking(context, profile: Optional[str] = None) -> ResourceBlocker:
+    """apply_resource_blocking 的异步版本"""
+    return await ResourceBlocker(profile).async_attach(context)
+
+
+def get_blocking_stats(context) -> Optional[Dict]:
+    """获取上下文的屏蔽统计；未应用屏蔽时返回 None"""
+    blocker = _blockers.get(context)
+    if blocker is None:
+        return None
+    return {"profile": blocker.profile, **blocker.stats}
+
+
+def cdp_blocked_urls(profile: Optional[str] = None) -> List[str]:
+    """将屏蔽配置换算为 CDP Network.setBlockedURLs 的 URL 模式列表"""
+    config = get_profile(profile)
+    patterns = list(config.get("url_patterns", []))
+    for resource_type in config.get("resource_types", []):
+        patterns.extend(RESOURCE_TYPE_URL_PATTERNS.get(resource_type, []))
+    return patterns
+
+
+def apply_selenium_blocking(driver, profile: Optional[str] = None) -> bool:
+    """
+    通过 CDP 为 Selenium 驱动应用资源屏蔽（仅 Chromium 系浏览器）
+
+    Returns:
+        是否已应用
+    """
+    patterns = cdp_blocked_urls(profile)
+    if not patterns or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.warning(f"CDP 资源屏蔽设置失败: {e}")
+        return False
+    logger.info(f"Selenium 已屏蔽 {len(patterns)} 个 URL 模式")
+    return True
@@ -4,6 +4,7 @@
 提供通用的重试机制，用于处理偶发性失败
 """
 
+import asyncio
 import time
 import logging
 from functools import wraps
@@ -29,6 +30,8 @@ def retry_on_failure(
         exceptions: 需要重试的异常类型元组
         on_retry: 重试时的回调函数，接收 (attempt, exception) 参数
     
+    被装饰的是协程函数时，返回的也是协程函数，重试间隔使用 asyncio.sleep
+    
     Returns:
         装饰后的函数
     
@@ -39,42 +42,52 @@ def retry_on_failure(
             pass
     """
     def decorator(func: Callable) -> Callable:
+        def handle_failure(attempt: int, e: Exception, current_delay: float):
+            """记录失败并调用重试回调，最后一次尝试失败时重新抛出"""
+            if attempt == max_attempts:
+                logger.error(
+                    f"函数 {func.__name__} 在 {max_attempts} 次尝试后仍然失败: {str(e)}"
+                )
+                raise e
+            
+            logger.warning(
+                f"函数 {func.__name__} 第 {attempt} 次尝试失败: {str(e)}. "
+                f"将在 {current_delay:.1f} 秒后重试..."
+            )
+            
+            # 调用重试回调
+            if on_retry:
+                try:
+                    on_retry(attempt, e)
+                except Exception as callback_error:
+                    logger.error(f"重试回调执行失败: {callback_error}")
+        
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                current_delay = delay
+                for attempt in range(1, max_attempts + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        handle_failure(attempt, e, current_delay)
+                    # 等待后重试
+                    await asyncio.sleep(current_delay)
+                    current_delay *= backoff
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             current_delay = delay
-            last_exception = None
-            
             for attempt in range(1, max_attempts + 1):
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_attempts:
-                        logger.error(
-                            f"函数 {func.__name__} 在 {max_attempts} 次尝试后仍然失败: {str(e)}"
-                        )
-                        raise
-                    
-                    logger.warning(
-                        f"函数 {func.__name__} 第 {attempt} 次尝试失败: {str(e)}. "
-                        f"将在 {current_delay:.1f} 秒后重试..."
-                    )
-                    
-                    # 调用重试回调
-                    if on_retry:
-                        try:
-                            on_retry(attempt, e)
-                        except Exception as callback_error:
-                            logger.error(f"重试回调执行失败: {callback_error}")
-                    
-                    # 等待后重试
-                    time.sleep(current_delay)
-                    current_delay *= backoff
-            
-            # 理论上不会到达这里，但为了类型安全
-            if last_exception:
-                raise last_exception
+                    handle_failure(attempt, e, current_delay)
+                # 等待后重试
+                time.sleep(current_delay)
+                current_delay *= backoff
         
         return wrapper
     return decorator
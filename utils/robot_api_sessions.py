@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Robot Framework API 会话库
+按 (base_url, 请求头) 缓存连接池会话，同一 suite 内的关键字和用例复用同一个 keep-alive 连接池，
+suite 结束时自动关闭（库同时作为自己的监听器），也可在 Suite Teardown 中显式调用 Close API Sessions。
+
+使用方式：
+    Library    ../../utils/robot_api_sessions.py    pool_maxsize=20
+    ${resp}=    Send API Request    GET    ${base_url}    /users    params=${params}
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from robot.api import logger
+from robot.api.deco import keyword
+
+from utils.http_client import create_session
+
+
+class RobotAPISessions:
+    """连接池会话缓存关键字库"""
+
+    ROBOT_LIBRARY_SCOPE = "SUITE"
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, timeout=None):
+        """
+        Args:
+            pool_connections: 缓存连接池的主机数，默认 settings.API_POOL_CONNECTIONS
+            pool_maxsize: 每个主机保持的最大连接数，默认 settings.API_POOL_MAXSIZE
+            timeout: 默认超时（秒），默认 settings.API_TIMEOUT
+        """
+        self.ROBOT_LIBRARY_LISTENER = self
+        self.pool_connections = int(pool_connections) if pool_connections else None
+        self.pool_maxsize = int(pool_maxsize) if pool_maxsize else None
+        self.timeout = float(timeout) if timeout else None
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _session_key(base_url: str, headers: Optional[Dict[str, str]]) -> tuple:
+        return base_url.rstrip("/"), tuple(sorted((str(name), str(value)) for name, value in (headers or {}).items()))
+
+    @keyword("Get API Session")
+    def get_api_session(self, base_url, headers=None, auth_token=None):
+        """返回 base_url + 请求头对应的缓存会话，不存在时创建；auth_token 作为 Bearer Authorization 请求头"""
+        headers = dict(headers or {})
+        if auth_token:
+            headers["Authorization"] = f"Bearer {auth_token}"
+        key = self._session_key(base_url, headers)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = create_session(
+                    base_url=key[0], headers=headers, pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize, timeout=self.timeout)
+                logger.info(f"创建 API 会话: {key[0]}（缓存 {len(self._sessions)} 个）")
+        return session
+
+    @keyword("Send API Request")
+    def send_api_request(self, method, base_url, endpoint, params=None, json=None, headers=None,
+                         auth_token=None, expected_status=200, retries=1, delay=1):
+        """
+        通过缓存会话发送请求，状态码不符时重试，返回响应对象
+
+        Args:
+            retries: 最多请求次数
+            delay: 两次请求之间的等待秒数
+
+        Raises:
+            AssertionError: 全部请求的状态码都不等于 expected_status
+        """
+        session = self.get_api_session(base_url, headers, auth_token)
+        expected_status = int(expected_status)
+        attempts = max(1, int(retries))
+        for attempt in range(1, attempts + 1):
+            response = session.request(method.upper(), endpoint, params=params, json=json)
+            logger.info(f"Request URL: {response.url}")
+            logger.info(f"Response status: {response.status_code}")
+            if response.status_code == expected_status:
+                return response
+            if attempt < attempts:
+                time.sleep(float(delay))
+        raise AssertionError(f"Expected status {expected_status} but got {response.status_code}")
+
+    @keyword("Close API Sessions")
+    def close_api_sessions(self):
+        """关闭全部缓存会话"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+        if sessions:
+            logger.info(f"关闭 {len(sessions)} 个 API 会话")
+
+    def _end_suite(self, name, attributes):
+        self.close_api_sessions()
+
+    def _close(self):
+        self.close_api_sessions()
+
+
+# 按路径导入时 Robot 使用与模块同名的类
+robot_api_sessions = RobotAPISessions
@@ -4,7 +4,7 @@ Robot Framework 自定义库（示例）
 提供一些高层关键字，内部调用现有的 Playwright / Selenium helper
 """
 from robot.api.deco import keyword
-from playwright.sync_api import sync_playwright
+from utils.shared_playwright import get_shared_playwright
 import os
 from pathlib import Path
 from robot.api import logger
@@ -15,9 +15,10 @@ class RobotCustomLibrary:
     """简单的 Robot 自定义库，使用 Playwright 同步 API 实现常用关键字。"""
 
     def __init__(self):
-        self._play = None
+        self._context = None
         self._browser = None
         self._page = None
+        self._browser_key = None
 
     @keyword("Open Playwright Browser")
     def open_playwright_browser(self, headless=True, browser_name='chromium'):
@@ -25,16 +26,17 @@ class RobotCustomLibrary:
         headless: True/False
         browser_name: chromium/firefox/webkit
         返回：无
+        浏览器由进程级共享管理器提供，这里只创建独立的上下文和页面
         """
-        if self._play is None:
-            self._play = sync_playwright().start()
-        if browser_name.lower() == 'chromium':
-            self._browser = self._play.chromium.launch(headless=headless)
-        elif browser_name.lower() == 'firefox':
-            self._browser = self._play.firefox.launch(headless=headless)
-        else:
-            self._browser = self._play.webkit.launch(headless=headless)
-        self._page = self._browser.new_page()
+        if self._context is not None:
+            self.close_playwright_browser()
+        browser_name = browser_name.lower()
+        if browser_name not in ('chromium', 'firefox'):
+            browser_name = 'webkit'
+        self._context = get_shared_playwright().new_context(browser_name, headless=headless)
+        self._browser_key = (browser_name, headless)
+        self._browser = self._context.browser
+        self._page = self._context.new_page()
 
     @keyword("Go To")
     def go_to(self, url):
@@ -100,18 +102,15 @@ class RobotCustomLibrary:
 
     @keyword("Close Playwright Browser")
     def close_playwright_browser(self):
-        """关闭页面和浏览器"""
+        """关闭页面和上下文，并归还共享浏览器"""
         try:
-            if self._page:
-                self._page.close()
-            if self._browser:
-                self._browser.close()
-            if self._play:
-                self._play.stop()
+            if self._context:
+                get_shared_playwright().close_context(self._context, *self._browser_key)
         finally:
-            self._play = None
+            self._context = None
             self._browser = None
             self._page = None
+            self._browser_key = None
 
     @keyword("Get API Token From Env")
     def get_api_token(self, var_name='API_TOKEN'):
@@ -5,6 +5,8 @@
 - 便于维护与修改定位器
 """
 from robot.api.deco import keyword
+from utils.locator_registry import compile_locators
+
 
 class Locators:
     """UI 定位器管理类"""
@@ -22,19 +24,26 @@ class Locators:
     PYTHON_ORG_SEARCH = "css=form input[name='q']"
     PYTHON_ORG_SEARCH_BTN = "css=form button"
     
+    # 元素名称 -> 定位器属性名
+    _ELEMENT_NAMES = {
+        "search_input": "SEARCH_INPUT",
+        "search_button": "SEARCH_BUTTON",
+        "search_results": "SEARCH_RESULTS",
+        "page_title": "PAGE_TITLE",
+        "page_body": "PAGE_BODY",
+        "python_search": "PYTHON_ORG_SEARCH",
+        "python_search_btn": "PYTHON_ORG_SEARCH_BTN",
+    }
+    
     @keyword("Get Locator")
     def get_locator(self, element_name: str) -> str:
         """返回指定元素的定位器"""
-        locators_map = {
-            "search_input": self.SEARCH_INPUT,
-            "search_button": self.SEARCH_BUTTON,
-            "search_results": self.SEARCH_RESULTS,
-            "page_title": self.PAGE_TITLE,
-            "page_body": self.PAGE_BODY,
-            "python_search": self.PYTHON_ORG_SEARCH,
-            "python_search_btn": self.PYTHON_ORG_SEARCH_BTN,
-        }
-        locator = locators_map.get(element_name.lower())
+        locator = self._LOCATOR_MAP.get(element_name.lower())
         if not locator:
             raise KeyError(f"Locator not found: {element_name}")
         return locator
+
+
+# 加载时解析并校验全部定位器，名称映射只构建一次
+Locators._compiled = compile_locators(Locators)
+Locators._LOCATOR_MAP = {name: getattr(Locators, attr) for name, attr in Locators._ELEMENT_NAMES.items()}
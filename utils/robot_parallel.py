@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Robot Framework 多进程并行执行
+- 把目标路径下的用例按 suite 文件（或单个用例）拆成执行单元
+- 按历史耗时从长到短派发给 N 个 worker：每个 worker 一次执行一个单元，完成后领取下一个，
+  每个单元是独立的 robot 进程（独立浏览器），输出写到各自 worker 的目录
+- 全部完成后用 rebot 合并为一份 output.xml / log.html / report.html
+
+按用例拆分时同一 suite 的 Suite Setup/Teardown 会在每个用例的进程中各执行一次；
+单独执行 suite 文件时不会执行所在目录的 __init__.robot。
+"""
+
+import logging
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import config.settings as settings
+from utils.duration_store import DurationStore, estimate_all, lpt_order, lpt_plan
+
+logger = logging.getLogger(__name__)
+
+SPLIT_LEVELS = ("suite", "test")
+
+# robot 退出码 >= 252 表示参数错误、中断等，没有可合并的结果
+ROBOT_ERROR_RC = 252
+
+
+@dataclass(frozen=True)
+class RobotUnit:
+    """执行单元：一个 suite 文件，或 suite 文件中的一个用例"""
+
+    source: str
+    test: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """耗时历史键"""
+        return self.source if self.test is None else f"{self.source}::{self.test}"
+
+
+@dataclass
+class UnitResult:
+    """执行单元结果"""
+
+    unit: RobotUnit
+    output: Path
+    returncode: int
+    seconds: float
+
+
+def _relative(path) -> str:
+    """相对当前目录的路径（耗时历史键在不同机器上保持一致）"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(Path.cwd()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def discover_units(target: str, split_level: str = "suite", include: Optional[str] = None,
+                   exclude: Optional[str] = None) -> List[RobotUnit]:
+    """
+    解析目标路径，按标签过滤后拆分为执行单元（保持用例定义顺序）
+
+    Raises:
+        ValueError: 拆分粒度无效
+    """
+    if split_level not in SPLIT_LEVELS:
+        raise ValueError(f"不支持的拆分粒度: {split_level}，可选: {', '.join(SPLIT_LEVELS)}")
+    from robot.api import TestSuiteBuilder
+
+    suite = TestSuiteBuilder().build(target)
+    suite.filter(included_tags=[include] if include else None,
+                 excluded_tags=[exclude] if exclude else None)
+    units: List[RobotUnit] = []
+    pending = [suite]
+    while pending:
+        current = pending.pop(0)
+        pending[:0] = list(current.suites)
+        if not current.tests:
+            continue
+        source = _relative(current.source)
+        if split_level == "suite":
+            units.append(RobotUnit(source))
+        else:
+            units.extend(RobotUnit(source, test.name) for test in current.tests)
+    return units
+
+
+def escape_pattern(name: str) -> str:
+    """转义 --test 模式中的通配符，按用例名精确匹配"""
+    return "".join(f"[{char}]" if char in "*?[" else char for char in name)
+
+
+def unit_command(base_cmd: Sequence[str], unit: RobotUnit, worker_dir: Path, output_name: str,
+                 worker_index: int) -> List[str]:
+    """
+    构建执行单元的 robot 命令
+
+    Args:
+        base_cmd: 不含 --outputdir 和目标路径的 robot 命令
+        unit: 执行单元
+        worker_dir: worker 输出目录
+        output_name: output.xml 文件名
+        worker_index: worker 编号，以 ${WORKER_ID} 变量传给用例
+    """
+    cmd = list(base_cmd) + [
+        "--outputdir", str(worker_dir),
+        "--output", output_name,
+        "--log", "NONE",
+        "--report", "NONE",
+        "--variable", f"WORKER_ID:{worker_index}",
+    ]
+    if unit.test is not None:
+        cmd += ["--test", escape_pattern(unit.test)]
+    cmd.append(unit.source)
+    return cmd
+
+
+def merge_groups(units: Sequence[RobotUnit], results: Dict[RobotUnit, UnitResult]) -> List[List[Path]]:
+    """
+    按 suite 文件分组待合并的输出（按用例拆分时同一文件的多个输出需先 --merge 成一个 suite）
+
+    Returns:
+        按发现顺序排列的分组，每组为同一 suite 文件的 output.xml 列表
+    """
+    groups: Dict[str, List[Path]] = {}
+    for unit in units:
+        result = results.get(unit)
+        if result is not None and result.output.exists():
+            groups.setdefault(unit.source, []).append(result.output)
+    return list(groups.values())
+
+
+def suite_name(target: str) -> str:
+    """合并后顶层 suite 名，与 robot 由目录名生成的名称一致"""
+    name = Path(target).stem.replace("_", " ").strip()
+    return name.title() if name.islower() else name
+
+
+class RobotParallelRunner:
+    """按耗时派发执行单元到多个 worker 进程，完成后合并结果"""
+
+    def __init__(self, base_cmd: Sequence[str], output_dir: str, processes: int,
+                 store: Optional[DurationStore] = None):
+        """
+        初始化并行执行器
+
+        Args:
+            base_cmd: 不含 --outputdir 和目标路径的 robot 命令（python -m robot 及全部选项）
+            output_dir: 合并报告目录，各 worker 输出位于其下的 workers/worker_<编号>
+            processes: worker 进程数
+            store: 执行单元耗时历史，默认 settings.ROBOT_DURATION_STORE
+        """
+        self.base_cmd = list(base_cmd)
+        self.output_dir = Path(output_dir)
+        self.processes = max(1, processes)
+        self.store = store or DurationStore(settings.ROBOT_DURATION_STORE)
+        self._lock = threading.Lock()
+
+    def run(self, units: Sequence[RobotUnit], name: Optional[str] = None) -> int:
+        """
+        并行执行并合并报告
+
+        Returns:
+            退出码（与 robot 一致：失败用例数，>= 252 表示执行错误）
+        """
+        if not units:
+            print("✗ 没有匹配的 Robot 用例")
+            return ROBOT_ERROR_RC
+        costs = estimate_all(self.store, [unit.key for unit in units])
+        by_key = {unit.key: unit for unit in units}
+        queue = [by_key[key] for key in lpt_order(costs)]
+        workers = min(self.processes, len(queue))
+        _, makespan = lpt_plan(costs, workers)
+        print(f"并行执行 {len(queue)} 个单元，{workers} 个进程，"
+              f"串行总耗时约 {sum(costs.values()):.1f}s，预计 {makespan:.1f}s")
+
+        results: Dict[RobotUnit, UnitResult] = {}
+        threads = [
+            threading.Thread(target=self._worker, args=(index, queue, results), daemon=True)
+            for index in range(1, workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.store.flush()
+
+        # 未执行（worker 异常退出）或未生成输出文件的单元都视为执行错误
+        missing = [unit.key for unit in units if unit not in results or not results[unit].output.exists()]
+        for key in missing:
+            print(f"✗ {key} 未生成输出文件")
+        rc = self.merge(merge_groups(units, results), name)
+        return max(rc, ROBOT_ERROR_RC) if missing else rc
+
+    def _worker(self, index: int, queue: List[RobotUnit], results: Dict[RobotUnit, UnitResult]):
+        """worker 线程：依次领取队首（剩余最长）的单元，在独立进程中执行；单元启动失败记为执行错误"""
+        worker_dir = self.output_dir / "workers" / f"worker_{index}"
+        count = 0
+        while True:
+            with self._lock:
+                if not queue:
+                    return
+                unit = queue.pop(0)
+            count += 1
+            output = worker_dir / f"output_{count:03d}.xml"
+            started = time.monotonic()
+            try:
+                worker_dir.mkdir(parents=True, exist_ok=True)
+                completed = subprocess.run(unit_command(self.base_cmd, unit, worker_dir, output.name, index),
+                                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                           text=True, errors="replace")
+            except Exception as e:
+                with self._lock:
+                    results[unit] = UnitResult(unit, output, ROBOT_ERROR_RC, time.monotonic() - started)
+                    print(f"[worker {index}] ✗ {unit.key} 执行失败: {e}")
+                continue
+            seconds = time.monotonic() - started
+            result = UnitResult(unit, output, completed.returncode, seconds)
+            with self._lock:
+                results[unit] = result
+                status = "✓" if completed.returncode == 0 else "✗"
+                print(f"[worker {index}] {status} {unit.key} ({seconds:.1f}s)")
+                if completed.returncode >= ROBOT_ERROR_RC:
+                    print(completed.stdout)
+            if completed.returncode < ROBOT_ERROR_RC:
+                self.store.record(unit.key, seconds)
+
+    def merge(self, groups: List[List[Path]], name: Optional[str] = None) -> int:
+        """用 rebot 合并各 worker 的 output.xml，生成统一的 log.html / report.html"""
+        if not groups:
+            return ROBOT_ERROR_RC
+        merged_dir = self.output_dir / "workers" / "merged"
+        outputs = []
+        for index, group in enumerate(groups, 1):
+            if len(group) == 1:
+                outputs.append(group[0])
+                continue
+            merged = merged_dir / f"suite_{index:03d}.xml"
+            rebot(["--merge", "--outputdir", str(merged_dir), "--output", merged.name,
+                   "--log", "NONE", "--report", "NONE", *map(str, group)])
+            outputs.append(merged)
+        options = ["--outputdir", str(self.output_dir), "--output", "output.xml",
+                   "--log", "log.html", "--report", "report.html"]
+        if name:
+            options += ["--name", name]
+        return rebot(options + [str(output) for output in outputs])
+
+
+def rebot(arguments: List[str]) -> int:
+    """执行 rebot，返回退出码"""
+    return subprocess.run([sys.executable, "-m", "robot.rebot", *arguments]).returncode
+
+
+def run_parallel(base_cmd: Sequence[str], target: str, output_dir: str, processes: int,
+                 split_level: str = "suite", include: Optional[str] = None,
+                 exclude: Optional[str] = None) -> int:
+    """
+    并行执行目标路径下的 Robot 用例
+
+    Args:
+        base_cmd: 不含 --outputdir 和目标路径的 robot 命令
+        target: suite 文件或目录
+        output_dir: 合并报告目录
+        processes: worker 进程数
+        split_level: 拆分粒度，suite（按 suite 文件）或 test（按用例）
+        include: 包含的标签表达式（与 robot --include 一致）
+        exclude: 排除的标签表达式
+
+    Returns:
+        退出码
+    """
+    units = discover_units(target, split_level, include, exclude)
+    return RobotParallelRunner(base_cmd, output_dir, processes).run(units, name=suite_name(target))
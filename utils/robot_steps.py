@@ -7,6 +7,7 @@
 from robot.api.deco import keyword
 from robot.api import logger
 from utils.playwright_helper import PlaywrightHelper
+from utils.shared_playwright import get_shared_playwright
 from utils.robot_locators import Locators
 
 class StepsLibrary:
@@ -15,12 +16,18 @@ class StepsLibrary:
     def __init__(self):
         self.helper = None
         self.locators = Locators()
+        self._browser_key = None
 
     @keyword("Initialize Browser")
     def init_browser(self, browser_type="chromium", headless=True):
-        """初始化浏览器"""
+        """初始化浏览器（共享进程级浏览器，为当前套件创建独立上下文）"""
+        if self.helper:
+            self.close_browser()
         self.helper = PlaywrightHelper(browser=browser_type, headless=headless)
-        self.helper.start_browser()
+        shared = get_shared_playwright()
+        browser = shared.acquire_browser(self.helper.browser_type, self.helper.headless)
+        self._browser_key = (self.helper.browser_type, self.helper.headless)
+        self.helper.attach_to_browser(browser)
         logger.info(f"Browser initialized: {browser_type}")
 
     @keyword("Navigate To")
@@ -84,6 +91,10 @@ class StepsLibrary:
     def close_browser(self):
         """关闭浏览器"""
         if self.helper:
-            self.helper.quit()
-            self.helper = None
+            try:
+                self.helper.quit()
+            finally:
+                get_shared_playwright().release_browser(*self._browser_key)
+                self.helper = None
+                self._browser_key = None
             logger.info("Browser closed")
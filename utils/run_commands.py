@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+入口脚本共用的测试命令（run.py / run_tests.py 的交互式菜单和全部运行）
+"""
+
+import sys
+from typing import List, Optional
+
+LEGACY_ROBOT_CMD = [sys.executable, "-m", "robot", "--outputdir", "tmp", "tests/robotframework/"]
+
+
+def build_pytest_cmd(target: str, html: str, marker: Optional[str] = None,
+                     log_file: Optional[str] = None) -> List[str]:
+    """
+    构建 pytest 命令
+
+    Args:
+        target: 测试路径
+        html: HTML 报告路径
+        marker: -m 标记表达式
+        log_file: 覆盖 pytest.ini 的 log_file（并发执行的多个 pytest 进程需各自写日志）
+    """
+    cmd = [sys.executable, "-m", "pytest", target]
+    if marker:
+        cmd += ["-m", marker]
+    if log_file:
+        cmd += ["-o", f"log_file={log_file}"]
+    cmd += ["-v", f"--html={html}", "--self-contained-html"]
+    return cmd
+
+
+def build_run_all_stages() -> list:
+    """全部运行的各阶段及其资源需求（API 阶段不占浏览器，可与 UI 阶段并发）"""
+    from utils.pipeline_orchestrator import Stage
+
+    return [
+        Stage("pytest Selenium", build_pytest_cmd("tests/test_UI", "tmp/pytest_selenium.html", marker="selenium",
+                                                  log_file="logs/pytest_selenium.log"),
+              cpu=1, memory_mb=1024, browsers=1),
+        Stage("pytest Playwright", build_pytest_cmd("tests/test_UI", "tmp/pytest_playwright.html", marker="playwright",
+                                                    log_file="logs/pytest_playwright.log"),
+              cpu=1, memory_mb=1024, browsers=1),
+        Stage("pytest API", build_pytest_cmd("tests/test_API", "tmp/pytest_api.html", marker="api",
+                                             log_file="logs/pytest_api.log"),
+              cpu=0.5, memory_mb=256),
+        Stage("Robot Framework", LEGACY_ROBOT_CMD, cpu=1, memory_mb=1024, browsers=1),
+    ]
@@ -11,19 +11,69 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from functools import lru_cache
 from pathlib import Path
 import config.settings as settings
+from utils.driver_cache import resolve_driver_path
+from utils.resource_blocking import apply_selenium_blocking
+from utils.form_fill import selenium_batch_fill, selenium_query
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 按 DOM 查询批量查找元素；read_text 为 true 时返回 innerText
+_BATCH_LOOKUP_JS = """
+const find = (query) => query.type === 'xpath'
+    ? document.evaluate(query.value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(query.value);
+const readText = arguments[1];
+return arguments[0].map(query => {
+    const el = find(query);
+    if (!el) return null;
+    return readText ? el.innerText : el;
+});
+"""
+
+_ALL_TEXTS_JS = """
+const query = arguments[0];
+if (query.type === 'xpath') {
+    const result = document.evaluate(query.value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({ length: result.snapshotLength }, (_, i) => result.snapshotItem(i).innerText);
+}
+return Array.from(document.querySelectorAll(query.value), el => el.innerText);
+"""
+
+
+@lru_cache(maxsize=None)
+def _locator_tuple(locator_type, locator_value):
+    """解析并缓存 (By, value) 定位元组"""
+    by = SeleniumHelper.BY_MAP.get(locator_type.lower())
+    if not by:
+        raise ValueError(f"不支持的定位类型: {locator_type}")
+    return by, locator_value
+
+
+@lru_cache(maxsize=None)
+def _dom_query(locator_type, locator_value):
+    """Selenium 定位换算为页面脚本的 DOM 查询，link_text 等返回 None"""
+    return selenium_query(locator_type, locator_value)
+
 
 class SeleniumHelper:
     """Selenium 辅助类"""
     
+    # 定位类型 -> By，类级别只构建一次
+    BY_MAP = {
+        "id": By.ID,
+        "name": By.NAME,
+        "class": By.CLASS_NAME,
+        "xpath": By.XPATH,
+        "css": By.CSS_SELECTOR,
+        "link_text": By.LINK_TEXT,
+        "partial_link_text": By.PARTIAL_LINK_TEXT,
+        "tag": By.TAG_NAME
+    }
+    
     def __init__(self, browser=None, headless=None, screenshot_on_failure=True):
         """
         初始化浏览器驱动
@@ -38,6 +88,7 @@ class SeleniumHelper:
         self.screenshot_on_failure = screenshot_on_failure
         self.driver = None
         self.wait = None
+        self._waits = {}
         
     def start_browser(self):
         """启动浏览器，优先支持 Docker/远程模式"""
@@ -64,7 +115,7 @@ class SeleniumHelper:
                     options=options,
                 )
             else:
-                service = Service(ChromeDriverManager().install())
+                service = Service(resolve_driver_path("chrome"))
                 self.driver = webdriver.Chrome(service=service, options=options)
 
         elif self.browser == "firefox":
@@ -77,7 +128,7 @@ class SeleniumHelper:
                     options=options,
                 )
             else:
-                service = Service(GeckoDriverManager().install())
+                service = Service(resolve_driver_path("firefox"))
                 self.driver = webdriver.Firefox(service=service, options=options)
 
         elif self.browser == "edge":
@@ -90,7 +141,7 @@ class SeleniumHelper:
                     options=options,
                 )
             else:
-                service = Service(EdgeChromiumDriverManager().install())
+                service = Service(resolve_driver_path("edge"))
                 self.driver = webdriver.Edge(service=service, options=options)
         else:
             raise ValueError(f"不支持的浏览器类型: {self.browser}")
@@ -99,8 +150,12 @@ class SeleniumHelper:
         window_size = settings.BROWSER_OPTIONS[self.browser]["window_size"]
         self.driver.set_window_size(*window_size)
 
-        # 初始化等待对象
-        self.wait = WebDriverWait(self.driver, settings.TIMEOUT)
+        # 按配置屏蔽图片、字体、第三方统计等请求（CDP，仅 Chromium 系本地驱动）
+        apply_selenium_blocking(self.driver)
+
+        # 初始化等待对象（按超时时间共享）
+        self._waits = {}
+        self.wait = self._wait(settings.TIMEOUT)
 
         return self.driver
     
@@ -109,6 +164,8 @@ class SeleniumHelper:
         if self.driver:
             self.driver.quit()
             self.driver = None
+            self.wait = None
+            self._waits = {}
     
     def navigate_to(self, url):
         """导航到指定 URL"""
@@ -123,22 +180,8 @@ class SeleniumHelper:
             locator_value: 定位值
             timeout: 超时时间（秒）
         """
-        wait = WebDriverWait(self.driver, timeout or settings.TIMEOUT)
-        by_map = {
-            "id": By.ID,
-            "name": By.NAME,
-            "class": By.CLASS_NAME,
-            "xpath": By.XPATH,
-            "css": By.CSS_SELECTOR,
-            "link_text": By.LINK_TEXT,
-            "partial_link_text": By.PARTIAL_LINK_TEXT,
-            "tag": By.TAG_NAME
-        }
-        by = by_map.get(locator_type.lower())
-        if not by:
-            raise ValueError(f"不支持的定位类型: {locator_type}")
-        
-        return wait.until(EC.presence_of_element_located((by, locator_value)))
+        locator = self._locator(locator_type, locator_value)
+        return self._wait(timeout).until(EC.presence_of_element_located(locator))
     
     def click(self, locator_type, locator_value, timeout=None):
         """点击元素"""
@@ -151,6 +194,22 @@ class SeleniumHelper:
         element.clear()
         element.send_keys(text)
     
+    def fill_form(self, form_data, per_field=(), timeout=None):
+        """
+        批量填写表单：一次 execute_script 设置所有字段并派发 input/change 事件
+        
+        Args:
+            form_data: {(定位类型, 定位值): 文本}
+            per_field: 有自定义输入处理、需要逐字段 send_keys 的 (定位类型, 定位值)
+            timeout: 逐字段输入时查找元素的超时时间（秒）
+        """
+        values = {key: str(text) for key, text in form_data.items()}
+        pending = list(values)
+        if settings.FORM_BATCH_FILL:
+            pending = selenium_batch_fill(self.driver, values, per_field)
+        for locator_type, locator_value in pending:
+            self.input_text(locator_type, locator_value, values[(locator_type, locator_value)], timeout)
+    
     def get_text(self, locator_type, locator_value, timeout=None):
         """获取元素文本"""
         element = self.find_element(locator_type, locator_value, timeout)
@@ -158,19 +217,53 @@ class SeleniumHelper:
     
     def wait_for_element_visible(self, locator_type, locator_value, timeout=None):
         """等待元素可见"""
-        wait = WebDriverWait(self.driver, timeout or settings.TIMEOUT)
-        by_map = {
-            "id": By.ID,
-            "name": By.NAME,
-            "class": By.CLASS_NAME,
-            "xpath": By.XPATH,
-            "css": By.CSS_SELECTOR,
-            "link_text": By.LINK_TEXT,
-            "partial_link_text": By.PARTIAL_LINK_TEXT,
-            "tag": By.TAG_NAME
-        }
-        by = by_map.get(locator_type.lower())
-        wait.until(EC.visibility_of_element_located((by, locator_value)))
+        locator = self._locator(locator_type, locator_value)
+        self._wait(timeout).until(EC.visibility_of_element_located(locator))
+    
+    def find_elements_batch(self, locators):
+        """
+        一次 execute_script 查找多个元素
+        
+        Args:
+            locators: [(定位类型, 定位值), ...]
+        
+        Returns:
+            与 locators 一一对应的 WebElement，未找到为 None；
+            link_text 等无法在页面脚本中查询的定位逐个查找
+        """
+        queries = [_dom_query(locator_type, locator_value) for locator_type, locator_value in locators]
+        batch = [query for query in queries if query]
+        found = iter(self.driver.execute_script(_BATCH_LOOKUP_JS, batch, False) if batch else [])
+        elements = []
+        for (locator_type, locator_value), query in zip(locators, queries):
+            if query:
+                elements.append(next(found))
+            else:
+                matches = self.driver.find_elements(*self._locator(locator_type, locator_value))
+                elements.append(matches[0] if matches else None)
+        return elements
+    
+    def get_texts(self, locators):
+        """
+        一次 execute_script 读取多个元素的可见文本（与 WebElement.text 一致取 innerText）
+        
+        Args:
+            locators: [(定位类型, 定位值), ...]
+        
+        Returns:
+            与 locators 一一对应的文本，未找到为 None
+        """
+        queries = [_dom_query(locator_type, locator_value) for locator_type, locator_value in locators]
+        if all(queries):
+            return self.driver.execute_script(_BATCH_LOOKUP_JS, queries, True)
+        return [element.text if element else None for element in self.find_elements_batch(locators)]
+    
+    def get_all_texts(self, locator_type, locator_value):
+        """一次 execute_script 读取所有匹配元素的可见文本"""
+        query = _dom_query(locator_type, locator_value)
+        if not query:
+            return [element.text for element in self.driver.find_elements(*self._locator(locator_type, locator_value))]
+        return self.driver.execute_script(_ALL_TEXTS_JS, query)
     
     def get_title(self):
         """获取页面标题"""
@@ -185,3 +278,15 @@ class SeleniumHelper:
         filepath = settings.REPORTS_DIR / filename
         self.driver.save_screenshot(str(filepath))
         return filepath
+    
+    def _locator(self, locator_type, locator_value):
+        """(By, value) 定位元组"""
+        return _locator_tuple(locator_type, locator_value)
+    
+    def _wait(self, timeout=None):
+        """按超时时间复用 WebDriverWait"""
+        timeout = timeout or settings.TIMEOUT
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = self._waits[timeout] = WebDriverWait(self.driver, timeout)
+        return wait
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+跨节点分片执行
+把 pytest nodeid 和 Robot 执行单元按历史耗时划分为 N 个预计耗时接近的分片（run.py --shard i/N），
+每个分片输出独立的机器可读结果（pytest JUnit XML、Robot output.xml、shard.json），
+run.py --merge-shards 把各分片结果合并为一份报告。
+
+划分是确定的：只取决于测试集合和耗时（按 0.1 秒取整），与收集顺序无关；
+划分结果连同构建标识（settings.SHARD_BUILD_ID）保存在 shards/plan.json，同一构建内测试集合不变时直接复用，
+重跑的分片即使耗时历史已被更新也落在同一分片；新的构建按最新耗时历史重新划分。
+每个分片开始时清空自己的结果目录，合并时只接受本构建写出的 shard.json，崩溃的分片按缺失处理。
+同一工作区并行启动 N 个分片进程即可在本地验证。
+"""
+
+import hashlib
+import heapq
+import json
+import re
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config.settings as settings
+from utils.driver_cache import file_lock
+from utils.duration_store import DurationStore
+from utils.robot_parallel import RobotParallelRunner, RobotUnit, rebot
+
+_SHARD_SPEC = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+PYTEST_PREFIX = "pytest:"
+ROBOT_PREFIX = "robot:"
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    解析分片参数 i/N（i 从 1 开始）
+
+    Raises:
+        ValueError: 格式错误或 i 不在 1..N 内
+    """
+    match = _SHARD_SPEC.match(spec or "")
+    if not match:
+        raise ValueError(f"分片参数格式应为 i/N: {spec}")
+    index, total = int(match.group(1)), int(match.group(2))
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"分片序号需在 1..{total} 内: {spec}")
+    return index, total
+
+
+@dataclass
+class ShardPlan:
+    """分片划分"""
+
+    total: int
+    shards: List[List[str]]
+    loads: List[float]
+    build: str = ""
+
+    @property
+    def fingerprint(self) -> str:
+        """划分指纹，合并时校验各分片使用同一划分"""
+        return hashlib.sha1(json.dumps(self.shards, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "build": self.build, "fingerprint": self.fingerprint, "loads": self.loads,
+                "shards": self.shards}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShardPlan":
+        return cls(total=data["total"], shards=data["shards"], loads=data["loads"], build=data.get("build", ""))
+
+
+def plan_shards(costs: Dict[str, float], total: int) -> ShardPlan:
+    """
+    确定性的最长处理时间优先划分：按 (耗时降序, 键) 排序，依次分给当前负载最小（相同取序号最小）的分片
+
+    Args:
+        costs: 测试键 -> 估算耗时（秒）
+        total: 分片数
+    """
+    total = max(1, total)
+    rounded = {key: round(cost, 1) for key, cost in costs.items()}
+    shards: List[List[str]] = [[] for _ in range(total)]
+    loads = [(0.0, index) for index in range(total)]
+    for key in sorted(rounded, key=lambda key: (-rounded[key], key)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(key)
+        heapq.heappush(loads, (round(load + rounded[key], 1), index))
+    shard_loads = [0.0] * total
+    for load, index in loads:
+        shard_loads[index] = load
+    return ShardPlan(total, shards, shard_loads)
+
+
+def load_or_create_plan(costs: Dict[str, float], total: int, plan_file: Path, build: str = "") -> ShardPlan:
+    """构建标识、测试集合和分片数与已保存的划分一致时复用，否则重新划分并保存（跨进程文件锁）"""
+    with file_lock(plan_file.with_suffix(".lock")):
+        try:
+            saved = ShardPlan.from_dict(json.loads(plan_file.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError):
+            saved = None
+        if (saved and saved.build == build and saved.total == total
+                and sorted(sum(saved.shards, [])) == sorted(costs)):
+            return saved
+        plan = plan_shards(costs, total)
+        plan.build = build
+        plan_file.parent.mkdir(parents=True, exist_ok=True)
+        plan_file.write_text(json.dumps(plan.to_dict(), ensure_ascii=False, indent=1), encoding="utf-8")
+        return plan
+
+
+def collect_pytest(targets: Sequence[str], cwd: Optional[str] = None) -> List[str]:
+    """
+    收集 pytest nodeid
+
+    清空 pytest.ini 的 addopts：其中的 -v 会抵消 -q，输出变为树状格式而不是 nodeid
+
+    Raises:
+        RuntimeError: 收集失败或没有收集到测试
+    """
+    completed = subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", "-o", "addopts=", *targets],
+                               capture_output=True, text=True, cwd=cwd)
+    nodeids = [line.strip() for line in completed.stdout.splitlines() if "::" in line and not line.startswith(" ")]
+    if completed.returncode != 0 or not nodeids:
+        output = (completed.stdout + completed.stderr).strip().splitlines()
+        raise RuntimeError(f"pytest 收集失败（退出码 {completed.returncode}，{len(nodeids)} 个测试）: "
+                           + "\n".join(output[-20:]))
+    return nodeids
+
+
+def estimate_costs(pytest_ids: Sequence[str], robot_units: Sequence[RobotUnit]) -> Dict[str, float]:
+    """按耗时历史估算每个测试键的耗时"""
+    pytest_store = DurationStore(settings.DURATION_STORE)
+    robot_store = DurationStore(settings.ROBOT_DURATION_STORE)
+    costs = {PYTEST_PREFIX + nodeid: pytest_store.estimate(nodeid) for nodeid in pytest_ids}
+    costs.update({ROBOT_PREFIX + unit.key: robot_store.estimate(unit.key) for unit in robot_units})
+    return costs
+
+
+def run_shard(index: int, total: int, pytest_ids: Sequence[str], robot_base_cmd: Sequence[str],
+              robot_units: Sequence[RobotUnit], output_dir: str, processes: int = 1) -> int:
+    """
+    执行第 index 个分片，结果写到 <output_dir>/shards/shard_<index>
+
+    Returns:
+        退出码（pytest 与 Robot 退出码的较大值）
+    """
+    shards_dir = Path(output_dir) / "shards"
+    shard_dir = shards_dir / f"shard_{index}"
+    # 清除上次运行的结果，本次中途崩溃时合并按缺失处理而不是误用旧的 shard.json
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    plan = load_or_create_plan(estimate_costs(pytest_ids, robot_units), total, shards_dir / "plan.json",
+                               settings.SHARD_BUILD_ID)
+    mine = set(plan.shards[index - 1])
+    selected_ids = [nodeid for nodeid in pytest_ids if PYTEST_PREFIX + nodeid in mine]
+    selected_units = [unit for unit in robot_units if ROBOT_PREFIX + unit.key in mine]
+    print(f"分片 {index}/{total}（划分 {plan.fingerprint}）：{len(selected_ids)} 个 pytest 测试，"
+          f"{len(selected_units)} 个 Robot 单元，预计 {plan.loads[index - 1]:.1f}s")
+
+    started = time.monotonic()
+    manifest = {
+        "shard": index,
+        "total": total,
+        "build": plan.build,
+        "fingerprint": plan.fingerprint,
+        "estimated": plan.loads[index - 1],
+        "pytest": {"tests": selected_ids, "junit": None, "returncode": 0},
+        "robot": {"tests": [unit.key for unit in selected_units], "output": None, "returncode": 0},
+    }
+    if selected_ids:
+        junit = shard_dir / "pytest.xml"
+        # 同一工作区的各分片进程各自写日志
+        cmd = [sys.executable, "-m", "pytest", *selected_ids, "-o", f"log_file=logs/pytest_shard_{index}.log",
+               "-v", f"--junitxml={junit}", f"--html={shard_dir / 'pytest.html'}", "--self-contained-html"]
+        manifest["pytest"].update(junit=junit.name, returncode=subprocess.run(cmd).returncode)
+    if selected_units:
+        runner = RobotParallelRunner(robot_base_cmd, str(shard_dir / "robot"), processes)
+        returncode = runner.run(selected_units, name=f"Shard {index}")
+        manifest["robot"].update(output="robot/output.xml", returncode=returncode)
+    manifest["elapsed"] = round(time.monotonic() - started, 1)
+    (shard_dir / "shard.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    return max(manifest["pytest"]["returncode"], manifest["robot"]["returncode"])
+
+
+def merge_junit(paths: Sequence[Path], target: Path) -> Dict[str, int]:
+    """合并多个 JUnit XML，返回 tests / failures / errors / skipped 合计"""
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    root = ET.Element("testsuites")
+    for path in paths:
+        parsed = ET.parse(path).getroot()
+        for suite in ([parsed] if parsed.tag == "testsuite" else parsed.findall("testsuite")):
+            root.append(suite)
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+    for key, value in totals.items():
+        root.set(key, str(value))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(target, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def merge_shards(shards_dir: str, output_dir: Optional[str] = None, build: Optional[str] = None) -> int:
+    """
+    合并各分片结果到 <output_dir>（默认 <shards_dir>/merged）：pytest.xml、robot/ 报告和 summary.json
+
+    Args:
+        build: 本次构建标识，默认 settings.SHARD_BUILD_ID；非空时其它构建留下的分片结果按缺失处理
+
+    Returns:
+        退出码：存在失败、分片缺失或划分不一致时非 0
+    """
+    shards_path = Path(shards_dir)
+    merged_dir = Path(output_dir) if output_dir else shards_path / "merged"
+    build = settings.SHARD_BUILD_ID if build is None else build
+    # 本次没有对应结果时不能留下上次合并的报告
+    (merged_dir / "pytest.xml").unlink(missing_ok=True)
+    shutil.rmtree(merged_dir / "robot", ignore_errors=True)
+
+    manifests, stale = [], []
+    for path in sorted(shards_path.glob("shard_*/shard.json")):
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        manifest["dir"] = path.parent
+        if build and manifest.get("build", "") != build:
+            stale.append(manifest["shard"])
+            continue
+        manifests.append(manifest)
+    if not manifests:
+        print(f"✗ {shards_path} 下没有{'本次构建的' if build else ''}分片结果")
+        return 1
+    manifests.sort(key=lambda manifest: manifest["shard"])
+
+    problems = []
+    if stale:
+        problems.append(f"忽略其它构建的分片结果: {', '.join(map(str, sorted(stale)))}")
+    total = manifests[0]["total"]
+    missing = sorted(set(range(1, total + 1)) - {manifest["shard"] for manifest in manifests})
+    if missing:
+        problems.append(f"缺少分片: {', '.join(map(str, missing))}")
+    if len({manifest["fingerprint"] for manifest in manifests}) > 1:
+        problems.append("各分片使用的划分不一致")
+
+    junit_files = [manifest["dir"] / manifest["pytest"]["junit"] for manifest in manifests
+                   if manifest["pytest"]["junit"] and (manifest["dir"] / manifest["pytest"]["junit"]).exists()]
+    pytest_totals = merge_junit(junit_files, merged_dir / "pytest.xml") if junit_files else None
+    robot_outputs = [str(manifest["dir"] / manifest["robot"]["output"]) for manifest in manifests
+                     if manifest["robot"]["output"] and (manifest["dir"] / manifest["robot"]["output"]).exists()]
+    robot_rc = 0
+    if robot_outputs:
+        robot_rc = rebot(["--outputdir", str(merged_dir / "robot"), "--output", "output.xml", "--log", "log.html",
+                          "--report", "report.html", "--name", "Shards", *robot_outputs])
+
+    summary = {
+        "total": total,
+        "problems": problems,
+        "pytest": pytest_totals,
+        "robot_returncode": robot_rc,
+        "shards": [{
+            "shard": manifest["shard"],
+            "estimated": manifest["estimated"],
+            "elapsed": manifest["elapsed"],
+            "pytest_returncode": manifest["pytest"]["returncode"],
+            "robot_returncode": manifest["robot"]["returncode"],
+        } for manifest in manifests],
+    }
+    merged_dir.mkdir(parents=True, exist_ok=True)
+    (merged_dir / "summary.json").write_text(json.dumps(summary, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    print("========================================")
+    print(f"分片合并结果（{len(manifests)}/{total}）")
+    print("========================================")
+    for shard in summary["shards"]:
+        status = "✓" if shard["pytest_returncode"] == 0 and shard["robot_returncode"] == 0 else "✗"
+        print(f"{status} 分片 {shard['shard']}: 预计 {shard['estimated']:.1f}s，实际 {shard['elapsed']:.1f}s")
+    if pytest_totals:
+        print(f"pytest: {pytest_totals['tests']} 个测试，失败 {pytest_totals['failures']}，"
+              f"错误 {pytest_totals['errors']}，跳过 {pytest_totals['skipped']}")
+    for problem in problems:
+        print(f"✗ {problem}")
+    print(f"合并报告: {merged_dir}/")
+
+    failed = bool(pytest_totals and (pytest_totals["failures"] or pytest_totals["errors"]))
+    return 1 if problems or failed or robot_rc else 0
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+进程级共享 Playwright 管理器
+同一进程中的各个 Robot 库（BaseKeywords / RobotCustomLibrary / StepsLibrary）
+共用一个 Playwright 驱动进程和按（浏览器类型, 是否无头）区分的浏览器，
+每个套件只创建自己的 BrowserContext，通过引用计数管理浏览器生命周期
+"""
+
+import atexit
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from playwright.sync_api import sync_playwright, Browser, BrowserContext
+
+import config.settings as settings
+from utils.playwright_helper import launch_browser
+
+logger = logging.getLogger(__name__)
+
+BrowserKey = Tuple[str, bool]
+
+
+class SharedPlaywright:
+    """共享的 Playwright 驱动与浏览器 - 借出/归还浏览器，引用计数归零后按配置关闭"""
+
+    def __init__(self, keep_alive: Optional[bool] = None):
+        """
+        初始化共享管理器
+
+        Args:
+            keep_alive: 引用计数归零后是否保留浏览器供后续套件复用（进程退出时统一关闭），
+                        默认 settings.PLAYWRIGHT_SHARED_KEEP_ALIVE
+        """
+        self.keep_alive = settings.PLAYWRIGHT_SHARED_KEEP_ALIVE if keep_alive is None else keep_alive
+        self._playwright = None
+        self._browsers: Dict[BrowserKey, Browser] = {}
+        self._refs: Dict[BrowserKey, int] = {}
+        self._lock = threading.RLock()
+
+    def acquire_browser(self, browser_type: str = "chromium", headless: bool = True) -> Browser:
+        """
+        借出浏览器；同一（浏览器类型, 是否无头）只启动一次
+
+        Args:
+            browser_type: 浏览器类型 (chromium/firefox/webkit)
+            headless: 是否无头模式
+        """
+        key = (browser_type.lower(), bool(headless))
+        with self._lock:
+            browser = self._browsers.get(key)
+            if browser is None or not browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = sync_playwright().start()
+                    logger.info("共享 Playwright 驱动已启动")
+                browser = launch_browser(self._playwright, key[0], key[1])
+                self._browsers[key] = browser
+                logger.info(f"共享浏览器已启动: {key}")
+            self._refs[key] = self._refs.get(key, 0) + 1
+            return browser
+
+    def release_browser(self, browser_type: str = "chromium", headless: bool = True):
+        """归还浏览器；引用计数归零且未开启 keep_alive 时关闭该浏览器"""
+        key = (browser_type.lower(), bool(headless))
+        with self._lock:
+            if self._refs.get(key, 0) <= 0:
+                return
+            self._refs[key] -= 1
+            if self._refs[key] == 0 and not self.keep_alive:
+                self._close_browser(key)
+                if not self._browsers:
+                    self._stop_playwright()
+
+    def new_context(self, browser_type: str = "chromium", headless: bool = True,
+                    **context_options) -> BrowserContext:
+        """借出浏览器并创建一个独立的 BrowserContext，用完后调用 close_context() 归还"""
+        browser = self.acquire_browser(browser_type, headless)
+        try:
+            return browser.new_context(**context_options)
+        except Exception:
+            self.release_browser(browser_type, headless)
+            raise
+
+    def close_context(self, context: Optional[BrowserContext], browser_type: str = "chromium",
+                      headless: bool = True):
+        """关闭 new_context() 创建的上下文并归还浏览器"""
+        try:
+            if context:
+                context.close()
+        except Exception as e:
+            logger.debug(f"关闭上下文时出错: {e}")
+        finally:
+            self.release_browser(browser_type, headless)
+
+    def shutdown(self):
+        """关闭所有浏览器和 Playwright 驱动"""
+        with self._lock:
+            for key in list(self._browsers):
+                self._close_browser(key)
+            self._refs.clear()
+            self._stop_playwright()
+
+    def _close_browser(self, key: BrowserKey):
+        """关闭指定浏览器"""
+        browser = self._browsers.pop(key, None)
+        self._refs.pop(key, None)
+        if browser is None:
+            return
+        try:
+            browser.close()
+            logger.info(f"共享浏览器已关闭: {key}")
+        except Exception as e:
+            logger.debug(f"关闭共享浏览器时出错: {e}")
+
+    def _stop_playwright(self):
+        """停止 Playwright 驱动进程"""
+        if self._playwright is None:
+            return
+        try:
+            self._playwright.stop()
+        except Exception as e:
+            logger.debug(f"停止 Playwright 时出错: {e}")
+        self._playwright = None
+
+
+_shared: Optional[SharedPlaywright] = None
+
+
+def get_shared_playwright() -> SharedPlaywright:
+    """获取进程级共享 Playwright 管理器（进程退出时自动关闭）"""
+    global _shared
+    if _shared is None:
+        _shared = SharedPlaywright()
+        atexit.register(_shared.shutdown)
+    return _shared
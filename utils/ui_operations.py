@@ -5,12 +5,23 @@ UI操作封装层 - 供Python用例使用
 """
 
 import logging
+import time
 from pathlib import Path
 from datetime import datetime
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, TimeoutError as PlaywrightTimeoutError
 from typing import Optional, List, Dict, Any, Literal
 import config.settings as settings
 from utils.retry_decorator import retry_on_failure
+from utils.playwright_helper import build_context_options, launch_browser
+from utils.har_replay import apply_har
+from utils.resource_blocking import apply_resource_blocking
+from utils.bulk_extract import extract_texts, extract_attributes, extract_rows
+from utils.page_snapshot import invalidate_snapshot
+from utils.form_fill import batch_fill
+from utils.locator_registry import get_locator, playwright_selector
+from utils.adaptive_timeout import get_timeout_policy
+from utils.dom_probe import DomProbe, ElementState, check_mode
+from utils.wait_engine import WaitEngine, dom_query
 
 logger = logging.getLogger(__name__)
 
@@ -35,41 +46,86 @@ class UIOperations:
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self._screenshot_counter = 0
+        # 浏览器由自身启动时才在 close_browser() 中关闭；接管的共享浏览器只关闭上下文
+        self._owns_browser = False
+        # 预热页面已经打开的URL，首次导航到该URL时无需重新加载
+        self._prewarmed_url: Optional[str] = None
+        # 修改页面的操作次数，每次修改同时使缓存的页面快照失效
+        self.mutation_count = 0
+        # 未显式传入 timeout 时按定位器历史耗时决定超时
+        self.timeouts = get_timeout_policy()
+        # 即时断言前页面需达到的就绪状态（见 declare_ready）
+        self.ready_state = settings.ASSERT_READY_STATE
+        self.ready_locator: Optional[str] = None
         
         logger.info(f"初始化 UIOperations: browser={browser_type}, headless={headless}, debug={debug_mode}")
     
-    def start_browser(self, url: Optional[str] = None):
-        """启动浏览器并可选导航到URL"""
+    def start_browser(self, url: Optional[str] = None, storage_state: Optional[str] = None,
+                      har_flow: Optional[str] = None):
+        """
+        启动浏览器并可选导航到URL
+        
+        Args:
+            url: 启动后导航的URL
+            storage_state: 登录态文件（见 utils.auth_state），提供时上下文以已登录状态创建
+            har_flow: HAR 录制/回放使用的页面流程名称（见 utils.har_replay）
+        """
         logger.info(f"启动浏览器: {self.browser_type}")
         self.playwright = sync_playwright().start()
         
-        browser_map = {
-            "chromium": self.playwright.chromium,
-            "firefox": self.playwright.firefox,
-            "webkit": self.playwright.webkit
-        }
-        
-        browser_launcher = browser_map.get(self.browser_type)
-        if not browser_launcher:
-            raise ValueError(f"不支持的浏览器类型: {self.browser_type}")
-        
         # 启动浏览器，调试模式下启用慢速模式
-        launch_options = {"headless": self.headless}
+        launch_options = {}
         if self.debug_mode:
             launch_options["slow_mo"] = 100  # 慢速模式，便于观察
         
-        self.browser = browser_launcher.launch(**launch_options)
+        self.browser = launch_browser(self.playwright, self.browser_type, self.headless, **launch_options)
+        self._owns_browser = True
+        logger.info("浏览器启动成功")
         
-        viewport = settings.BROWSER_OPTIONS.get("chrome", {}).get("window_size", (1920, 1080))
-        self.context = self.browser.new_context(
-            viewport={"width": viewport[0], "height": viewport[1]},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-            record_video_dir=str(settings.REPORTS_DIR / "videos") if self.debug_mode else None,
-        )
+        return self.new_context(url=url, storage_state=storage_state, har_flow=har_flow)
+    
+    def attach_to_context(self, context: BrowserContext, page: Page, prewarmed_url: Optional[str] = None):
+        """
+        接管已创建好的上下文和页面（如 ContextPrewarmer 预热的页面），关闭时不关闭共享浏览器
         
+        Args:
+            context: 已创建的 BrowserContext
+            page: 该上下文中的 Page
+            prewarmed_url: 页面已预先打开的URL
+        """
+        self.browser = context.browser
+        self._owns_browser = False
+        self.context = context
+        self.page = page
+        self._prewarmed_url = prewarmed_url
+        return self.page
+    
+    def new_context(self, url: Optional[str] = None, storage_state: Optional[str] = None,
+                    har_flow: Optional[str] = None):
+        """
+        关闭当前上下文并在同一浏览器上创建新的上下文和页面
+        
+        Args:
+            url: 创建后导航的URL
+            storage_state: 登录态文件，提供时上下文以已登录状态创建
+            har_flow: HAR 录制/回放使用的页面流程名称
+        """
+        if not self.browser:
+            raise RuntimeError("浏览器未初始化，请先调用 start_browser()")
+        if self.context:
+            self.context.close()
+        self._prewarmed_url = None
+        
+        context_options = {
+            "record_video_dir": str(settings.REPORTS_DIR / "videos") if self.debug_mode else None,
+        }
+        if storage_state:
+            context_options["storage_state"] = storage_state
+        self.context = self.browser.new_context(**build_context_options(**context_options))
+        # HAR 路由先注册，资源屏蔽路由后注册、优先匹配
+        apply_har(self.context, har_flow)
+        apply_resource_blocking(self.context)
         self.page = self.context.new_page()
-        logger.info("浏览器启动成功")
         
         if url:
             self.navigate_to(url)
@@ -82,10 +138,13 @@ class UIOperations:
         try:
             if self.context:
                 self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
+                self.context = None
+                self.page = None
+            if self._owns_browser:
+                if self.browser:
+                    self.browser.close()
+                if self.playwright:
+                    self.playwright.stop()
             logger.info("浏览器已关闭")
         except Exception as e:
             logger.error(f"关闭浏览器时出错: {e}")
@@ -95,75 +154,159 @@ class UIOperations:
     def navigate_to(self, url: str):
         """导航到URL"""
         self._ensure_page()
+        prewarmed_url, self._prewarmed_url = self._prewarmed_url, None
+        if prewarmed_url and prewarmed_url == url:
+            # 预热时已加载该页面，直接复用
+            return
         self.page.goto(url)
     
     def click(self, locator: str, timeout: int = None):
         """点击元素"""
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
-        self.page.click(locator, timeout=timeout_ms)
+        self._timed(locator, timeout, lambda timeout_ms: self.page.click(playwright_selector(locator), timeout=timeout_ms))
+        self.mark_page_changed()
     
     def fill(self, locator: str, text: str, timeout: int = None):
         """填充输入框"""
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
-        self.page.fill(locator, text, timeout=timeout_ms)
+        self._timed(locator, timeout, lambda timeout_ms: self.page.fill(playwright_selector(locator), text, timeout=timeout_ms))
+        self.mark_page_changed()
     
     def get_text(self, locator: str, timeout: int = None) -> str:
         """获取元素文本"""
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
-        return self.page.text_content(locator, timeout=timeout_ms) or ""
+        text = self._timed(
+            locator, timeout,
+            lambda timeout_ms: self.page.text_content(playwright_selector(locator), timeout=timeout_ms))
+        return text or ""
     
     def wait_for_element(self, locator: str, timeout: int = None, state: str = "visible"):
         """等待元素出现"""
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
-        self.page.wait_for_selector(locator, timeout=timeout_ms, state=state)
+        self._timed(locator, timeout, lambda timeout_ms: self.page.wait_for_selector(playwright_selector(locator), timeout=timeout_ms, state=state))
     
-    def is_element_visible(self, locator: str, timeout: int = 5000) -> bool:
-        """检查元素是否可见"""
+    def is_element_visible(self, locator: str, timeout: int = 5000,
+                           mode: Literal["eventually", "now"] = "eventually") -> bool:
+        """
+        检查元素是否可见
+        
+        Args:
+            locator: 元素定位器
+            timeout: eventually 模式下最长等待时间（毫秒）
+            mode: eventually 等待元素出现；now 页面就绪后立即判断当前状态
+        """
         self._ensure_page()
+        if check_mode(mode) == "now":
+            return self.element_state(locator).visible
         try:
-            self.page.wait_for_selector(locator, timeout=timeout, state="visible")
+            self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="visible")
             return True
         except:
             return False
     
+    def element_state(self, locator: str) -> ElementState:
+        """页面达到声明的就绪状态并渲染一帧后，元素当前的数量与可见性（不等待元素本身）"""
+        self._ensure_page()
+        return DomProbe(self.page, self.ready_state, self.ready_locator).state(locator)
+    
+    def declare_ready(self, ready_state: Optional[str] = None, locator: Optional[str] = None):
+        """
+        声明即时断言的就绪状态
+        
+        Args:
+            ready_state: document.readyState 需达到的值（loading/interactive/complete）
+            locator: 就绪元素，出现后页面才视为就绪，例如页面主容器；None 表示不要求
+        """
+        self.ready_state = ready_state or settings.ASSERT_READY_STATE
+        self.ready_locator = locator
+    
+    def wait_for_any(self, *locators: str, timeout: Optional[int] = None) -> str:
+        """
+        等待多个元素中任一可见，返回先出现的定位器（用于成功/失败两种结果都可能出现的操作）
+        
+        Args:
+            *locators: 元素定位器
+            timeout: 超时时间（秒）
+        """
+        self._ensure_page()
+        combined = self.locator(locators[0])
+        for locator in locators[1:]:
+            combined = combined.or_(self.locator(locator))
+        key = " | ".join(locators)
+        self._timed(key, timeout, lambda timeout_ms: combined.first.wait_for(state="visible", timeout=timeout_ms))
+        for locator in locators:
+            if self.locator(locator).first.is_visible():
+                return locator
+        return locators[0]
+    
     def get_element_count(self, locator: str) -> int:
         """获取匹配的元素数量"""
         self._ensure_page()
-        return len(self.page.query_selector_all(locator))
+        return self.locator(locator).count()
     
     # ========== 高级操作 ==========
     
-    def fill_form(self, form_data: dict):
-        """填充表单（字典形式）"""
-        for locator, value in form_data.items():
-            self.fill(locator, str(value))
+    def fill_form(self, form_data: dict, per_field: Optional[List[str]] = None):
+        """
+        填充表单（字典形式），一次页面脚本调用填写所有字段
+        
+        Args:
+            form_data: 定位器 -> 值
+            per_field: 有自定义输入处理、需要逐字段 fill 的定位器
+        """
+        self._ensure_page()
+        values = {locator: str(value) for locator, value in form_data.items()}
+        pending = list(values)
+        if settings.FORM_BATCH_FILL:
+            pending = batch_fill(self.page, values, per_field or ())
+            if len(pending) < len(values):
+                self.mark_page_changed()
+        for locator in pending:
+            self.fill(locator, values[locator])
     
     def click_multiple(self, locators: List[str], wait_between: float = 0.5):
-        """依次点击多个元素"""
-        import time
+        """
+        依次点击多个元素，每次点击后等待页面重新渲染结束
+        
+        Args:
+            locators: 元素定位器列表
+            wait_between: 每次点击后等待 DOM 稳定的最长时间（秒）
+        """
         for locator in locators:
             self.click(locator)
-            time.sleep(wait_between)
+            self.waits.dom_settled(timeout=int(wait_between * 1000))
     
     def get_all_texts(self, locator: str) -> List[str]:
-        """获取所有匹配元素的文本列表"""
+        """获取所有匹配元素的文本列表（一次浏览器往返）"""
+        self._ensure_page()
+        return extract_texts(self.page, locator)
+    
+    def get_all_attributes(self, locator: str, attribute: str) -> List[Optional[str]]:
+        """获取所有匹配元素的属性值列表（一次浏览器往返）"""
+        self._ensure_page()
+        return extract_attributes(self.page, locator, attribute)
+    
+    def get_rows(self, row_locator: str, fields: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+        """
+        获取结构化行数据（一次浏览器往返）
+        
+        Args:
+            row_locator: 行元素定位器
+            fields: 字段名 -> 字段定义，如 {"name": "css=.name", "link": "css=a@href"}
+        """
         self._ensure_page()
-        elements = self.page.query_selector_all(locator)
-        return [elem.text_content() or "" for elem in elements]
+        return extract_rows(self.page, row_locator, fields)
     
     def select_option(self, locator: str, value: str):
         """选择下拉框选项"""
         self._ensure_page()
-        self.page.select_option(locator, value)
+        self.page.select_option(playwright_selector(locator), value)
+        self.mark_page_changed()
     
     def scroll_to_element(self, locator: str):
         """滚动到元素"""
         self._ensure_page()
-        self.page.locator(locator).scroll_into_view_if_needed()
+        self.locator(locator).scroll_into_view_if_needed()
     
     def take_screenshot(self, filename: str = "screenshot.png"):
         """截图"""
@@ -194,11 +337,49 @@ class UIOperations:
     
     # ========== 验证操作 ==========
     
-    def assert_element_exists(self, locator: str, timeout: int = 5000):
-        """断言元素存在"""
-        if not self.is_element_visible(locator, timeout):
+    def assert_element_exists(self, locator: str, timeout: int = 5000,
+                              mode: Literal["eventually", "now"] = "eventually"):
+        """断言元素存在（可见）；mode=now 时不等待，按页面当前状态判断"""
+        if not self.is_element_visible(locator, timeout, mode=mode):
             raise AssertionError(f"元素不存在: {locator}")
     
+    def assert_element_not_exists(self, locator: str, timeout: int = 5000,
+                                  mode: Literal["eventually", "now"] = "now"):
+        """
+        断言元素不存在
+        
+        Args:
+            mode: now（默认）页面就绪后立即判断；eventually 等待元素移除，最长 timeout 毫秒
+        """
+        self._ensure_page()
+        if check_mode(mode) == "eventually":
+            try:
+                self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="detached")
+                return
+            except PlaywrightTimeoutError:
+                pass
+        state = self.element_state(locator)
+        if state.exists:
+            raise AssertionError(f"元素不应该存在，但找到了 {state.count} 个: {locator}")
+    
+    def assert_element_not_visible(self, locator: str, timeout: int = 5000,
+                                   mode: Literal["eventually", "now"] = "now"):
+        """
+        断言元素不可见（不存在或隐藏）
+        
+        Args:
+            mode: now（默认）页面就绪后立即判断；eventually 等待元素隐藏，最长 timeout 毫秒
+        """
+        self._ensure_page()
+        if check_mode(mode) == "eventually":
+            try:
+                self.page.wait_for_selector(playwright_selector(locator), timeout=timeout, state="hidden")
+                return
+            except PlaywrightTimeoutError:
+                pass
+        if self.element_state(locator).visible:
+            raise AssertionError(f"元素应该不可见，但可见: {locator}")
+    
     def assert_text_contains(self, locator: str, expected_text: str):
         """断言元素文本包含指定内容"""
         actual_text = self.get_text(locator)
@@ -245,9 +426,11 @@ class UIOperations:
             是否成功等待到元素
         """
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
         try:
-            self.page.wait_for_selector(locator, timeout=timeout_ms, state=condition)
+            self._timed(
+                locator, timeout,
+                lambda timeout_ms: self.page.wait_for_selector(
+                    playwright_selector(locator), timeout=timeout_ms, state=condition))
             logger.debug(f"智能等待成功: {locator} ({condition})")
             return True
         except PlaywrightTimeoutError:
@@ -264,12 +447,12 @@ class UIOperations:
             timeout: 超时时间（秒）
         """
         self._ensure_page()
-        timeout_ms = (timeout or settings.TIMEOUT) * 1000
         
         if self.debug_mode:
             self.highlight_element(locator)
         
-        self.page.click(locator, timeout=timeout_ms)
+        self._timed(locator, timeout, lambda timeout_ms: self.page.click(playwright_selector(locator), timeout=timeout_ms))
+        self.mark_page_changed()
         logger.info(f"点击元素: {locator}")
     
     def highlight_element(self, locator: str, duration: float = 0.5):
@@ -284,20 +467,26 @@ class UIOperations:
             return
         
         self._ensure_page()
+        query = dom_query(locator)
+        if query is None:
+            return
         try:
-            self.page.evaluate(f"""
-                (locator) => {{
-                    const element = document.querySelector('{locator}'.replace('css=', '').replace('id=', '#'));
-                    if (element) {{
+            self.page.evaluate("""
+                ({ query, duration }) => {
+                    const element = query.type === 'xpath'
+                        ? document.evaluate(query.value, document, null,
+                            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                        : document.querySelector(query.value);
+                    if (element) {
                         element.style.border = '3px solid red';
                         element.style.backgroundColor = 'yellow';
-                        setTimeout(() => {{
+                        setTimeout(() => {
                             element.style.border = '';
                             element.style.backgroundColor = '';
-                        }}, {duration * 1000});
-                    }}
-                }}
-            """)
+                        }, duration);
+                    }
+                }
+            """, {"query": query, "duration": duration * 1000})
         except Exception as e:
             logger.debug(f"元素高亮失败: {e}")
     
@@ -355,6 +544,8 @@ class UIOperations:
         """
         self._ensure_page()
         result = self.page.evaluate(script)
+        # 脚本可能修改页面
+        self.mark_page_changed()
         logger.debug(f"执行 JavaScript: {script[:50]}...")
         return result
     
@@ -370,7 +561,7 @@ class UIOperations:
             属性值
         """
         self._ensure_page()
-        return self.page.get_attribute(locator, attribute)
+        return self.page.get_attribute(playwright_selector(locator), attribute)
     
     def is_element_enabled(self, locator: str) -> bool:
         """
@@ -383,7 +574,7 @@ class UIOperations:
             是否可用
         """
         self._ensure_page()
-        return self.page.is_enabled(locator)
+        return self.page.is_enabled(playwright_selector(locator))
     
     def wait_for_text_change(self, locator: str, initial_text: str, timeout: int = 10) -> bool:
         """
@@ -398,21 +589,94 @@ class UIOperations:
             文本是否已变化
         """
         self._ensure_page()
-        import time
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            current_text = self.get_text(locator)
-            if current_text != initial_text:
-                logger.debug(f"文本已变化: {initial_text} -> {current_text}")
-                return True
-            time.sleep(0.5)
+        if self.waits.text_changed(locator, initial_text, timeout=timeout * 1000):
+            logger.debug(f"文本已变化: {initial_text} -> {self.get_text(locator)}")
+            return True
         
         logger.warning(f"等待文本变化超时: {locator}")
         return False
     
+    def wait_for_count(self, locator: str, count: int, timeout: int = 10, exact: bool = False) -> bool:
+        """
+        等待匹配元素数量达到指定值
+        
+        Args:
+            locator: 元素定位器
+            count: 期望数量
+            timeout: 超时时间（秒）
+            exact: 是否要求数量恰好相等
+        
+        Returns:
+            是否在超时前达到
+        """
+        self._ensure_page()
+        return self.waits.count_reached(locator, count, timeout=timeout * 1000, exact=exact)
+    
+    def wait_for_attribute(self, locator: str, attribute: str, value: Optional[str], timeout: int = 10) -> bool:
+        """
+        等待元素属性等于指定值
+        
+        Args:
+            locator: 元素定位器
+            attribute: 属性名
+            value: 期望值，None 表示属性不存在
+            timeout: 超时时间（秒）
+        
+        Returns:
+            是否在超时前满足
+        """
+        self._ensure_page()
+        return self.waits.attribute_equals(locator, attribute, value, timeout=timeout * 1000)
+    
+    def wait_for_element_stable(self, locator: Optional[str] = None, quiet: int = 100, timeout: int = 10) -> bool:
+        """
+        等待元素（默认整个页面）在 quiet 毫秒内无 DOM 变化且位置不变
+        
+        Args:
+            locator: 元素定位器，None 表示整个页面
+            quiet: 安静期（毫秒）
+            timeout: 超时时间（秒）
+        
+        Returns:
+            是否在超时前稳定
+        """
+        self._ensure_page()
+        return self.waits.element_stable(locator, quiet=quiet, timeout=timeout * 1000)
+    
+    @property
+    def waits(self) -> WaitEngine:
+        """当前页面的事件驱动等待引擎"""
+        self._ensure_page()
+        return WaitEngine(self.page)
+    
     # ========== 辅助方法 ==========
     
+    def locator(self, locator: str):
+        """当前页面上缓存的 Playwright Locator（前缀已规范化）"""
+        self._ensure_page()
+        return get_locator(self.page, locator)
+    
+    def _timed(self, locator: str, timeout: Optional[int], action):
+        """
+        执行定位器操作并记录实际耗时
+        
+        Args:
+            locator: 元素定位器
+            timeout: 显式超时（秒），为空时使用自适应超时
+            action: 接收超时毫秒数的操作
+        """
+        url = self.page.url
+        seconds = timeout or self.timeouts.timeout_for(url, locator)
+        start = time.monotonic()
+        result = action(int(seconds * 1000))
+        self.timeouts.record(url, locator, time.monotonic() - start)
+        return result
+    
+    def mark_page_changed(self):
+        """记录一次页面修改并使缓存的页面快照失效（直接操作元素句柄后也需调用）"""
+        self.mutation_count += 1
+        invalidate_snapshot(self.page)
+    
     def _ensure_page(self):
         """确保页面已初始化"""
         if not self.page:
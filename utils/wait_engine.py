@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+事件驱动的等待引擎
+条件在浏览器内通过 MutationObserver 判断，DOM 一发生变化就重新检查，
+条件满足即返回，不再依赖 time.sleep 轮询或固定等待。
+
+支持的条件：文本变化、元素数量达到、属性等于、元素稳定（一段时间内无 DOM 变化且位置不变）
+元素始终未出现、或等待期间页面导航销毁了执行上下文时返回 False，不抛异常
+AsyncWaitEngine 为 playwright.async_api 页面提供相同的等待（方法均为协程）
+"""
+
+import logging
+from typing import Optional, Dict
+
+from playwright.sync_api import Error as PlaywrightError, Page, TimeoutError as PlaywrightTimeoutError
+
+from utils.locator_registry import compile_locator, get_locator
+
+logger = logging.getLogger(__name__)
+
+# 页面内脚本执行期间发生导航时 Playwright 抛出的错误
+_NAVIGATION_ERRORS = ("Execution context was destroyed", "Frame was detached")
+
+# 在页面内等待条件成立：超时返回 false，不抛异常
+_WAIT_JS = """
+({ el, spec }) => new Promise((resolve) => {
+    const query = spec.query;
+    const queryAll = () => {
+        if (query.type === 'xpath') {
+            const result = document.evaluate(query.value, document, null,
+                XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            return Array.from({ length: result.snapshotLength }, (_, i) => result.snapshotItem(i));
+        }
+        return Array.from(document.querySelectorAll(query.value));
+    };
+    // 有 DOM 查询时每次重新查找元素，元素被重新渲染替换后仍能继续判断
+    const target = () => query ? (queryAll()[0] || null) : el;
+    const check = () => {
+        if (spec.kind === 'count_reached') {
+            const count = queryAll().length;
+            return spec.exact ? count === spec.count : count >= spec.count;
+        }
+        const node = target();
+        if (!node) return false;
+        if (spec.kind === 'text_changed') return (node.textContent || '') !== spec.initial;
+        if (spec.kind === 'attribute_equals') return node.getAttribute(spec.name) === spec.value;
+        return false;
+    };
+
+    let observer = null;
+    let quietTimer = null;
+    const finish = (ok) => {
+        if (observer) observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(quietTimer);
+        resolve(ok);
+    };
+    const timer = setTimeout(() => finish(false), spec.timeout);
+    const options = { subtree: true, childList: true, attributes: true, characterData: true };
+
+    if (spec.kind === 'element_stable') {
+        const root = el || document.documentElement;
+        const rectOf = () => JSON.stringify(root.getBoundingClientRect());
+        let rect = rectOf();
+        // 每次变化重新计时，安静期内无变化且位置未变即视为稳定
+        const arm = () => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => {
+                const current = rectOf();
+                if (current === rect) finish(true);
+                else { rect = current; arm(); }
+            }, spec.quiet);
+        };
+        observer = new MutationObserver(arm);
+        observer.observe(root, options);
+        arm();
+        return;
+    }
+
+    if (check()) { finish(true); return; }
+    observer = new MutationObserver(() => { if (check()) finish(true); });
+    observer.observe(query ? document.documentElement : el, options);
+})
+"""
+
+
+def dom_query(locator: str) -> Optional[Dict[str, str]]:
+    """
+    将定位器换算为页面内可执行的 DOM 查询（css/xpath）
+
+    支持 css=、id=、tag=、name=、class=、xpath= 前缀以及无前缀的 CSS / XPath；
+    其它 Playwright 选择器引擎（text=、role= 等）、链式选择器和无效定位器返回 None
+    """
+    try:
+        return compile_locator(locator).query
+    except ValueError:
+        return None
+
+
+class WaitEngine:
+    """事件驱动等待 - 所有方法在条件满足时立即返回 True，超时返回 False"""
+
+    def __init__(self, page: Page):
+        """
+        初始化等待引擎
+
+        Args:
+            page: Playwright Page
+        """
+        self.page = page
+
+    def text_changed(self, locator: str, initial_text: str, timeout: int = 10000) -> bool:
+        """等待元素文本（textContent）不再等于 initial_text"""
+        return self._wait(locator, {"kind": "text_changed", "initial": initial_text or ""}, timeout)
+
+    def attribute_equals(self, locator: str, name: str, value: Optional[str], timeout: int = 10000) -> bool:
+        """等待元素属性等于指定值（value 为 None 表示属性不存在）"""
+        return self._wait(locator, {"kind": "attribute_equals", "name": name, "value": value}, timeout)
+
+    def count_reached(self, locator: str, count: int, timeout: int = 10000, exact: bool = False) -> bool:
+        """等待匹配元素数量达到 count（exact=True 时要求恰好等于）"""
+        query = dom_query(locator)
+        if query is None:
+            return self._count_fallback(locator, count, timeout, exact)
+        spec = {"kind": "count_reached", "count": count, "exact": exact, "query": query}
+        return self._evaluate(None, spec, timeout)
+
+    def element_stable(self, locator: Optional[str] = None, quiet: int = 100, timeout: int = 10000) -> bool:
+        """
+        等待元素稳定：quiet 毫秒内子树无 DOM 变化且位置尺寸不变
+
+        Args:
+            locator: 元素定位器，为 None 时等待整个文档稳定
+            quiet: 安静期（毫秒）
+        """
+        handle = None
+        if locator:
+            handle = self._element_handle(locator, timeout)
+            if handle is None:
+                return False
+        return self._evaluate(handle, {"kind": "element_stable", "quiet": quiet, "query": None}, timeout)
+
+    def dom_settled(self, quiet: int = 50, timeout: int = 5000) -> bool:
+        """等待整个文档稳定（点击等操作触发的重新渲染结束）"""
+        return self.element_stable(None, quiet=quiet, timeout=timeout)
+
+    def _wait(self, locator: str, spec: dict, timeout: int) -> bool:
+        """按定位器类型选择 DOM 查询或元素句柄执行等待"""
+        query = dom_query(locator)
+        handle = None
+        if query is None:
+            handle = self._element_handle(locator, timeout)
+            if handle is None:
+                return False
+        spec["query"] = query
+        return self._evaluate(handle, spec, timeout)
+
+    def _element_handle(self, locator: str, timeout: int):
+        """等待元素出现并返回句柄，超时返回 None"""
+        try:
+            return get_locator(self.page, locator).first.element_handle(timeout=timeout)
+        except PlaywrightTimeoutError:
+            logger.debug(f"等待元素出现超时: {locator} ({timeout}ms)")
+            return None
+
+    def _evaluate(self, handle, spec: dict, timeout: int) -> bool:
+        """在页面内执行等待脚本，执行期间发生导航视为条件未满足"""
+        spec["timeout"] = timeout
+        try:
+            result = bool(self.page.evaluate(_WAIT_JS, {"el": handle, "spec": spec}))
+        except PlaywrightError as e:
+            return _navigation_result(e, spec)
+        return _wait_result(result, spec)
+
+    def _count_fallback(self, locator: str, count: int, timeout: int, exact: bool) -> bool:
+        """无法换算为 DOM 查询的定位器：使用 Playwright 自身的等待"""
+        locator_obj = get_locator(self.page, locator)
+        try:
+            if count > 0:
+                locator_obj.nth(count - 1).wait_for(state="attached", timeout=timeout)
+            if exact:
+                locator_obj.nth(count).wait_for(state="detached", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+
+class AsyncWaitEngine:
+    """WaitEngine 的异步版本（playwright.async_api 的页面）"""
+
+    def __init__(self, page):
+        """
+        初始化等待引擎
+
+        Args:
+            page: playwright.async_api 的 Page
+        """
+        self.page = page
+
+    async def text_changed(self, locator: str, initial_text: str, timeout: int = 10000) -> bool:
+        """等待元素文本（textContent）不再等于 initial_text"""
+        return await self._wait(locator, {"kind": "text_changed", "initial": initial_text or ""}, timeout)
+
+    async def attribute_equals(self, locator: str, name: str, value: Optional[str], timeout: int = 10000) -> bool:
+        """等待元素属性等于指定值（value 为 None 表示属性不存在）"""
+        return await self._wait(locator, {"kind": "attribute_equals", "name": name, "value": value}, timeout)
+
+    async def count_reached(self, locator: str, count: int, timeout: int = 10000, exact: bool = False) -> bool:
+        """等待匹配元素数量达到 count（exact=True 时要求恰好等于）"""
+        query = dom_query(locator)
+        if query is None:
+            return await self._count_fallback(locator, count, timeout, exact)
+        spec = {"kind": "count_reached", "count": count, "exact": exact, "query": query}
+        return await self._evaluate(None, spec, timeout)
+
+    async def element_stable(self, locator: Optional[str] = None, quiet: int = 100, timeout: int = 10000) -> bool:
+        """等待元素稳定：quiet 毫秒内子树无 DOM 变化且位置尺寸不变"""
+        handle = None
+        if locator:
+            handle = await self._element_handle(locator, timeout)
+            if handle is None:
+                return False
+        return await self._evaluate(handle, {"kind": "element_stable", "quiet": quiet, "query": None}, timeout)
+
+    async def dom_settled(self, quiet: int = 50, timeout: int = 5000) -> bool:
+        """等待整个文档稳定（点击等操作触发的重新渲染结束）"""
+        return await self.element_stable(None, quiet=quiet, timeout=timeout)
+
+    async def _wait(self, locator: str, spec: dict, timeout: int) -> bool:
+        """按定位器类型选择 DOM 查询或元素句柄执行等待"""
+        query = dom_query(locator)
+        handle = None
+        if query is None:
+            handle = await self._element_handle(locator, timeout)
+            if handle is None:
+                return False
+        spec["query"] = query
+        return await self._evaluate(handle, spec, timeout)
+
+    async def _element_handle(self, locator: str, timeout: int):
+        """等待元素出现并返回句柄，超时返回 None"""
+        try:
+            return await get_locator(self.page, locator).first.element_handle(timeout=timeout)
+        except PlaywrightTimeoutError:
+            logger.debug(f"等待元素出现超时: {locator} ({timeout}ms)")
+            return None
+
+    async def _evaluate(self, handle, spec: dict, timeout: int) -> bool:
+        """在页面内执行等待脚本，执行期间发生导航视为条件未满足"""
+        spec["timeout"] = timeout
+        try:
+            result = bool(await self.page.evaluate(_WAIT_JS, {"el": handle, "spec": spec}))
+        except PlaywrightError as e:
+            return _navigation_result(e, spec)
+        return _wait_result(result, spec)
+
+    async def _count_fallback(self, locator: str, count: int, timeout: int, exact: bool) -> bool:
+        """无法换算为 DOM 查询的定位器：使用 Playwright 自身的等待"""
+        locator_obj = get_locator(self.page, locator)
+        try:
+            if count > 0:
+                await locator_obj.nth(count - 1).wait_for(state="attached", timeout=timeout)
+            if exact:
+                await locator_obj.nth(count).wait_for(state="detached", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+
+def _navigation_result(error: Exception, spec: dict) -> bool:
+    """等待脚本出错：页面导航导致时视为条件未满足，其它错误照常抛出"""
+    if not any(marker in str(error) for marker in _NAVIGATION_ERRORS):
+        raise error
+    logger.debug(f"等待期间页面发生导航: {spec['kind']}")
+    return False
+
+
+def _wait_result(result: bool, spec: dict) -> bool:
+    """记录等待超时并返回结果"""
+    if not result:
+        logger.debug(f"等待条件超时: {spec['kind']} ({spec['timeout']}ms)")
+    return result